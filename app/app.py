@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from src.models.mpt import efficient_frontier, calculate_portfolio_metrics, optimize_portfolio
+from src.models.mpt import (
+    cached_efficient_frontier,
+    calculate_portfolio_metrics,
+    cached_optimize_portfolio,
+    cached_max_sharpe_portfolio
+)
 
 st.title("Optimisation de Portefeuille d'Investissement")
 
@@ -14,12 +19,20 @@ tickers = st.multiselect("Sélectionner les actifs", returns.columns, default=re
 target_return = st.slider("Rendement cible", min_value=0.0, max_value=0.3, value=0.1, step=0.01)
 
 # Calculate efficient frontier
-frontier = efficient_frontier(returns[tickers], cov_matrix.loc[tickers, tickers])
+frontier = cached_efficient_frontier(returns[tickers], cov_matrix.loc[tickers, tickers])
 
 # Plot efficient frontier
 fig = px.scatter(frontier, x='Volatility', y='Return', title='Frontière Efficiente')
 st.plotly_chart(fig)
 
 # Display optimal weights
-weights = optimize_portfolio(returns[tickers], cov_matrix.loc[tickers, tickers], target_return)
-st.write("Poids optimaux du portefeuille :", pd.Series(weights, index=tickers))
\ No newline at end of file
+weights = cached_optimize_portfolio(returns[tickers], cov_matrix.loc[tickers, tickers],
+                                    target_return)
+st.write("Poids optimaux du portefeuille :", pd.Series(weights, index=tickers))
+
+# Display the tangency portfolio (maximum Sharpe ratio)
+risk_free_rate = st.slider("Taux sans risque", min_value=0.0, max_value=0.05, value=0.01,
+                           step=0.005)
+tangency_weights = cached_max_sharpe_portfolio(returns[tickers], cov_matrix.loc[tickers, tickers],
+                                               risk_free_rate)
+st.write("Portefeuille de ratio de Sharpe maximal :", pd.Series(tangency_weights, index=tickers))
@@ -14,9 +14,14 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from simple_portfolio import (
     calculate_returns,
-    calculate_portfolio_metrics,
-    optimize_portfolio
+    cached_optimize_portfolio
 )
+from src.models.universe import UniverseStatistics
+
+# Budget de temps de l'optimisation (secondes) pour garder l'interface réactive
+OPTIMIZATION_TIME_BUDGET = 0.2
+# Graine des simulations : un même réglage donne le même portefeuille (et se met en cache)
+OPTIMIZATION_SEED = 42
 
 # Configuration de la page (commenté car maintenant appelé dans streamlit_app.py)
 # st.set_page_config(
@@ -102,6 +107,12 @@ def load_data():
 
 prices, returns = load_data()
 
+# Statistiques de tout l'univers, calculées une fois et partagées entre les sessions :
+# changer la sélection d'actifs ne fait qu'extraire une sous-matrice
+@st.cache_resource(show_spinner=False)
+def load_universe_statistics(returns):
+    return UniverseStatistics(returns)
+
 # Sélection des actifs
 # Utiliser les colonnes disponibles dans le DataFrame returns
 if returns is not None:
@@ -117,6 +128,8 @@ if returns is not None:
     st.sidebar.subheader("Paramètres d'optimisation")
     risk_free_rate = st.sidebar.slider("Taux sans risque (%)", 0.0, 5.0, 1.0) / 100
     n_portfolios = st.sidebar.slider("Nombre de portefeuilles à simuler", 1000, 10000, 5000)
+    lookback = st.sidebar.slider("Historique d'estimation (jours)", min(60, len(returns)),
+                                 len(returns), len(returns))
 else:
     st.error("Impossible de charger les données. Veuillez exécuter le script de collecte de données.")
     st.stop()
@@ -130,11 +143,22 @@ if prices is not None and returns is not None:
         returns_filtered = returns[default_tickers[:5]]
 
     # Calculer les métriques du portefeuille
-    expected_returns, cov_matrix = calculate_portfolio_metrics(returns_filtered)
+    expected_returns, cov_matrix = load_universe_statistics(returns).subset(
+        returns_filtered.columns, lookback
+    )
 
     # Optimisation du portefeuille
     with st.spinner("Optimisation du portefeuille en cours..."):
-        frontier, optimal_weights = optimize_portfolio(expected_returns, cov_matrix, n_portfolios)
+        frontier, optimal_weights, optimization_info = cached_optimize_portfolio(
+            expected_returns, cov_matrix, n_portfolios, risk_free_rate=risk_free_rate,
+            random_state=OPTIMIZATION_SEED, time_budget=OPTIMIZATION_TIME_BUDGET,
+            return_info=True
+        )
+    if not optimization_info['completed']:
+        st.caption(
+            f"Optimisation limitée à {optimization_info['n_samples']} portefeuilles "
+            f"(budget de {OPTIMIZATION_TIME_BUDGET * 1000:.0f} ms)"
+        )
 
     # Afficher les résultats dans deux colonnes
     col1, col2 = st.columns(2)
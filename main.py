@@ -12,7 +12,12 @@ try:
     # Essayer d'importer les modules du projet
     from src.data.data_collection import fetch_stock_data
     from src.data.preprocessing import preprocess_data
-    from src.models.mpt import calculate_portfolio_metrics, optimize_portfolio, efficient_frontier
+    from src.models.mpt import (
+        calculate_portfolio_metrics,
+        optimize_portfolio,
+        efficient_frontier,
+        max_sharpe_portfolio
+    )
     from src.models.ml_models import prepare_ml_data, train_models
     from src.models.optimization import backtest_portfolio
     from src.visualization.visualize import (
@@ -22,7 +27,9 @@ try:
         plot_portfolio_performance
     )
     from src.models.ml_prediction import prepare_features, train_models as train_ml_models, save_models, predict_returns
+    from src.models.ml_prediction import train_panel_model, save_panel_model, predict_panel_returns
     from src.models.backtest import backtest_strategy, compare_strategies, plot_strategy_comparison
+    from src.models.performance import performance_table
 
     # Modules disponibles
     MODULES_AVAILABLE = True
@@ -73,21 +80,20 @@ def run_portfolio_optimization(returns):
     ef = efficient_frontier(expected_returns, cov_matrix)
     ef.to_csv('data/processed/efficient_frontier.csv')
 
-    # Trouver le portefeuille optimal (ratio de Sharpe maximal)
+    # Trouver le portefeuille optimal (ratio de Sharpe maximal) en une seule optimisation
     # Taux sans risque supposé à 0.01 (1%)
     risk_free_rate = 0.01
-    sharpe_ratios = (ef['Return'] - risk_free_rate) / ef['Volatility']
-    optimal_idx = sharpe_ratios.idxmax()
-    optimal_portfolio = ef.iloc[optimal_idx]
+    weights = max_sharpe_portfolio(expected_returns, cov_matrix, risk_free_rate)
+    optimal_return = weights @ expected_returns.values
+    optimal_volatility = np.sqrt(weights @ cov_matrix.values @ weights)
 
     # Sauvegarder les poids optimaux
-    weights = optimal_portfolio['Weights']
     pd.Series(weights, index=returns.columns).to_csv('data/processed/optimal_weights.csv')
 
     # Visualiser la frontière efficiente
     fig = plot_efficient_frontier(
         ef,
-        optimal_portfolio=(optimal_portfolio['Return'], optimal_portfolio['Volatility']),
+        optimal_portfolio=(optimal_return, optimal_volatility),
         save_path='reports/figures/efficient_frontier.html'
     )
 
@@ -150,21 +156,27 @@ def run_backtest(returns, predicted_returns, cov_matrix):
 
     return portfolio_values, benchmark
 
-def run_ml_prediction_pipeline(returns):
+def run_ml_prediction_pipeline(returns, panel=False):
     """Exécuter le pipeline de prédiction ML avec les nouveaux modèles."""
     print("Exécution du pipeline de prédiction ML...")
 
     # Préparer les caractéristiques
     X, y = prepare_features(returns)
 
-    # Entraîner les modèles
-    models, X_test, y_test, scalers = train_ml_models(X, y)
+    if panel:
+        # Un seul modèle pour tous les tickers, indicatrices des tickers en caractéristiques
+        panel_model, X_test, y_test = train_panel_model(X, y, ticker_codes=True, n_jobs=-1)
+        save_panel_model(panel_model)
+        predictions = predict_panel_returns(panel_model, X)
+    else:
+        # Entraîner les modèles (un processus par ticker, tous les CPU)
+        models, X_test, y_test, scalers = train_ml_models(X, y, n_jobs=-1)
 
-    # Sauvegarder les modèles
-    save_models(models, scalers)
+        # Sauvegarder les modèles
+        save_models(models, scalers)
 
-    # Prédire les rendements futurs
-    predictions = predict_returns(models, X, scalers)
+        # Prédire les rendements futurs
+        predictions = predict_returns(models, X, scalers)
     predictions.to_csv('data/processed/ml_predicted_returns.csv')
 
     print("Prédictions des rendements futurs :")
@@ -197,7 +209,11 @@ def run_strategy_comparison(returns):
     }
 
     # Comparer les stratégies
-    comparison, portfolio_values = compare_strategies(returns, strategies)
+    _, portfolio_values = compare_strategies(returns, strategies)
+
+    # Métriques de toutes les stratégies, calculées en une passe : le fichier et la
+    # console montrent le même tableau
+    comparison = performance_table(portfolio_values)
 
     # Sauvegarder les résultats
     comparison.to_csv('data/processed/strategy_comparison.csv')
@@ -207,17 +223,16 @@ def run_strategy_comparison(returns):
     plot_strategy_comparison(portfolio_values, 'reports/figures/strategy_comparison.png')
 
     # Afficher les métriques
+    formatted = comparison.copy().astype(object)
+    for column in ['Rendement Total', 'Rendement Annualisé', 'Volatilité Annualisée',
+                   'Drawdown Maximal']:
+        formatted[column] = comparison[column].map('{:.2%}'.format)
+    for column in ['Ratio de Sharpe', 'Ratio de Sortino', 'Ratio de Calmar']:
+        formatted[column] = comparison[column].map('{:.2f}'.format)
+    formatted['Durée Drawdown Maximale'] = (comparison['Durée Drawdown Maximale']
+                                            .map('{:d} jours'.format))
     print("\nComparaison des stratégies :")
-    for strategy in strategies.keys():
-        metrics = comparison[comparison['Stratégie'] == strategy]
-        print(f"\n{strategy}:")
-        for _, row in metrics.iterrows():
-            value = row['Valeur']
-            if row['Métrique'] in ['Rendement Total', 'Rendement Annualisé', 'Volatilité Annualisée', 'Drawdown Maximal']:
-                value = f"{value:.2%}"
-            elif row['Métrique'] == 'Ratio de Sharpe':
-                value = f"{value:.2f}"
-            print(f"  {row['Métrique']}: {value}")
+    print(formatted.T.to_string())
 
     return comparison, portfolio_values
 
@@ -278,6 +293,9 @@ def parse_arguments():
     parser.add_argument('--end-date', type=str, default='2023-01-01',
                         help='Date de fin pour les données (format: YYYY-MM-DD)')
 
+    parser.add_argument('--panel-model', action='store_true',
+                        help='Entraîner un seul modèle ML commun à tous les tickers')
+
     return parser.parse_args()
 
 def main():
@@ -330,7 +348,7 @@ def main():
 
         # Nouveau pipeline ML
         try:
-            predicted_returns = run_ml_prediction_pipeline(returns)
+            predicted_returns = run_ml_prediction_pipeline(returns, panel=args.panel_model)
         except Exception as e:
             print(f"Erreur lors de l'exécution du pipeline ML: {e}")
             predicted_returns = predicted_returns_old
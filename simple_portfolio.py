@@ -4,8 +4,13 @@ Script simplifié pour démontrer l'optimisation de portefeuille sans dépendanc
 import pandas as pd
 import numpy as np
 import os
+import sys
+import time
+import warnings
 import matplotlib.pyplot as plt
 
+from src.models.cache import memoize
+
 # Créer les répertoires nécessaires
 os.makedirs('data/raw', exist_ok=True)
 os.makedirs('data/processed', exist_ok=True)
@@ -61,43 +66,376 @@ def calculate_portfolio_metrics(returns):
     cov_matrix = returns.cov() * 252  # Annualiser la covariance
     return expected_returns, cov_matrix
 
+# Stratégies d'échantillonnage des poids
+SAMPLING_METHODS = ('uniform', 'dirichlet', 'sobol', 'vertex')
+
+def _integers(rng, high, size=None):
+    """Entiers aléatoires dans [0, high) pour un Generator ou le générateur global."""
+    if hasattr(rng, 'integers'):
+        return rng.integers(high, size=size)
+    return rng.randint(high, size=size)
+
+def weight_sampler(n_assets, method='uniform', alpha=1.0, random_state=None):
+    """
+    Crée une fonction qui tire des blocs de poids sur le simplexe (somme = 1, poids >= 0).
+
+    Parameters:
+    - n_assets: Nombre d'actifs
+    - method: Stratégie d'échantillonnage
+        - 'uniform': tirages uniformes normalisés (méthode historique)
+        - 'dirichlet': loi de Dirichlet de concentration `alpha` (alpha < 1 favorise
+          les portefeuilles concentrés)
+        - 'sobol': séquence de Sobol brouillée projetée sur le simplexe
+          (quasi-aléatoire, Dirichlet de concentration `alpha`)
+        - 'vertex': mélange de sommets (un seul actif), d'arêtes (deux actifs) et de
+          tirages de Dirichlet, pour couvrir les bords du simplexe
+    - alpha: Paramètre de concentration des méthodes 'dirichlet', 'sobol' et 'vertex'
+    - random_state: Graine ou générateur NumPy (par défaut : générateur global np.random)
+
+    Returns:
+    - draw: Fonction draw(size) renvoyant un array (size, n_assets) de poids
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Méthode d'échantillonnage inconnue : {method}")
+
+    rng = np.random if random_state is None else np.random.default_rng(random_state)
+
+    if method == 'uniform':
+        def draw(size):
+            weights = rng.random((size, n_assets))
+            return weights / weights.sum(axis=1, keepdims=True)
+
+    elif method == 'dirichlet':
+        def draw(size):
+            return rng.dirichlet(np.full(n_assets, alpha), size)
+
+    elif method == 'sobol':
+        from scipy.stats import gamma, qmc
+
+        seed = _integers(rng, 2**31 - 1)
+        engine = qmc.Sobol(d=n_assets, scramble=True, seed=int(seed))
+
+        def draw(size):
+            with warnings.catch_warnings():
+                # Les propriétés d'équilibre exigent des blocs de taille 2^m
+                warnings.simplefilter('ignore', UserWarning)
+                points = engine.random(size)
+            # Transformation inverse vers des lois Gamma, puis normalisation (Dirichlet)
+            weights = gamma.ppf(points, alpha)
+            return weights / weights.sum(axis=1, keepdims=True)
+
+    else:
+        def draw(size):
+            weights = rng.dirichlet(np.full(n_assets, alpha), size)
+            kind = rng.random(size)
+            rows = np.arange(size)
+
+            # 10 % de sommets, 30 % d'arêtes, le reste à l'intérieur du simplexe
+            vertex = kind < 0.1
+            edge = (kind >= 0.1) & (kind < 0.4)
+            first = _integers(rng, n_assets, size)
+            second = (first + 1 + (rng.random(size) * (n_assets - 1)).astype(int)) % n_assets
+            split = rng.random(size)
+
+            weights[vertex | edge] = 0.0
+            weights[rows[vertex], first[vertex]] = 1.0
+            if n_assets > 1:
+                weights[rows[edge], first[edge]] = split[edge]
+                weights[rows[edge], second[edge]] = 1.0 - split[edge]
+            else:
+                weights[rows[edge], 0] = 1.0
+            return weights
+
+    return draw
+
+# Recherche aléatoire reprise bloc par bloc
+class MonteCarloSearch:
+    """
+    Recherche du portefeuille de ratio de Sharpe maximal par simulation, interruptible.
+
+    Les portefeuilles sont tirés par blocs de `chunk_size` : rendements et variances d'un
+    bloc sont calculés en un seul produit matriciel, et seul le meilleur portefeuille
+    est conservé d'un bloc à l'autre. La recherche peut être poursuivie par appels
+    successifs à `run`, avec un nombre de tirages ou un budget de temps.
+
+    Parameters:
+    - expected_returns: Rendements attendus annualisés
+    - cov_matrix: Matrice de covariance annualisée
+    - risk_free_rate: Taux sans risque annualisé
+    - chunk_size: Nombre de portefeuilles évalués par bloc
+    - frontier_stride: Un tirage sur `frontier_stride` est conservé dans la frontière
+    - max_frontier_points: Nombre maximal de points de frontière conservés ; au-delà, le
+      pas de sous-échantillonnage est doublé
+    - random_state: Graine ou générateur NumPy (par défaut : générateur global np.random)
+    - method: Stratégie d'échantillonnage des poids (voir `weight_sampler`)
+    - alpha: Paramètre de concentration des stratégies de type Dirichlet
+    """
+
+    def __init__(self, expected_returns, cov_matrix, risk_free_rate=0.01, chunk_size=10000,
+                 frontier_stride=1, max_frontier_points=None, random_state=None,
+                 method='uniform', alpha=1.0):
+        self.mean = np.asarray(expected_returns, dtype=float)
+        self.cov = np.asarray(cov_matrix, dtype=float)
+        self.risk_free_rate = risk_free_rate
+        self.chunk_size = chunk_size
+        self.stride = frontier_stride
+        self.max_frontier_points = max_frontier_points
+        self._draw = weight_sampler(len(self.mean), method, alpha, random_state)
+
+        self.n_evaluated = 0
+        self.elapsed = 0.0
+        self.best_sharpe, self.best_index, self.best_weights = -np.inf, None, None
+        self._kept_index, self._kept_results = [], []
+        self._history = []
+
+    def run(self, n_portfolios, time_budget=None):
+        """
+        Évalue jusqu'à `n_portfolios` nouveaux portefeuilles.
+
+        Parameters:
+        - n_portfolios: Nombre maximal de portefeuilles à évaluer
+        - time_budget: Budget de temps (secondes) ; la recherche s'arrête à la fin du
+          premier bloc qui dépasse le budget
+
+        Returns:
+        - self
+        """
+        start_time = time.perf_counter()
+        target = self.n_evaluated + n_portfolios
+
+        while self.n_evaluated < target:
+            start = self.n_evaluated
+            size = min(self.chunk_size, target - start)
+
+            # Générer un bloc de poids aléatoires
+            weights = self._draw(size)
+
+            # Rendements et volatilités du bloc
+            returns = weights @ self.mean
+            volatilities = np.sqrt(np.einsum('ij,ij->i', weights @ self.cov, weights))
+            sharpe = (returns - self.risk_free_rate) / volatilities
+
+            # Réduction en ligne du ratio de Sharpe maximal
+            i = np.argmax(sharpe)
+            if sharpe[i] > self.best_sharpe or self.best_weights is None:
+                self.best_sharpe, self.best_index = sharpe[i], start + i
+                self.best_weights = weights[i].copy()
+
+            keep = np.arange(-start % self.stride, size, self.stride)
+            self._kept_index.append(start + keep)
+            self._kept_results.append(
+                np.column_stack([returns[keep], volatilities[keep], sharpe[keep]]))
+
+            self.n_evaluated += size
+            self._history.append((self.n_evaluated, self.best_sharpe))
+            self._compact_frontier()
+
+            if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                break
+
+        self.elapsed += time.perf_counter() - start_time
+        return self
+
+    def _compact_frontier(self):
+        """Double le pas de sous-échantillonnage si la frontière dépasse sa taille maximale."""
+        if self.max_frontier_points is None:
+            return
+        n_kept = sum(len(index) for index in self._kept_index)
+        while n_kept > self.max_frontier_points:
+            self.stride *= 2
+            index = np.concatenate(self._kept_index)
+            results = np.vstack(self._kept_results)
+            mask = index % self.stride == 0
+            self._kept_index, self._kept_results = [index[mask]], [results[mask]]
+            n_kept = mask.sum()
+
+    def result(self):
+        """
+        Renvoie la frontière simulée et le meilleur portefeuille trouvés jusqu'ici.
+
+        Returns:
+        - frontier: DataFrame des portefeuilles simulés (Return, Volatility, Sharpe)
+        - optimal_weights: Poids du portefeuille de ratio de Sharpe maximal
+        """
+        index = np.concatenate(self._kept_index) if self._kept_index else np.array([], int)
+        results = np.vstack(self._kept_results) if self._kept_results else np.empty((0, 3))
+        if self.stride > 1 and self.best_index is not None and self.best_index % self.stride:
+            best = self.best_weights
+            index = np.append(index, self.best_index)
+            results = np.vstack([results, [best @ self.mean, np.sqrt(best @ self.cov @ best),
+                                           self.best_sharpe]])
+
+        # Créer un DataFrame pour la frontière efficiente
+        frontier = pd.DataFrame(results, columns=['Return', 'Volatility', 'Sharpe'])
+        if self.stride > 1:
+            frontier.index = index
+
+        return frontier, self.best_weights
+
+    def info(self):
+        """
+        Indicateurs de convergence de la recherche.
+
+        Returns:
+        - info: Dictionnaire avec le nombre de portefeuilles évalués, le temps passé, le
+          meilleur ratio de Sharpe et son amélioration relative sur la seconde moitié des
+          tirages (proche de 0 lorsque la recherche stagne)
+        """
+        improvement = np.nan
+        if self._history:
+            half = self.n_evaluated / 2
+            earlier = [sharpe for n, sharpe in self._history if n <= half]
+            if earlier and np.isfinite(earlier[-1]) and self.best_sharpe != 0:
+                improvement = (self.best_sharpe - earlier[-1]) / abs(self.best_sharpe)
+        return {
+            'n_samples': self.n_evaluated,
+            'time': self.elapsed,
+            'best_sharpe': self.best_sharpe,
+            'improvement': improvement
+        }
+
+    def refine_in_background(self, max_portfolios=None, time_slice=0.05):
+        """
+        Poursuit la recherche dans un thread d'arrière-plan.
+
+        Parameters:
+        - max_portfolios: Nombre total de portefeuilles au-delà duquel la recherche s'arrête
+          (par défaut : jusqu'à l'appel de `stop`)
+        - time_slice: Durée d'une tranche de calcul (secondes)
+
+        Returns:
+        - refiner: BackgroundRefiner démarré ; refiner.result() renvoie
+          (frontier, optimal_weights, info)
+        """
+        from src.models.anytime import BackgroundRefiner
+
+        def step(time_budget):
+            if max_portfolios is None:
+                # Pas de limite : la tranche de temps borne le nombre de tirages
+                remaining = sys.maxsize
+            else:
+                remaining = max_portfolios - self.n_evaluated
+            if remaining > 0:
+                self.run(remaining, time_budget)
+            done = max_portfolios is not None and self.n_evaluated >= max_portfolios
+            return (*self.result(), self.info()), done
+
+        return BackgroundRefiner(step, time_slice, (*self.result(), self.info())).start()
+
 # Optimisation de portefeuille simplifiée
-def optimize_portfolio(expected_returns, cov_matrix, n_portfolios=10000):
+def optimize_portfolio(expected_returns, cov_matrix, n_portfolios=10000, risk_free_rate=0.01,
+                       chunk_size=10000, max_frontier_points=None, random_state=None,
+                       method='uniform', alpha=1.0, time_budget=None, return_info=False):
     """
     Optimisation de portefeuille simplifiée en générant des portefeuilles aléatoires.
+
+    Les poids ne sont jamais stockés pour l'ensemble des tirages (voir `MonteCarloSearch`).
+
+    Parameters:
+    - expected_returns: Rendements attendus annualisés
+    - cov_matrix: Matrice de covariance annualisée
+    - n_portfolios: Nombre de portefeuilles à simuler
+    - risk_free_rate: Taux sans risque annualisé
+    - chunk_size: Nombre de portefeuilles évalués par bloc
+    - max_frontier_points: Nombre maximal de points conservés dans la frontière
+      (sous-échantillonnage régulier, le portefeuille optimal est toujours inclus)
+    - random_state: Graine ou générateur NumPy (par défaut : générateur global np.random)
+    - method: Stratégie d'échantillonnage des poids (voir `weight_sampler`)
+    - alpha: Paramètre de concentration des stratégies de type Dirichlet
+    - time_budget: Budget de temps (secondes) ; renvoie le meilleur portefeuille trouvé
+      lorsque le budget est épuisé, même si moins de `n_portfolios` ont été simulés
+    - return_info: Renvoyer aussi les indicateurs de convergence (voir `MonteCarloSearch.info`)
+
+    Returns:
+    - frontier: DataFrame des portefeuilles simulés (Return, Volatility, Sharpe)
+    - optimal_weights: Poids du portefeuille de ratio de Sharpe maximal
+    - info: Indicateurs de convergence (si return_info)
     """
-    n_assets = len(expected_returns)
-    results = np.zeros((3, n_portfolios))
-    weights_record = []
-    
-    for i in range(n_portfolios):
-        # Générer des poids aléatoires
-        weights = np.random.random(n_assets)
-        weights /= np.sum(weights)
-        weights_record.append(weights)
-        
-        # Calculer le rendement attendu
-        portfolio_return = np.sum(expected_returns * weights)
-        
-        # Calculer la volatilité du portefeuille
-        portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-        
-        # Calculer le ratio de Sharpe (supposant un taux sans risque de 1%)
-        results[0, i] = portfolio_return
-        results[1, i] = portfolio_volatility
-        results[2, i] = (portfolio_return - 0.01) / portfolio_volatility
-    
-    # Trouver le portefeuille avec le ratio de Sharpe maximal
-    max_sharpe_idx = np.argmax(results[2])
-    
-    # Créer un DataFrame pour la frontière efficiente
-    frontier = pd.DataFrame({
-        'Return': results[0],
-        'Volatility': results[1],
-        'Sharpe': results[2]
-    })
-    
-    return frontier, weights_record[max_sharpe_idx]
+    # Pas d'échantillonnage de la frontière pour borner la mémoire
+    stride = 1
+    if max_frontier_points is not None and n_portfolios > max_frontier_points:
+        stride = -(-n_portfolios // max_frontier_points)
+
+    search = MonteCarloSearch(expected_returns, cov_matrix, risk_free_rate, chunk_size, stride,
+                              max_frontier_points, random_state, method, alpha)
+    search.run(n_portfolios, time_budget)
+    frontier, optimal_weights = search.result()
+
+    if return_info:
+        info = search.info()
+        info['completed'] = search.n_evaluated >= n_portfolios
+        return frontier, optimal_weights, info
+    return frontier, optimal_weights
+
+def _search_completed(arguments, result):
+    """Vrai si la recherche a simulé tous ses portefeuilles (résultat reproductible)."""
+    if arguments['time_budget'] is None:
+        return True
+    return arguments['return_info'] and result[2]['completed']
+
+# Version mémorisée pour les tableaux de bord (voir src/models/cache.py) ; une recherche
+# interrompue par son budget de temps n'est pas mémorisée
+cached_optimize_portfolio = memoize(optimize_portfolio, cacheable=_search_completed)
+
+# Qualité de l'échantillonnage
+def sampling_convergence_report(expected_returns, cov_matrix, sample_sizes=(1000, 10000, 100000),
+                                methods=SAMPLING_METHODS, alpha=1.0, risk_free_rate=0.01,
+                                random_state=0, n_jobs=1):
+    """
+    Mesure l'écart entre le meilleur portefeuille simulé et le portefeuille tangent exact.
+
+    Parameters:
+    - expected_returns: Rendements attendus annualisés
+    - cov_matrix: Matrice de covariance annualisée
+    - sample_sizes: Nombres de portefeuilles simulés à comparer
+    - methods: Stratégies d'échantillonnage à comparer
+    - alpha: Paramètre de concentration des stratégies de type Dirichlet
+    - risk_free_rate: Taux sans risque annualisé
+    - random_state: Graine commune à toutes les simulations
+    - n_jobs: Nombre de processus pour les simulations (-1 : un par CPU) ; le rapport
+      est identique à celui de l'exécution en série
+
+    Returns:
+    - report: DataFrame (une ligne par méthode et taille d'échantillon) avec le meilleur
+      ratio de Sharpe simulé, le ratio de Sharpe exact, l'écart relatif et la distance L1
+      entre les poids simulés et les poids exacts
+    """
+    from src.models.mpt import max_sharpe_portfolio
+    from src.models.parallel import effective_n_jobs, parallel_map
+
+    if random_state is None and effective_n_jobs(n_jobs) > 1:
+        raise ValueError("Une exécution parallèle reproductible exige une graine (random_state)")
+
+    mean = np.asarray(expected_returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    exact_weights = max_sharpe_portfolio(mean, cov, risk_free_rate)
+    exact_sharpe = ((exact_weights @ mean - risk_free_rate)
+                    / np.sqrt(exact_weights @ cov @ exact_weights))
+
+    tasks = [(method, n_portfolios, alpha, risk_free_rate, random_state)
+             for method in methods for n_portfolios in sample_sizes]
+    results = parallel_map(_best_sampled_portfolio, tasks, {'mean': mean, 'cov': cov}, n_jobs)
+
+    rows = []
+    for (method, n_portfolios, *_), (best_sharpe, weights) in zip(tasks, results):
+        rows.append({
+            'Method': method,
+            'Samples': n_portfolios,
+            'Best Sharpe': best_sharpe,
+            'Exact Sharpe': exact_sharpe,
+            'Sharpe Gap': (exact_sharpe - best_sharpe) / abs(exact_sharpe),
+            'Weight Distance': np.abs(weights - exact_weights).sum()
+        })
+
+    return pd.DataFrame(rows)
+
+def _best_sampled_portfolio(arrays, method, n_portfolios, alpha, risk_free_rate, random_state):
+    """Meilleur ratio de Sharpe et poids d'une simulation (exécutable dans un worker)."""
+    frontier, weights = optimize_portfolio(
+        arrays['mean'], arrays['cov'], n_portfolios, risk_free_rate=risk_free_rate,
+        max_frontier_points=1, random_state=random_state, method=method, alpha=alpha
+    )
+    return frontier['Sharpe'].max(), weights
 
 # Visualiser la frontière efficiente
 def plot_efficient_frontier(frontier, optimal_weights, tickers):
@@ -0,0 +1,138 @@
+"""
+Module pour l'optimisation "anytime" : affiner une solution en arrière-plan.
+
+Les optimiseurs interactifs (tableaux de bord) renvoient d'abord la meilleure solution
+trouvée dans un budget de temps, puis peuvent continuer à l'améliorer dans un thread
+pendant que l'interface reste réactive. BackgroundRefiner enchaîne des tranches de
+calcul (recherches qui reprennent où elles s'étaient arrêtées) ; BackgroundSolver
+exécute une résolution d'un seul tenant et publie ses itérés au fil de l'eau.
+"""
+import threading
+
+
+class BackgroundRefiner:
+    """
+    Affine une solution dans un thread d'arrière-plan, par tranches de temps.
+
+    Parameters:
+    - step: Fonction step(time_budget) qui poursuit l'optimisation pendant au plus
+      time_budget secondes et renvoie (result, done)
+    - time_slice: Durée d'une tranche de calcul (secondes)
+    - initial_result: Résultat disponible avant la première tranche (optionnel)
+    """
+
+    def __init__(self, step, time_slice=0.1, initial_result=None):
+        self._step = step
+        self.time_slice = time_slice
+        self._result = initial_result
+        self._error = None
+        self._done = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                result, done = self._step(self.time_slice)
+                with self._lock:
+                    self._result = result
+                    self._done = done
+                if done:
+                    break
+        except Exception as e:
+            with self._lock:
+                self._error = e
+
+    def start(self):
+        """Démarre l'affinage et renvoie l'objet lui-même."""
+        self._thread.start()
+        return self
+
+    def result(self):
+        """
+        Renvoie la meilleure solution disponible à cet instant.
+
+        Returns:
+        - result: Dernier résultat produit par `step` (ou le résultat initial)
+        """
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            return self._result
+
+    @property
+    def done(self):
+        """True si l'optimisation a convergé ou épuisé son budget de calcul."""
+        with self._lock:
+            return self._done
+
+    @property
+    def running(self):
+        """True tant que le thread d'affinage est actif."""
+        return self._thread.is_alive()
+
+    def stop(self, wait=True):
+        """
+        Arrête l'affinage à la fin de la tranche (ou de l'itération) en cours.
+
+        Parameters:
+        - wait: Attendre la fin du thread avant de rendre la main
+
+        Returns:
+        - result: Meilleure solution disponible
+        """
+        self._stop_event.set()
+        if wait and self._thread.is_alive():
+            self._thread.join()
+        return self.result()
+
+    def wait(self, timeout=None):
+        """
+        Attend la fin de l'affinage (convergence ou arrêt).
+
+        Parameters:
+        - timeout: Durée maximale d'attente (secondes)
+
+        Returns:
+        - result: Meilleure solution disponible
+        """
+        self._thread.join(timeout)
+        return self.result()
+
+
+class BackgroundSolver(BackgroundRefiner):
+    """
+    Exécute une optimisation complète dans un thread, en publiant ses itérés.
+
+    Un solveur quasi-Newton (SLSQP) perd son estimation du hessien à chaque redémarrage :
+    il tourne donc sans interruption, et chaque itéré publié ne remplace la solution
+    courante que s'il est admissible et de meilleur objectif.
+
+    Parameters:
+    - solve: Fonction solve(publish) qui résout le problème ; elle appelle
+      publish(result, objective, feasible) à chaque itéré, et doit s'interrompre quand
+      publish renvoie True (arrêt demandé)
+    - initial_result: Résultat disponible avant le premier itéré (optionnel)
+    """
+
+    def __init__(self, solve, initial_result=None):
+        super().__init__(None, None, initial_result)
+        self._solve = solve
+        self.objective = None
+
+    def _publish(self, result, objective, feasible=True):
+        with self._lock:
+            if feasible and (self.objective is None or objective <= self.objective):
+                self._result = result
+                self.objective = objective
+        return self._stop_event.is_set()
+
+    def _run(self):
+        try:
+            self._solve(self._publish)
+            with self._lock:
+                self._done = True
+        except Exception as e:
+            with self._lock:
+                self._error = e
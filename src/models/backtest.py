@@ -5,92 +5,425 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+import copy
 import os
+import joblib
 
+from src.models.cache import hash_inputs
+from src.models.costs import turnover_metrics
+from src.models.features import FeatureStore
 from src.models.ml_prediction import prepare_features, predict_returns, load_models
+from src.models.moments import RollingMoments
+from src.models.parallel import effective_n_jobs, parallel_map
+from src.models.rebalancing import CalendarPolicy, simulate_policy
 from simple_portfolio import calculate_portfolio_metrics, optimize_portfolio
 
-def backtest_strategy(returns, window_size=252, rebalance_freq=21, use_ml=False, risk_free_rate=0.01):
+def backtest_strategy(returns, window_size=252, rebalance_freq=21, use_ml=False,
+                      risk_free_rate=0.01, drift=False, n_jobs=1, random_state=None,
+                      moment_store=True, ml_models=None, return_state=False,
+                      rebalance_policy=None, return_info=False, cost_model=None,
+                      feature_store=True):
     """
     Backtest une stratégie d'optimisation de portefeuille.
     
+    Le backtest se fait en deux phases : les optimisations de toutes les dates de
+    rééquilibrage, qui ne dépendent que de leur fenêtre de rendements passés, puis
+    une passe séquentielle peu coûteuse qui applique les rendements.
+    
     Parameters:
     - returns: DataFrame des rendements journaliers
     - window_size: Taille de la fenêtre pour l'estimation des paramètres (jours)
     - rebalance_freq: Fréquence de rééquilibrage (jours)
     - use_ml: Utiliser les prédictions ML pour les rendements attendus
     - risk_free_rate: Taux sans risque annualisé
+    - drift: Laisser dériver les poids avec les prix entre deux rééquilibrages (par défaut,
+      les poids cibles sont maintenus chaque jour)
+    - n_jobs: Nombre de processus pour les optimisations (-1 : un par CPU)
+    - random_state: Graine des simulations Monte Carlo ; chaque rééquilibrage reçoit sa
+      propre sous-graine, si bien que le résultat ne dépend pas de n_jobs. Obligatoire
+      en parallèle ; sans graine, le générateur global est utilisé dans l'ordre des dates
+    - moment_store: Lire les moyennes et covariances des fenêtres dans un RollingMoments
+      (égales aux arrondis près) plutôt que de recalculer chaque fenêtre avec pandas ;
+      accepte aussi un RollingMoments déjà construit sur `returns`
+    - ml_models: Tuple (models, scalers) déjà chargé, pour éviter de relire les modèles ML
+    - return_state: Renvoyer aussi l'état final du backtest, que resume_backtest prolonge
+      sur les jours ajoutés ensuite (rééquilibrage calendaire uniquement)
+    - rebalance_policy: Politique de rééquilibrage (src.models.rebalancing) ; None ou
+      CalendarPolicy pour des dates fixes. Avec une politique à seuil (BandPolicy,
+      VolatilityPolicy), les poids dérivent entre deux rééquilibrages (drift=True
+      obligatoire ; ni return_state ni drift=False) et l'optimiseur n'est appelé qu'aux
+      jours déclencheurs
+    - return_info: Renvoyer aussi un dictionnaire de diagnostic des rééquilibrages
+    - cost_model: TransactionCostModel (src.models.costs) des frais et de l'impact de
+      marché ; les coûts sont déduits des valeurs et les statistiques de rotation
+      ajoutées aux métriques. Avec drift=False, maintenir les poids cibles est une
+      transaction quotidienne
+    - feature_store: Avec use_ml, lire les caractéristiques de chaque rééquilibrage dans
+      un FeatureStore calculé une fois par jour (égales aux arrondis float32 près) plutôt
+      que de les recalculer sur chaque fenêtre ; accepte aussi un FeatureStore déjà
+      construit sur `returns`
     
     Returns:
     - portfolio_values: Series des valeurs du portefeuille
     - all_weights: DataFrame des poids du portefeuille au fil du temps
     - metrics: DataFrame des métriques de performance
+    - state: (si return_state) Dictionnaire de l'état du backtest (voir resume_backtest)
+    - info: (si return_info) Dictionnaire : rebalance_dates, n_solves, calendar_solves
+      (optimisations d'un calendrier tous les rebalance_freq jours) et solves_avoided ;
+      avec un cost_model, costs et turnover (Series quotidiennes)
+    """
+    if isinstance(rebalance_policy, CalendarPolicy):
+        rebalance_freq = rebalance_policy.rebalance_freq
+        rebalance_policy = None
+    if (rebalance_policy is not None or cost_model is not None) and return_state:
+        raise ValueError("La reprise (return_state) exige un rééquilibrage calendaire "
+                         "sans coûts")
+    if rebalance_policy is not None and not drift:
+        raise ValueError("Une politique à seuil laisse dériver les poids : passer drift=True")
+    
+    params = {'window_size': window_size, 'rebalance_freq': rebalance_freq, 'use_ml': use_ml,
+              'risk_free_rate': risk_free_rate, 'drift': drift, 'random_state': random_state}
+    if use_ml and ml_models is None:
+        ml_models = _load_ml_models(returns.columns)
+    use_ml = use_ml and ml_models is not None
+    
+    dates = returns.index[window_size:]
+    calendar_days = np.arange(rebalance_freq, len(dates), rebalance_freq)
+    if isinstance(moment_store, RollingMoments):
+        moments = moment_store
+    elif moment_store:
+        # Points de contrôle alignés sur les débuts de fenêtre (tous les rebalance_freq jours)
+        moments = RollingMoments(returns, checkpoint=max(rebalance_freq, 21))
+    else:
+        moments = None
+    if not use_ml:
+        features = None
+    elif isinstance(feature_store, FeatureStore):
+        features = feature_store
+    elif feature_store:
+        features = FeatureStore(returns)
+    else:
+        features = None
+    
+    if rebalance_policy is None:
+        # Phase 1 : poids cibles, équipondérés au départ puis optimisés à chaque
+        # rééquilibrage (fenêtre d'estimation arrêtée à la veille du rééquilibrage)
+        rebalance_days = calendar_days
+        target_weights = np.vstack([
+            np.ones(len(returns.columns)) / len(returns.columns),
+            solve_rebalances(returns, window_size + rebalance_days - 1, window_size, use_ml,
+                             n_jobs, random_state, moments, ml_models, features=features)
+        ])
+        
+        # Phase 2 : simuler la valeur du portefeuille sur des tableaux numpy
+        values, weights = simulate_portfolio(returns.to_numpy(dtype=float)[window_size:],
+                                             rebalance_days, target_weights, drift)
+    else:
+        # Les dates dépendent de la trajectoire : une optimisation par jour déclencheur
+        def solve(rank, day):
+            return solve_rebalances(returns, np.array([window_size + day - 1]), window_size,
+                                    use_ml, 1, random_state, moments, ml_models,
+                                    seed_offset=rank, features=features)[0]
+        history = returns.to_numpy(dtype=float)
+        values, weights, rebalance_days = simulate_policy(history[window_size:], history,
+                                                          window_size, rebalance_policy, solve)
+    if cost_model is not None:
+        # Les coûts de chaque jour réduisent d'autant toute la suite de la trajectoire
+        costs, trades = cost_model.costs(returns, weights, values, start=window_size)
+        values = values * np.cumprod(1 - costs)
+    portfolio_values = pd.Series(values, index=dates)
+    all_weights = pd.DataFrame(weights, index=dates, columns=returns.columns)
+    
+    # Calculer les métriques de performance
+    metrics = calculate_performance_metrics(portfolio_values, dates, risk_free_rate)
+    if cost_model is not None:
+        metrics = pd.concat([metrics, turnover_metrics(trades, costs, dates)], ignore_index=True)
+    
+    results = (portfolio_values, all_weights, metrics)
+    if return_state:
+        results += (_backtest_state(returns, params, values, weights, rebalance_days,
+                                    target_weights[-1], moments, ml_models if use_ml else None,
+                                    features),)
+    if return_info:
+        results += ({
+            'rebalance_dates': dates[rebalance_days],
+            'n_solves': len(rebalance_days),
+            'calendar_solves': len(calendar_days),
+            'solves_avoided': len(calendar_days) - len(rebalance_days),
+        },)
+        if cost_model is not None:
+            results[-1]['costs'] = pd.Series(costs, index=dates)
+            results[-1]['turnover'] = pd.Series(np.abs(trades).sum(axis=1) / 2, index=dates)
+    return results
+
+def resume_backtest(returns, state, n_jobs=1, ml_models=None):
+    """
+    Prolonge un backtest sur les jours ajoutés à la fin des rendements.
+    
+    Seules les nouvelles dates de rééquilibrage sont optimisées, et la simulation n'est
+    rejouée que depuis le dernier rééquilibrage du point de contrôle. Avec une graine
+    (random_state), le résultat est identique à celui de backtest_strategy relancé sur
+    tout l'historique.
+    
+    Parameters:
+    - returns: DataFrame des rendements, historique du point de contrôle suivi des
+      nouveaux jours
+    - state: État renvoyé par backtest_strategy(return_state=True) ou par un appel
+      précédent ; il n'est pas modifié
+    - n_jobs: Nombre de processus pour les optimisations (-1 : un par CPU)
+    - ml_models: Tuple (models, scalers) déjà chargé ; doit être la version utilisée au
+      point de contrôle
+    
+    Returns:
+    - portfolio_values: Series des valeurs du portefeuille sur tout l'historique
+    - all_weights: DataFrame des poids du portefeuille au fil du temps
+    - metrics: DataFrame des métriques de performance
+    - state: Nouvel état du backtest
+    """
+    params = state['params']
+    n_rows = state['n_rows']
+    if (list(returns.columns) != state['tickers'] or len(returns) < n_rows
+            or hash_inputs(returns.iloc[:n_rows]) != state['history']):
+        raise ValueError("Les rendements ne prolongent pas l'historique du point de contrôle")
+    use_ml = params['use_ml']
+    if use_ml and ml_models is None:
+        ml_models = _load_ml_models(returns.columns)
+    use_ml = use_ml and ml_models is not None
+    if _model_version(ml_models if use_ml else None) != state['model_version']:
+        raise ValueError("Les modèles ML ont changé depuis le point de contrôle : "
+                         "relancer backtest_strategy sur tout l'historique")
+    
+    window_size = params['window_size']
+    dates = returns.index[window_size:]
+    rebalance_days = np.arange(params['rebalance_freq'], len(dates), params['rebalance_freq'])
+    solved = state['n_rebalances']
+    moments = state['moments']
+    if moments is not None and len(returns) > n_rows:
+        # La copie partage les tableaux existants, qu'append remplace sans les modifier
+        moments = copy.copy(moments)
+        moments.append(returns.iloc[n_rows:])
+    features = state.get('features')
+    if use_ml and features is None:
+        features = FeatureStore(returns)
+    elif features is not None and len(returns) > n_rows:
+        features = copy.copy(features)
+        features.append(returns.iloc[n_rows:])
+    
+    # Optimiser les seuls nouveaux rééquilibrages, avec leurs sous-graines du backtest complet
+    new_days = rebalance_days[solved:]
+    target_weights = np.vstack([
+        state['target'],
+        solve_rebalances(returns, window_size + new_days - 1, window_size, use_ml, n_jobs,
+                         params['random_state'], moments, ml_models, seed_offset=solved,
+                         features=features)
+    ])
+    
+    # Rejouer la simulation depuis le dernier rééquilibrage connu
+    start = state['last_rebalance']
+    tail_values, tail_weights = simulate_portfolio(
+        returns.to_numpy(dtype=float)[window_size + start:], new_days - start, target_weights,
+        params['drift'], initial_value=state['values'][start])
+    values = np.concatenate([state['values'][:start], tail_values])
+    weights = np.concatenate([state['weights'][:start], tail_weights])
+    portfolio_values = pd.Series(values, index=dates)
+    all_weights = pd.DataFrame(weights, index=dates, columns=returns.columns)
+    metrics = calculate_performance_metrics(portfolio_values, dates, params['risk_free_rate'])
+    
+    state = _backtest_state(returns, params, values, weights, rebalance_days,
+                            target_weights[-1], moments, ml_models if use_ml else None, features)
+    return portfolio_values, all_weights, metrics, state
+
+def _backtest_state(returns, params, values, weights, rebalance_days, target, moments, ml_models,
+                    features=None):
+    """État d'un backtest arrêté à la dernière ligne de returns."""
+    return {
+        'params': params,
+        'tickers': list(returns.columns),
+        'n_rows': len(returns),
+        'history': hash_inputs(returns),
+        'values': values,
+        'weights': weights,
+        'target': target,
+        'n_rebalances': len(rebalance_days),
+        'last_rebalance': int(rebalance_days[-1]) if len(rebalance_days) else 0,
+        'moments': moments,
+        'features': features,
+        'model_version': _model_version(ml_models),
+    }
+
+def _model_version(ml_models):
+    """Empreinte des modèles ML (None sans modèles)."""
+    return None if ml_models is None else joblib.hash(ml_models)
+
+def _load_ml_models(tickers):
+    """Charge les modèles ML, ou renvoie None s'ils ne sont pas disponibles."""
+    try:
+        return load_models(tickers)
+    except:
+        print("Modèles ML non disponibles. Utilisation des rendements historiques.")
+        return None
+
+def save_backtest_state(state, path):
     """
-    # Initialiser les variables
-    portfolio_values = pd.Series(index=returns.index[window_size:], dtype=float)
-    portfolio_values.iloc[0] = 1.0  # Valeur initiale du portefeuille
+    Sauvegarde l'état d'un backtest (point de contrôle).
     
-    all_weights = pd.DataFrame(index=returns.index[window_size:], columns=returns.columns)
-    all_weights.iloc[0] = np.ones(len(returns.columns)) / len(returns.columns)  # Poids initiaux équipondérés
+    Parameters:
+    - state: État renvoyé par backtest_strategy(return_state=True) ou resume_backtest
+    - path: Chemin du fichier
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    joblib.dump(state, path)
+
+def load_backtest_state(path):
+    """
+    Charge l'état d'un backtest sauvegardé par save_backtest_state.
+    
+    Parameters:
+    - path: Chemin du fichier
+    
+    Returns:
+    - state: État du backtest
+    """
+    return joblib.load(path)
+
+def solve_rebalances(returns, end_positions, window_size=252, use_ml=False, n_jobs=1,
+                     random_state=None, moments=None, ml_models=None, seed_offset=0,
+                     features=None):
+    """
+    Optimise le portefeuille à chaque date de rééquilibrage, en série ou en parallèle.
+    
+    Parameters:
+    - returns: DataFrame des rendements journaliers
+    - end_positions: Positions (dans returns) du dernier jour de chaque fenêtre d'estimation
+    - window_size: Taille de la fenêtre pour l'estimation des paramètres (jours)
+    - use_ml: Utiliser les prédictions ML pour les rendements attendus
+    - n_jobs: Nombre de processus (-1 : un par CPU) ; les rendements sont partagés en
+      mémoire partagée et les modèles ML transmis une fois à chaque processus
+    - random_state: Graine des simulations Monte Carlo (obligatoire en parallèle)
+    - moments: RollingMoments des rendements, pour lire les fenêtres sans les recalculer
+    - ml_models: Tuple (models, scalers) déjà chargé (par défaut, chargé depuis le disque)
+    - seed_offset: Rang du premier de ces rééquilibrages dans le backtest, pour reprendre
+      les mêmes sous-graines qu'un backtest complet
+    - features: FeatureStore des rendements, pour lire les caractéristiques ML de chaque
+      date sans les recalculer sur la fenêtre
+    
+    Returns:
+    - weights: Array (len(end_positions), actifs) des poids optimaux
+    """
+    if random_state is None and effective_n_jobs(n_jobs) > 1:
+        raise ValueError("Un backtest parallèle reproductible exige une graine (random_state)")
     
     # Charger les modèles ML si nécessaire
-    if use_ml:
-        try:
-            models, scalers = load_models(returns.columns)
-            ml_available = True
-        except:
-            print("Modèles ML non disponibles. Utilisation des rendements historiques.")
-            ml_available = False
+    context = {'tickers': list(returns.columns), 'window_size': window_size, 'moments': moments,
+               'features': features}
+    if use_ml and ml_models is None:
+        ml_models = _load_ml_models(returns.columns)
+    if use_ml and ml_models is not None:
+        context['models'], context['scalers'] = ml_models
+    
+    if random_state is None:
+        seeds = [None] * len(end_positions)
     else:
-        ml_available = False
-    
-    # Boucle de backtesting
-    for i in range(1, len(portfolio_values)):
-        current_date = portfolio_values.index[i]
-        prev_date = portfolio_values.index[i-1]
-        
-        # Appliquer les rendements du jour aux poids actuels
-        daily_return = (returns.loc[current_date] * all_weights.loc[prev_date]).sum()
-        portfolio_values.loc[current_date] = portfolio_values.loc[prev_date] * (1 + daily_return)
-        
-        # Vérifier si c'est le moment de rééquilibrer
-        if i % rebalance_freq == 0:
-            # Fenêtre de données pour l'estimation
-            end_idx = returns.index.get_loc(prev_date)
-            start_idx = end_idx - window_size + 1
-            historical_returns = returns.iloc[start_idx:end_idx+1]
-            
-            # Calculer les rendements attendus
-            if use_ml and ml_available:
-                # Préparer les caractéristiques pour les modèles ML
-                X, _ = prepare_features(historical_returns)
-                # Prédire les rendements
-                expected_returns = predict_returns(models, X, scalers)
-            else:
-                # Utiliser les rendements historiques moyens
-                expected_returns, _ = calculate_portfolio_metrics(historical_returns)
-            
-            # Calculer la matrice de covariance
-            _, cov_matrix = calculate_portfolio_metrics(historical_returns)
-            
-            # Optimiser le portefeuille
-            frontier, optimal_weights = optimize_portfolio(expected_returns, cov_matrix)
-            
-            # Mettre à jour les poids
-            all_weights.loc[current_date] = optimal_weights
+        seeds = np.random.SeedSequence(random_state).spawn(seed_offset + len(end_positions))
+        seeds = seeds[seed_offset:]
+    tasks = list(zip(end_positions, seeds))
+    weights = parallel_map(_solve_rebalance, tasks,
+                           {'returns': returns.to_numpy(dtype=float)}, n_jobs, context)
+    return np.array(weights).reshape(len(end_positions), len(returns.columns))
+
+def _solve_rebalance(shared, end_idx, seed):
+    """Optimisation d'une date de rééquilibrage (exécutable dans un worker)."""
+    window_size = shared['window_size']
+    start_idx = end_idx - window_size + 1
+    historical_returns = pd.DataFrame(shared['returns'][start_idx:end_idx + 1],
+                                      index=pd.RangeIndex(start_idx, end_idx + 1),
+                                      columns=shared['tickers'])
+    
+    # Moyennes et covariance de la fenêtre
+    if shared['moments'] is not None:
+        expected_returns, cov_matrix = shared['moments'].window(start_idx, end_idx)
+    else:
+        expected_returns, cov_matrix = calculate_portfolio_metrics(historical_returns)
+    
+    # Remplacer les rendements attendus par les prédictions ML si disponibles
+    if 'models' in shared:
+        # Caractéristiques du dernier jour de la fenêtre, lues dans le magasin si possible
+        if shared.get('features') is not None:
+            X = shared['features'].latest(end_idx)
+            feature_index = shared['features'].feature_index
         else:
-            # Conserver les mêmes poids
-            all_weights.loc[current_date] = all_weights.loc[prev_date]
+            X, _ = prepare_features(historical_returns)
+            feature_index = None
+        # Prédire les rendements
+        expected_returns = predict_returns(shared['models'], X, shared['scalers'], feature_index)
+    
+    # Optimiser le portefeuille
+    frontier, optimal_weights = optimize_portfolio(expected_returns, cov_matrix,
+                                                   random_state=seed)
+    return optimal_weights
+
+def simulate_portfolio(asset_returns, rebalance_days, target_weights, drift=False,
+                       initial_value=1.0):
+    """
+    Simule la valeur d'un portefeuille rééquilibré à dates fixes.
     
-    # Calculer les métriques de performance
-    metrics = calculate_performance_metrics(portfolio_values, returns.index[window_size:], risk_free_rate)
+    Les poids d'un jour s'appliquent aux rendements du lendemain ; un rééquilibrage au
+    jour d fixe les poids de la fin du jour d. Les rendements manquants (NaN) comptent
+    pour zéro.
+    
+    Parameters:
+    - asset_returns: Array (jours, actifs) des rendements journaliers
+    - rebalance_days: Indices croissants des jours de rééquilibrage (après le jour 0)
+    - target_weights: Array (len(rebalance_days) + 1, actifs) des poids cibles, le
+      premier étant celui du jour 0
+    - drift: Laisser dériver les poids avec les prix entre deux rééquilibrages ; sinon
+      les poids cibles sont maintenus chaque jour (mélange constant)
+    - initial_value: Valeur du portefeuille au jour 0 ; repartir d'un jour de
+      rééquilibrage avec sa valeur reproduit exactement la suite d'une simulation
     
-    return portfolio_values, all_weights, metrics
+    Returns:
+    - values: Array (jours,) de la valeur du portefeuille, partant de initial_value
+    - weights: Array (jours, actifs) des poids détenus en fin de journée
+    """
+    n_days, n_assets = asset_returns.shape
+    segment_starts = np.concatenate([[0], rebalance_days]).astype(int)
+    segment_ends = np.append(segment_starts[1:], n_days)
+    
+    if not drift:
+        # Poids cibles maintenus : chaque jour reprend les poids du dernier rééquilibrage
+        weights = np.repeat(target_weights, segment_ends - segment_starts, axis=0)
+        products = asset_returns[1:] * weights[:-1]
+        products[np.isnan(products)] = 0.0
+        # Somme actif par actif, de gauche à droite, comme la somme pandas de référence
+        daily_returns = np.zeros(n_days - 1)
+        for j in range(n_assets):
+            daily_returns += products[:, j]
+        values = np.cumprod(np.concatenate([[initial_value], 1 + daily_returns]))
+        return values, weights
+    
+    # Poids dérivants : sur chaque segment, les avoirs suivent le produit cumulé des rendements
+    growth = 1 + np.nan_to_num(asset_returns)
+    values = np.empty(n_days)
+    values[0] = initial_value
+    weights = np.empty((n_days, n_assets))
+    for target, start, end in zip(target_weights, segment_starts, segment_ends):
+        weights[start] = target
+        last = min(end, n_days - 1)
+        if last == start:
+            continue
+        holdings = target * np.cumprod(growth[start + 1:last + 1], axis=0)
+        values[start + 1:last + 1] = values[start] * holdings.sum(axis=1)
+        drifted = holdings[:end - start - 1]
+        weights[start + 1:end] = drifted / drifted.sum(axis=1, keepdims=True)
+    return values, weights
 
 def calculate_performance_metrics(portfolio_values, dates, risk_free_rate=0.01):
     """
     Calculer les métriques de performance du portefeuille.
     
+    Pour plusieurs stratégies à la fois (et les ratios de Sortino, de Calmar et la durée
+    de drawdown), voir src.models.performance.performance_table.
+    
     Parameters:
     - portfolio_values: Series des valeurs du portefeuille
     - dates: Index des dates
@@ -130,15 +463,20 @@ def calculate_performance_metrics(portfolio_values, dates, risk_free_rate=0.01):
     
     return metrics
 
-def compare_strategies(returns, strategies, window_size=252, risk_free_rate=0.01):
+def compare_strategies(returns, strategies, window_size=252, risk_free_rate=0.01, n_jobs=1,
+                       random_state=None):
     """
     Comparer différentes stratégies d'optimisation de portefeuille.
     
     Parameters:
     - returns: DataFrame des rendements journaliers
-    - strategies: Dictionnaire des stratégies à comparer
+    - strategies: Dictionnaire des stratégies à comparer (paramètres window_size,
+      rebalance_freq, use_ml, drift, rebalance_policy et cost_model ; drift vaut par
+      défaut True avec une politique à seuil, False sinon)
     - window_size: Taille de la fenêtre pour l'estimation des paramètres (jours)
     - risk_free_rate: Taux sans risque annualisé
+    - n_jobs: Nombre de processus pour les optimisations de rééquilibrage
+    - random_state: Graine des simulations Monte Carlo (obligatoire en parallèle)
     
     Returns:
     - comparison: DataFrame des métriques de performance pour chaque stratégie
@@ -146,15 +484,26 @@ def compare_strategies(returns, strategies, window_size=252, risk_free_rate=0.01
     """
     portfolio_values = pd.DataFrame(index=returns.index[window_size:])
     all_metrics = []
+    # Caractéristiques ML calculées une fois pour toutes les stratégies
+    features = (FeatureStore(returns)
+                if any(params.get('use_ml', False) for params in strategies.values()) else None)
     
     for name, params in strategies.items():
         print(f"Backtesting de la stratégie '{name}'...")
+        policy = params.get('rebalance_policy')
+        threshold = policy is not None and not isinstance(policy, CalendarPolicy)
         values, _, metrics = backtest_strategy(
             returns, 
             window_size=params.get('window_size', window_size),
             rebalance_freq=params.get('rebalance_freq', 21),
             use_ml=params.get('use_ml', False),
-            risk_free_rate=risk_free_rate
+            risk_free_rate=risk_free_rate,
+            drift=params.get('drift', threshold),
+            rebalance_policy=policy,
+            cost_model=params.get('cost_model'),
+            feature_store=features,
+            n_jobs=n_jobs,
+            random_state=random_state
         )
         
         portfolio_values[name] = values
@@ -0,0 +1,235 @@
+"""
+Module de cache des résultats d'optimisation.
+
+Les tableaux de bord relancent tout le script à chaque interaction : sans cache, une
+optimisation identique est recalculée dès qu'un widget sans rapport change. Les
+résultats sont mémorisés sous une empreinte rapide des arguments (octets des tableaux,
+étiquettes, scalaires), dans un cache LRU de taille bornée doublé d'un niveau
+optionnel sur disque.
+"""
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def hash_inputs(*args, **kwargs):
+    """
+    Calcule une empreinte des arguments d'un appel.
+
+    Parameters:
+    - args, kwargs: Tableaux numpy, objets pandas, scalaires, séquences et dictionnaires
+
+    Returns:
+    - key: Empreinte hexadécimale (blake2b, 128 bits)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update_hash(digest, args)
+    _update_hash(digest, kwargs)
+    return digest.hexdigest()
+
+
+def _update_hash(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b'frame')
+        _update_hash(digest, value.index)
+        _update_hash(digest, value.columns)
+        _update_hash(digest, value.to_numpy())
+    elif isinstance(value, pd.Series):
+        digest.update(b'series')
+        _update_hash(digest, value.index)
+        _update_hash(digest, value.to_numpy())
+    elif isinstance(value, pd.Index):
+        # Les étiquettes (dates, tickers) sont hachées par pandas, type compris
+        digest.update(f'index{value.dtype}{len(value)}'.encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            _update_hash(digest, value.tolist())
+        else:
+            digest.update(f'array{value.dtype.str}{value.shape}'.encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update_hash(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f'dict{len(value)}'.encode())
+        for name in sorted(value, key=repr):
+            _update_hash(digest, name)
+            _update_hash(digest, value[name])
+    elif isinstance(value, np.generic):
+        _update_hash(digest, value.item())
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        digest.update(f'{type(value).__name__}:{value!r};'.encode())
+    else:
+        raise TypeError(f"Type non pris en charge par le cache : {type(value).__name__}")
+
+
+class ResultCache:
+    """
+    Cache LRU de taille bornée, avec un niveau optionnel sur disque.
+
+    Parameters:
+    - maxsize: Nombre maximal de résultats gardés en mémoire
+    - directory: Répertoire du niveau disque (None : mémoire seule) ; les résultats
+      évincés de la mémoire y restent disponibles
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        if maxsize < 1:
+            raise ValueError("maxsize doit être au moins 1")
+        self.maxsize = maxsize
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key, default=None):
+        """
+        Renvoie une copie du résultat associé à `key` (ou `default`).
+
+        Parameters:
+        - key: Empreinte produite par hash_inputs
+        - default: Valeur renvoyée en cas d'absence
+
+        Returns:
+        - value: Résultat mémorisé
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return copy.deepcopy(self._entries[key])
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._store(key, value)
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return default
+
+    def put(self, key, value):
+        """
+        Mémorise une copie de `value` sous `key`.
+
+        Parameters:
+        - key: Empreinte produite par hash_inputs
+        - value: Résultat picklable
+        """
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(key, value)
+
+        if self.directory is not None:
+            # Écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._path(key))
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def clear(self, disk=False):
+        """
+        Vide le cache mémoire (et le niveau disque si `disk`) et remet les statistiques à zéro.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.unlink(os.path.join(self.directory, name))
+
+    def stats(self):
+        """
+        Statistiques d'utilisation du cache.
+
+        Returns:
+        - stats: Dictionnaire hits (mémoire), disk_hits, misses, evictions, size, maxsize
+          et hit_rate (part des appels servis par l'un des deux niveaux)
+        """
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), maxsize=self.maxsize)
+        calls = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / calls if calls else 0.0
+        return stats
+
+
+# Cache partagé par les fonctions mémorisées des modules d'optimisation
+default_cache = ResultCache()
+
+
+def memoize(func, cache=None, cacheable=None):
+    """
+    Place un cache devant `func`.
+
+    La clé combine le nom qualifié de la fonction et tous ses arguments, valeurs par défaut
+    comprises, si bien que les appels positionnels et nommés équivalents partagent la même
+    entrée. Un appel aléatoire sans graine mémorise sa première réponse : les appelants
+    fixent la graine. Un résultat qui dépend de l'instant de l'appel (budget de temps
+    épuisé) est écarté par `cacheable`.
+
+    Parameters:
+    - func: Fonction dont les arguments sont pris en charge par hash_inputs
+    - cache: ResultCache à utiliser (default_cache par défaut)
+    - cacheable: Fonction cacheable(arguments, result) appelée après un calcul, avec les
+      arguments nommés (valeurs par défaut comprises) ; un résultat pour lequel elle
+      renvoie False est renvoyé sans être mémorisé (par défaut, tout est mémorisé)
+
+    Returns:
+    - wrapper: Fonction de même signature ; wrapper.cache donne le cache utilisé
+    """
+    if cache is None:
+        cache = default_cache
+    signature = inspect.signature(func)
+    name = f'{func.__module__}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = hash_inputs(name, bound.arguments)
+
+        missing = object()
+        result = cache.get(key, missing)
+        if result is missing:
+            result = func(*args, **kwargs)
+            if cacheable is None or cacheable(bound.arguments, result):
+                cache.put(key, result)
+        return result
+
+    wrapper.cache = cache
+    return wrapper
@@ -0,0 +1,375 @@
+"""
+Module implémentant l'algorithme de la ligne critique (Critical Line Algorithm, Markowitz).
+
+L'algorithme parcourt la frontière efficiente en une seule passe en faisant décroître
+le coefficient d'aversion au rendement lambda. Entre deux portefeuilles "coins"
+(turning points), l'ensemble des actifs libres est constant et les poids sont
+linéaires en lambda, donc linéaires en rendement attendu : toute la frontière
+s'obtient par interpolation exacte entre coins.
+"""
+import numpy as np
+
+# Tolérance relative de comparaison des lambdas de deux événements
+_LAMBDA_TOL = 1e-9
+
+
+class InfeasibleCornerError(ValueError):
+    """Chemin de la ligne critique numériquement dégénéré (coin hors des contraintes)."""
+
+
+def validate_bounds(n_assets, bounds):
+    """
+    Convertit les bornes en deux vecteurs (inférieur, supérieur).
+
+    Parameters:
+    - n_assets: Nombre d'actifs
+    - bounds: Tuple (min, max) commun à tous les actifs ou séquence de tuples par actif
+
+    Returns:
+    - lower: Vecteur des bornes inférieures
+    - upper: Vecteur des bornes supérieures
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    if bounds.ndim == 1:
+        bounds = np.tile(bounds, (n_assets, 1))
+    lower, upper = bounds[:, 0].copy(), bounds[:, 1].copy()
+
+    if np.any(lower > upper):
+        raise ValueError("Chaque borne inférieure doit être inférieure à la borne supérieure")
+    if lower.sum() > 1 + 1e-12 or upper.sum() < 1 - 1e-12:
+        raise ValueError("Les bornes ne permettent pas des poids dont la somme vaut 1")
+
+    return lower, upper
+
+
+def max_return_portfolio(mean, lower, upper):
+    """
+    Portefeuille de rendement maximal : on remplit les actifs par rendement décroissant.
+
+    Parameters:
+    - mean: Vecteur des rendements attendus
+    - lower: Vecteur des bornes inférieures
+    - upper: Vecteur des bornes supérieures
+
+    Returns:
+    - weights: Poids du portefeuille
+    - last: Indice du dernier actif rempli (partiellement ou non)
+    """
+    weights = lower.copy()
+    remaining = 1 - lower.sum()
+    order = np.argsort(-mean, kind='stable')
+
+    for i in order:
+        room = upper[i] - lower[i]
+        if room >= remaining:
+            weights[i] += remaining
+            return weights, int(i)
+        weights[i] = upper[i]
+        remaining -= room
+
+    # Les bornes supérieures saturent exactement la contrainte de somme
+    return weights, int(order[-1])
+
+
+def _initial_portfolio(mean, lower, upper):
+    """
+    Construit le premier coin, dont le dernier actif rempli est le seul actif libre.
+
+    Returns:
+    - free: Liste contenant l'indice du premier actif libre
+    - weights: Poids du portefeuille de rendement maximal
+    """
+    weights, last = max_return_portfolio(mean, lower, upper)
+    return [last], weights
+
+
+def _break_ties(mean):
+    """
+    Départage les rendements attendus strictement égaux.
+
+    L'algorithme suppose des rendements distincts : avec des égalités, le premier coin
+    serait arbitraire. Une perturbation négligeable, ordonnée par indice, rend le
+    chemin bien défini sans modifier le portefeuille de variance minimale.
+    """
+    if len(np.unique(mean)) == len(mean):
+        return mean
+    scale = max(np.ptp(mean), np.abs(mean).max(), 1.0) * 1e-9
+    return mean - scale * np.arange(len(mean)) / len(mean)
+
+
+def _inverse(matrix):
+    """Inverse une matrice de covariance, en se rabattant sur la pseudo-inverse."""
+    try:
+        return np.linalg.inv(matrix)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(matrix)
+
+
+def _free_weights(cov, mean, weights, free, lam):
+    """
+    Calcule les poids des actifs libres pour un lambda donné (conditions KKT).
+
+    Returns:
+    - w_free: Poids des actifs libres
+    """
+    free = np.asarray(free)
+    bounded = np.setdiff1d(np.arange(len(mean)), free)
+    inv_ff = _inverse(cov[np.ix_(free, free)])
+    ones = np.ones(len(free))
+
+    a_ones = inv_ff @ ones
+    a_mean = inv_ff @ mean[free]
+    g1 = ones @ a_mean
+    g2 = ones @ a_ones
+
+    if len(bounded):
+        w_bounded = weights[bounded]
+        w1 = inv_ff @ (cov[np.ix_(free, bounded)] @ w_bounded)
+        gamma = (-lam * g1 + 1 - w_bounded.sum() + ones @ w1) / g2
+    else:
+        w1 = 0
+        gamma = (-lam * g1 + 1) / g2
+
+    return -w1 + gamma * a_ones + lam * a_mean
+
+
+def _lambda_bound_free(cov, mean, weights, free, lower, upper):
+    """
+    Cas a) : lambda auquel chaque actif libre atteint l'une de ses bornes.
+
+    Returns:
+    - lambdas: Lambda de sortie pour chaque actif libre (NaN si indéfini)
+    - targets: Borne atteinte par chaque actif libre
+    """
+    free = np.asarray(free)
+    bounded = np.setdiff1d(np.arange(len(mean)), free)
+    inv_ff = _inverse(cov[np.ix_(free, free)])
+    ones = np.ones(len(free))
+
+    c4 = inv_ff @ ones
+    c2 = inv_ff @ mean[free]
+    c1 = ones @ c4
+    c3 = ones @ c2
+    c = -c1 * c2 + c3 * c4
+
+    targets = np.where(c > 0, upper[free], lower[free])
+    if len(bounded):
+        w_bounded = weights[bounded]
+        l3 = inv_ff @ (cov[np.ix_(free, bounded)] @ w_bounded)
+        numerator = (1 - w_bounded.sum() + ones @ l3) * c4 - c1 * (targets + l3)
+    else:
+        numerator = c4 - c1 * targets
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lambdas = np.where(c != 0, numerator / c, np.nan)
+
+    return lambdas, targets
+
+
+def _lambda_free_bounded(cov, mean, weights, free):
+    """
+    Cas b) : lambda auquel chaque actif borné deviendrait libre.
+
+    L'inverse de la sous-matrice de covariance élargie à un candidat est obtenue
+    par complément de Schur, ce qui évalue tous les candidats en O(k²) chacun au
+    lieu d'une inversion complète par candidat.
+
+    Returns:
+    - candidates: Indices des actifs bornés
+    - lambdas: Lambda d'entrée pour chaque candidat (NaN si indéfini)
+    """
+    free = np.asarray(free)
+    candidates = np.setdiff1d(np.arange(len(mean)), free)
+    inv_ff = _inverse(cov[np.ix_(free, free)])
+    ones = np.ones(len(free))
+    mean_f = mean[free]
+    w_b = weights[candidates]
+
+    cov_fb = cov[np.ix_(free, candidates)]
+    u = inv_ff @ cov_fb
+    s = cov[candidates, candidates] - np.einsum('ij,ij->j', cov_fb, u)
+
+    a_ones = inv_ff @ ones
+    a_mean = inv_ff @ mean_f
+    u_ones = ones @ u
+    u_mean = mean_f @ u
+    mean_b = mean[candidates]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c1 = ones @ a_ones + (u_ones - 1) ** 2 / s
+        c3 = ones @ a_mean + (u_ones - 1) * (u_mean - mean_b) / s
+        c2 = (mean_b - u_mean) / s
+        c4 = (1 - u_ones) / s
+        c = -c1 * c2 + c3 * c4
+
+        # Termes liés aux actifs restant bornés (le candidat sort de l'ensemble borné)
+        z = cov_fb @ w_b
+        v_free_u = u.T @ z - w_b * (cov[candidates, candidates] - s)
+        v_last = cov[np.ix_(candidates, candidates)] @ w_b - cov[candidates, candidates] * w_b
+        ones_v = a_ones @ z - w_b * u_ones
+        l3 = (v_last - v_free_u) / s
+        l2 = ones_v + (u_ones - 1) * (v_free_u - v_last) / s
+        l1 = w_b.sum() - w_b
+
+        lambdas = ((1 - l1 + l2) * c4 - c1 * (w_b + l3)) / c
+    lambdas[(c == 0) | (s <= 1e-14 * np.abs(cov[candidates, candidates]).clip(min=1e-300))] = np.nan
+
+    return candidates, lambdas
+
+
+def _valid_events(candidates, assets, lam_prev, tol, last_moved):
+    """
+    Événements admissibles : lambda défini, au plus égal (à tol près) au lambda courant.
+
+    Deux événements simultanés sont traités l'un après l'autre au même lambda ; l'actif
+    qui vient de changer d'état en est exclu, sans quoi il reviendrait aussitôt
+    (entrée et sortie au même lambda) et le chemin quitterait les bornes.
+    """
+    valid = np.isfinite(candidates) & (candidates < lam_prev + tol)
+    if last_moved is not None:
+        valid &= ~((assets == last_moved) & (candidates > lam_prev - tol))
+    return valid
+
+
+def _purge(corners, lambdas, mean, lower, upper, tol=1e-9):
+    """
+    Vérifie les coins et supprime ceux qui sont dominés.
+
+    Un coin qui viole les bornes ou la contrainte de somme signale un chemin dégénéré :
+    le supprimer tronquerait la frontière avant la variance minimale, d'où l'erreur.
+
+    Returns:
+    - corners: Poids des coins conservés, rendements strictement décroissants
+    - lambdas: Lambdas associés
+
+    Raises:
+    - InfeasibleCornerError: si un coin ne respecte pas les contraintes
+    """
+    for w in corners:
+        if abs(w.sum() - 1) > tol or np.any(w < lower - tol) or np.any(w > upper + tol):
+            raise InfeasibleCornerError("Coin de la ligne critique hors des contraintes")
+    corners = [np.clip(w, lower, upper) for w in corners]
+
+    # Parcours depuis le portefeuille de variance minimale : à rendement égal, on garde
+    # le coin le moins risqué
+    purged_w, purged_l = [], []
+    for w, lam in zip(corners[::-1], lambdas[::-1]):
+        if purged_w and w @ mean <= purged_w[-1] @ mean + tol:
+            continue
+        purged_w.append(w)
+        purged_l.append(lam)
+    purged_w, purged_l = purged_w[::-1], purged_l[::-1]
+
+    return purged_w, purged_l
+
+
+def critical_line(mean, cov, bounds=(0, 1), max_iter=None):
+    """
+    Calcule les portefeuilles coins de la frontière efficiente.
+
+    Parameters:
+    - mean: Vecteur des rendements attendus
+    - cov: Matrice de covariance
+    - bounds: Tuple (min, max) commun ou séquence de tuples par actif
+    - max_iter: Nombre maximal de coins (par défaut 10 fois le nombre d'actifs)
+
+    Returns:
+    - corners: Array (k, n) des poids des coins, du rendement maximal au risque minimal
+    - lambdas: Array (k,) des lambdas associés (inf pour le premier coin, 0 pour le dernier)
+
+    Raises:
+    - InfeasibleCornerError: si le chemin quitte les contraintes ou n'atteint pas la
+      variance minimale en max_iter coins
+    """
+    mean = np.asarray(mean, dtype=float).ravel()
+    cov = np.asarray(cov, dtype=float)
+    n_assets = len(mean)
+    lower, upper = validate_bounds(n_assets, bounds)
+    if max_iter is None:
+        max_iter = 10 * n_assets + 10
+
+    path_mean = _break_ties(mean)
+    free, weights = _initial_portfolio(path_mean, lower, upper)
+    corners = [weights.copy()]
+    lambdas = [np.inf]
+    # Dernier actif entré ou sorti : il ne peut pas changer à nouveau d'état au même lambda
+    last_moved = None
+
+    for _ in range(max_iter):
+        lam_prev = lambdas[-1]
+        tol = _LAMBDA_TOL * max(1.0, abs(lam_prev)) if np.isfinite(lam_prev) else 0.0
+
+        # Cas a) un actif libre atteint une borne
+        lam_in = -np.inf
+        if len(free) > 1:
+            candidates, targets = _lambda_bound_free(cov, path_mean, weights, free, lower, upper)
+            valid = _valid_events(candidates, np.asarray(free), lam_prev, tol, last_moved)
+            if valid.any():
+                j = int(np.argmax(np.where(valid, candidates, -np.inf)))
+                lam_in, i_in, target_in = candidates[j], free[j], targets[j]
+
+        # Cas b) un actif borné devient libre
+        lam_out = -np.inf
+        if len(free) < n_assets:
+            bounded, candidates = _lambda_free_bounded(cov, path_mean, weights, free)
+            valid = _valid_events(candidates, bounded, lam_prev, tol, last_moved)
+            if valid.any():
+                j = int(np.argmax(np.where(valid, candidates, -np.inf)))
+                lam_out, i_out = candidates[j], int(bounded[j])
+
+        if lam_in < 0 and lam_out < 0:
+            # Plus aucun événement pour lambda > 0 : portefeuille de variance minimale
+            lam = 0.0
+        elif lam_in > lam_out:
+            lam = min(lam_in, lam_prev)
+            free.remove(i_in)
+            weights[i_in] = target_in
+            last_moved = i_in
+        else:
+            lam = min(lam_out, lam_prev)
+            free.append(i_out)
+            last_moved = i_out
+
+        weights[free] = _free_weights(cov, path_mean, weights, free, lam)
+        corners.append(weights.copy())
+        lambdas.append(lam)
+
+        if lam == 0:
+            break
+    else:
+        raise InfeasibleCornerError("La ligne critique n'a pas atteint la variance minimale")
+
+    corners, lambdas = _purge(corners, lambdas, mean, lower, upper)
+    return np.array(corners), np.array(lambdas)
+
+
+def interpolate_frontier(corners, mean, target_returns):
+    """
+    Interpole exactement les portefeuilles efficients entre les coins.
+
+    Parameters:
+    - corners: Array (k, n) des coins, rendements strictement décroissants
+    - mean: Vecteur des rendements attendus
+    - target_returns: Rendements cibles, compris entre ceux des coins extrêmes
+
+    Returns:
+    - weights: Array (m, n) des poids efficients pour chaque rendement cible
+    """
+    mean = np.asarray(mean, dtype=float).ravel()
+    target_returns = np.asarray(target_returns, dtype=float)
+    if len(corners) == 1:
+        return np.repeat(corners, len(target_returns), axis=0)
+
+    corner_returns = corners @ mean
+    # np.searchsorted attend un ordre croissant
+    ascending = corner_returns[::-1]
+    targets = np.clip(target_returns, ascending[0], ascending[-1])
+    upper_idx = np.clip(np.searchsorted(ascending, targets), 1, len(ascending) - 1)
+
+    hi = corners[::-1][upper_idx]
+    lo = corners[::-1][upper_idx - 1]
+    r_hi = ascending[upper_idx]
+    r_lo = ascending[upper_idx - 1]
+    alpha = ((targets - r_lo) / (r_hi - r_lo))[:, None]
+
+    return lo + alpha * (hi - lo)
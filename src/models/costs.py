@@ -0,0 +1,142 @@
+"""
+Module des coûts de transaction et de l'impact de marché des backtests.
+
+Les transactions se déduisent de la trajectoire des poids : chaque jour, l'écart entre
+les poids détenus en fin de journée et les poids d'avant transaction (ceux de la veille,
+dérivés par les rendements du jour) est ce qui a été échangé. Tous les coûts se calculent
+ainsi en une passe sur le tableau (jours x actifs) des poids, sans boucle par transaction.
+"""
+import numpy as np
+import pandas as pd
+
+from src.models.moments import rolling_mean_std
+
+# Libellés des statistiques de rotation ajoutées aux métriques de performance
+TURNOVER_METRICS = ['Rotation Annualisée', 'Coûts de Transaction', 'Nombre de Transactions']
+
+
+def dollar_volume(raw_data, window=20):
+    """
+    Volume quotidien moyen en valeur de chaque ticker, connu la veille.
+
+    Parameters:
+    - raw_data: DataFrame des données brutes de real_data_collector.fetch_stock_data
+      (colonnes Date, Ticker, Close et Volume)
+    - window: Nombre de jours de la moyenne
+
+    Returns:
+    - adv: DataFrame (dates x tickers) du volume moyen en valeur des `window` jours
+      précédents
+    """
+    traded = raw_data.assign(Value=raw_data['Close'] * raw_data['Volume'])
+    values = traded.pivot(index='Date', columns='Ticker', values='Value')
+    values.index = pd.to_datetime(values.index)
+    return values.rolling(window, min_periods=1).mean().shift(1)
+
+
+class TransactionCostModel:
+    """
+    Modèle de coûts : proportionnels, fixes par transaction et impact de marché.
+
+    Le coût d'un jour, en fraction de la valeur du portefeuille, est la somme sur les
+    actifs échangés de :
+    - bps / 10 000 x |Δw|
+    - fixed / (capital x valeur) par transaction
+    - impact x σ x |Δw| x sqrt(|Δw| x capital x valeur / ADV) (loi en racine carrée)
+    où Δw est la variation de poids, σ la volatilité quotidienne récente de l'actif et ADV
+    son volume moyen en valeur. Les frais fixes et l'impact sont rapportés à la valeur
+    brute (avant coûts) du portefeuille.
+
+    Parameters:
+    - bps: Coûts proportionnels (points de base du montant échangé)
+    - fixed: Frais fixes par transaction (en devise)
+    - impact: Coefficient de l'impact en racine carrée (0 : pas d'impact)
+    - capital: Montant investi au départ (en devise), pour convertir les poids en montants
+    - adv: DataFrame (dates x tickers) du volume moyen en valeur (voir dollar_volume),
+      obligatoire avec un impact
+    - volatility_window: Nombre de jours de la volatilité utilisée par l'impact
+    - min_trade: Variation de poids en dessous de laquelle aucune transaction n'est comptée
+    """
+
+    def __init__(self, bps=0.0, fixed=0.0, impact=0.0, capital=1_000_000, adv=None,
+                 volatility_window=21, min_trade=1e-9):
+        if impact and adv is None:
+            raise ValueError("L'impact de marché exige le volume moyen en valeur (adv)")
+        self.bps = bps
+        self.fixed = fixed
+        self.impact = impact
+        self.capital = capital
+        self.adv = adv
+        self.volatility_window = volatility_window
+        self.min_trade = min_trade
+
+    def trades(self, asset_returns, weights):
+        """
+        Variations de poids échangées chaque jour.
+
+        Parameters:
+        - asset_returns: Array (jours, actifs) des rendements ; NaN compte pour zéro
+        - weights: Array (jours, actifs) des poids détenus en fin de journée
+
+        Returns:
+        - trades: Array (jours, actifs) ; le jour 0 (allocation initiale) est nul
+        """
+        drifted = weights[:-1] * (1 + np.nan_to_num(asset_returns[1:]))
+        pre_trade = drifted / drifted.sum(axis=1, keepdims=True)
+        trades = np.zeros_like(weights)
+        trades[1:] = weights[1:] - pre_trade
+        trades[np.abs(trades) < self.min_trade] = 0.0
+        return trades
+
+    def costs(self, returns, weights, values, start=0):
+        """
+        Coûts de transaction quotidiens, en fraction de la valeur du portefeuille.
+
+        Parameters:
+        - returns: DataFrame des rendements journaliers (historique complet)
+        - weights: Array (jours, actifs) des poids, le jour 0 étant la ligne `start` de returns
+        - values: Array (jours,) des valeurs brutes du portefeuille, partant de 1
+        - start: Position dans returns du jour 0 du portefeuille
+
+        Returns:
+        - costs: Array (jours,) des coûts de chaque jour
+        - trades: Array (jours, actifs) des variations de poids échangées
+        """
+        asset_returns = returns.to_numpy(dtype=float)[start:start + len(weights)]
+        trades = self.trades(asset_returns, weights)
+        size = np.abs(trades)
+        costs = self.bps / 1e4 * size.sum(axis=1)
+        if self.fixed:
+            costs += self.fixed * (size > 0).sum(axis=1) / (self.capital * values)
+        if self.impact:
+            # Volatilité et volume moyen connus la veille de la transaction
+            _, std = rolling_mean_std(returns, self.volatility_window)
+            sigma = np.nan_to_num(std.shift(1).to_numpy()[start:start + len(weights)])
+            adv = self.adv.reindex(index=returns.index, columns=returns.columns).ffill()
+            adv = adv.to_numpy(dtype=float)[start:start + len(weights)]
+            notional = size * (self.capital * values)[:, None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                participation = np.where(adv > 0, notional / adv, np.nan)
+            costs += self.impact * np.nansum(sigma * size * np.sqrt(participation), axis=1)
+        return costs, trades
+
+
+def turnover_metrics(trades, costs, dates):
+    """
+    Statistiques de rotation du portefeuille, au format des métriques de performance.
+
+    Parameters:
+    - trades: Array (jours, actifs) des variations de poids échangées
+    - costs: Array (jours,) des coûts de chaque jour (fraction de la valeur)
+    - dates: Index des dates du backtest
+
+    Returns:
+    - metrics: DataFrame (Métrique, Valeur) : rotation annualisée (aller simple), part
+      de la valeur perdue en coûts et nombre de transactions
+    """
+    years = (dates[-1] - dates[0]).days / 365.25
+    return pd.DataFrame({
+        'Métrique': TURNOVER_METRICS,
+        'Valeur': [np.abs(trades).sum() / 2 / years, 1 - np.prod(1 - costs),
+                   float((trades != 0).sum())]
+    })
@@ -0,0 +1,282 @@
+"""
+Module de construction des caractéristiques des modèles ML.
+
+Toutes les caractéristiques de tous les tickers (rendements retardés, moyennes et
+écarts-types glissants) sont écrites dans un seul tableau float32 contigu, colonnes
+rangées par ticker puis par caractéristique (MultiIndex (ticker, caractéristique)) :
+les retards sont lus dans une vue à fenêtre glissante sur les rendements, les moments
+glissants viennent de sommes préfixées. Aucun DataFrame n'est construit colonne par
+colonne.
+
+FeatureIndex associe à chaque ticker sa tranche de colonnes, pour sélectionner ses
+caractéristiques par position plutôt qu'en comparant des noms.
+
+FeatureStore tient ces caractéristiques à jour au fil des jours ajoutés : seules les
+nouvelles lignes sont calculées, et la dernière ligne complète se lit sans recalcul.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.models.moments import rolling_mean_std
+
+# Fenêtres des moyennes et écarts-types glissants
+ROLLING_WINDOWS = (5, 10)
+
+
+def feature_names(window_size=10):
+    """
+    Noms des caractéristiques d'un ticker, dans l'ordre des colonnes.
+
+    Parameters:
+    - window_size: Nombre de rendements retardés
+
+    Returns:
+    - names: Liste ['lag_1', ..., 'lag_<window_size>', 'ma_5', 'ma_10', 'std_5', 'std_10']
+    """
+    return ([f'lag_{i}' for i in range(1, window_size + 1)]
+            + [f'ma_{w}' for w in ROLLING_WINDOWS] + [f'std_{w}' for w in ROLLING_WINDOWS])
+
+
+def build_feature_matrix(returns, window_size=10, dropna=True):
+    """
+    Caractéristiques de tous les tickers, en un seul tableau float32.
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers
+    - window_size: Nombre de rendements retardés par ticker
+    - dropna: Supprimer les lignes incomplètes (début d'historique, valeurs manquantes)
+
+    Returns:
+    - features: DataFrame float32 adossé à un tableau contigu, colonnes
+      MultiIndex (ticker, caractéristique)
+    """
+    values = returns.to_numpy(dtype=float)
+    n_rows, n_tickers = values.shape
+    names = feature_names(window_size)
+    matrix = np.empty((n_rows, n_tickers, len(names)), dtype=np.float32)
+
+    # Retards : la ligne t de la vue contient les rendements t - window_size .. t - 1
+    padded = np.vstack([np.full((window_size, n_tickers), np.nan), values])
+    lags = sliding_window_view(padded, window_size, axis=0)[:n_rows]
+    matrix[:, :, :window_size] = lags[:, :, ::-1]
+
+    moments = [rolling_mean_std(returns, window) for window in ROLLING_WINDOWS]
+    for k, (mean, _) in enumerate(moments):
+        matrix[:, :, window_size + k] = mean.to_numpy()
+    for k, (_, std) in enumerate(moments):
+        matrix[:, :, window_size + len(ROLLING_WINDOWS) + k] = std.to_numpy()
+
+    matrix = matrix.reshape(n_rows, n_tickers * len(names))
+    index = returns.index
+    if dropna:
+        complete = ~np.isnan(matrix).any(axis=1)
+        matrix, index = matrix[complete], index[complete]
+    columns = pd.MultiIndex.from_product([list(returns.columns), names],
+                                         names=['ticker', 'feature'])
+    return pd.DataFrame(matrix, index=index, columns=columns, copy=False)
+
+
+class FeatureIndex:
+    """
+    Registre des colonnes de caractéristiques de chaque ticker.
+
+    Les caractéristiques d'un ticker occupent une tranche contiguë de colonnes (voir
+    build_feature_matrix) : la tranche est calculée une fois, et la sélection d'un
+    ticker est une vue sur le tableau des caractéristiques.
+
+    Parameters:
+    - columns: Colonnes MultiIndex (ticker, caractéristique) des caractéristiques
+    """
+
+    def __init__(self, columns):
+        if not isinstance(columns, pd.MultiIndex):
+            raise ValueError("Colonnes (ticker, caractéristique) attendues")
+        # Début de chaque bloc de colonnes d'un même ticker
+        codes = np.asarray(columns.codes[0])
+        starts = np.flatnonzero(np.diff(codes, prepend=-1)) if len(codes) else codes
+        ends = np.append(starts[1:], len(codes))
+        self.tickers = list(columns.levels[0][codes[starts]])
+        if len(set(self.tickers)) != len(self.tickers):
+            raise ValueError("Les colonnes de chaque ticker doivent être contiguës")
+        self._slices = {ticker: slice(int(start), int(end))
+                        for ticker, start, end in zip(self.tickers, starts, ends)}
+
+    def __contains__(self, ticker):
+        return ticker in self._slices
+
+    def __getitem__(self, ticker):
+        """Tranche des colonnes du ticker."""
+        return self._slices[ticker]
+
+    def select(self, X, ticker):
+        """
+        Caractéristiques d'un ticker.
+
+        Parameters:
+        - X: DataFrame des caractéristiques, colonnes de ce registre
+        - ticker: Ticker
+
+        Returns:
+        - X_ticker: DataFrame des seules colonnes du ticker
+        """
+        return X.iloc[:, self._slices[ticker]]
+
+
+def panel_view(X):
+    """
+    Caractéristiques empilées par ticker, pour un modèle commun à tous les tickers.
+
+    Parameters:
+    - X: DataFrame des caractéristiques (colonnes (ticker, caractéristique)), les mêmes
+      caractéristiques dans le même ordre pour chaque ticker
+
+    Returns:
+    - panel: Array (jours, tickers, caractéristiques), vue sur les valeurs de X si elles
+      sont contiguës
+    - tickers: Liste des tickers
+    - names: Liste des caractéristiques
+    """
+    tickers = FeatureIndex(X.columns).tickers
+    names = list(X.columns.get_level_values(1)[:X.shape[1] // max(len(tickers), 1)])
+    if not X.columns.equals(pd.MultiIndex.from_product([tickers, names])):
+        raise ValueError("Chaque ticker doit avoir les mêmes caractéristiques, "
+                         "dans le même ordre")
+    return X.to_numpy().reshape(len(X), len(tickers), len(names)), tickers, names
+
+
+class FeatureStore:
+    """
+    Magasin incrémental des caractéristiques ML d'un historique de rendements.
+
+    Chaque jour ajouté ne calcule que ses propres caractéristiques, à partir des
+    dernières lignes de l'historique ; le résultat est égal (aux arrondis float32 près)
+    à build_feature_matrix sur l'historique complet. Les lignes se lisent par position,
+    comme les fenêtres de RollingMoments.
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers (historique initial, éventuellement vide)
+    - window_size: Nombre de rendements retardés par ticker
+    """
+
+    def __init__(self, returns, window_size=10):
+        self.tickers = list(returns.columns)
+        self.window_size = window_size
+        self.columns = pd.MultiIndex.from_product([self.tickers, feature_names(window_size)],
+                                                  names=['ticker', 'feature'])
+        self.feature_index = FeatureIndex(self.columns)
+        # Lignes de rendements nécessaires au calcul d'une nouvelle ligne
+        self._context_rows = max(window_size, max(ROLLING_WINDOWS) - 1)
+        self.index = returns.index[:0]
+        self._values = np.empty((0, len(self.columns)), dtype=np.float32)
+        self._last_complete = np.empty(0, dtype=int)
+        self._tail = np.empty((0, len(self.tickers)))
+        self.append(returns)
+
+    def __len__(self):
+        return len(self._values)
+
+    def append(self, returns):
+        """
+        Ajoute de nouveaux jours à la fin de l'historique.
+
+        Les tableaux existants ne sont pas modifiés en place, si bien qu'une copie
+        superficielle (copy.copy) faite avant l'ajout reste valide.
+
+        Parameters:
+        - returns: DataFrame des nouveaux rendements, mêmes colonnes que l'historique
+        """
+        if list(returns.columns) != self.tickers:
+            raise ValueError("Les nouveaux rendements doivent avoir les colonnes du magasin")
+        values = returns.to_numpy(dtype=float)
+        history = np.vstack([self._tail, values])
+        features = build_feature_matrix(pd.DataFrame(history, columns=self.tickers),
+                                        self.window_size, dropna=False)
+        features = features.to_numpy()[len(self._tail):]
+
+        # Position de la dernière ligne complète à chaque ligne (-1 : aucune)
+        positions = np.arange(len(self), len(self) + len(values))
+        complete = np.where(~np.isnan(features).any(axis=1), positions, -1)
+        previous = self._last_complete[-1] if len(self) else -1
+        last_complete = np.maximum.accumulate(np.concatenate([[previous], complete]))[1:]
+
+        self.index = self.index.append(returns.index)
+        self._values = np.concatenate([self._values, features])
+        self._last_complete = np.concatenate([self._last_complete, last_complete])
+        self._tail = history[len(history) - self._context_rows:]
+
+    def latest(self, position=None):
+        """
+        Dernière ligne complète des caractéristiques, sans recalcul.
+
+        Parameters:
+        - position: Position de la dernière ligne admise (par défaut, la dernière)
+
+        Returns:
+        - features: DataFrame d'une ligne (aucune si aucune ligne n'est complète),
+          colonnes MultiIndex (ticker, caractéristique)
+        """
+        if position is None:
+            position = len(self) - 1
+        row = self._last_complete[position] if position >= 0 else -1
+        rows = slice(row, row + 1) if row >= 0 else slice(0, 0)
+        return pd.DataFrame(self._values[rows], index=self.index[rows], columns=self.columns)
+
+    def to_frame(self, dropna=True):
+        """
+        Toutes les caractéristiques, comme build_feature_matrix.
+
+        Parameters:
+        - dropna: Supprimer les lignes incomplètes
+
+        Returns:
+        - features: DataFrame float32, colonnes MultiIndex (ticker, caractéristique)
+        """
+        values, index = self._values, self.index
+        if dropna:
+            complete = self._last_complete == np.arange(len(self))
+            values, index = values[complete], index[complete]
+        return pd.DataFrame(values, index=index, columns=self.columns)
+
+    def save(self, path):
+        """
+        Sauvegarde le magasin dans un répertoire, au format colonne.
+
+        Chaque caractéristique est contiguë sur disque (tableau .npy caractéristiques x
+        jours), accompagnée des dates, des derniers rendements et des métadonnées.
+
+        Parameters:
+        - path: Chemin du répertoire
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'values.npy'), np.ascontiguousarray(self._values.T))
+        np.save(os.path.join(path, 'index.npy'), self.index.to_numpy(), allow_pickle=False)
+        np.save(os.path.join(path, 'tail.npy'), self._tail)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'tickers': self.tickers, 'window_size': self.window_size}, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge un magasin sauvegardé par save.
+
+        Parameters:
+        - path: Chemin du répertoire
+
+        Returns:
+        - store: FeatureStore, prêt à recevoir de nouveaux jours
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        store = cls(pd.DataFrame(columns=meta['tickers'], dtype=float), meta['window_size'])
+        store.index = pd.Index(np.load(os.path.join(path, 'index.npy')))
+        store._values = np.ascontiguousarray(np.load(os.path.join(path, 'values.npy')).T)
+        store._tail = np.load(os.path.join(path, 'tail.npy'))
+        positions = np.arange(len(store))
+        complete = np.where(~np.isnan(store._values).any(axis=1), positions, -1)
+        store._last_complete = (np.maximum.accumulate(complete) if len(complete)
+                                else np.empty(0, dtype=int))
+        return store
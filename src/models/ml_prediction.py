@@ -10,6 +10,11 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 import os
+import time
+from threadpoolctl import threadpool_limits
+
+from src.models.features import FeatureIndex, build_feature_matrix, panel_view
+from src.models.parallel import effective_n_jobs, parallel_map
 
 def prepare_features(returns, window_size=10):
     """
@@ -20,126 +25,161 @@ def prepare_features(returns, window_size=10):
     - window_size: Taille de la fenêtre pour les caractéristiques (jours précédents)
     
     Returns:
-    - X: DataFrame des caractéristiques
+    - X: DataFrame float32 des caractéristiques, colonnes MultiIndex (ticker, caractéristique)
     - y: DataFrame des cibles (rendements à prédire)
     """
-    features = pd.DataFrame()
-    
-    # Pour chaque actif
-    for ticker in returns.columns:
-        # Créer des caractéristiques basées sur les rendements passés
-        for i in range(1, window_size + 1):
-            features[f'{ticker}_lag_{i}'] = returns[ticker].shift(i)
-        
-        # Ajouter des caractéristiques techniques simples
-        features[f'{ticker}_ma_5'] = returns[ticker].rolling(window=5).mean()
-        features[f'{ticker}_ma_10'] = returns[ticker].rolling(window=10).mean()
-        features[f'{ticker}_std_5'] = returns[ticker].rolling(window=5).std()
-        features[f'{ticker}_std_10'] = returns[ticker].rolling(window=10).std()
-    
-    # Supprimer les lignes avec des valeurs manquantes
-    features = features.dropna()
+    # Toutes les caractéristiques en un seul tableau, lignes incomplètes supprimées
+    features = build_feature_matrix(returns, window_size)
     
     # Créer les cibles (rendements du jour suivant)
     y = returns.loc[features.index]
     
     return features, y
 
-def train_models(X, y, test_size=0.2, random_state=42):
+def train_models(X, y, test_size=0.2, random_state=42, feature_index=None, n_jobs=1,
+                 return_info=False):
     """
     Entraîne des modèles ML pour prédire les rendements.
     
+    Les tickers sont répartis sur un pool de processus ; les threads restants du budget
+    n_jobs vont aux forêts aléatoires de chaque processus (et aux bibliothèques BLAS),
+    si bien que le total ne dépasse jamais n_jobs. Les modèles ne dépendent pas de
+    n_jobs. La progression et la durée de chaque ticker sont affichées au fil de l'eau.
+    
     Parameters:
-    - X: DataFrame des caractéristiques
+    - X: DataFrame des caractéristiques (colonnes (ticker, caractéristique))
     - y: DataFrame des cibles
     - test_size: Proportion des données pour le test
     - random_state: Graine aléatoire pour la reproductibilité
+    - feature_index: FeatureIndex des colonnes de X (par défaut, construit à partir de X)
+    - n_jobs: Budget total de threads (1 : en série, -1 : un par CPU)
+    - return_info: Renvoyer aussi un dictionnaire de diagnostic de l'entraînement
     
     Returns:
     - models: Dictionnaire des modèles entraînés
     - X_test: Caractéristiques de test
     - y_test: Cibles de test
     - scalers: Dictionnaire des scalers pour chaque actif
+    - info: (si return_info) Dictionnaire : timings (Series des durées d'entraînement
+      par ticker, en secondes), n_processes et threads_per_process
     """
     models = {}
     scalers = {}
     X_test_all = {}
     y_test_all = {}
+    timings = {}
+    if feature_index is None:
+        feature_index = FeatureIndex(X.columns)
     
-    # Pour chaque actif, entraîner un modèle séparé
-    for ticker in y.columns:
-        print(f"Entraînement des modèles pour {ticker}...")
-        
-        # Sélectionner les caractéristiques pertinentes pour cet actif
-        ticker_features = [col for col in X.columns if ticker in col]
-        X_ticker = X[ticker_features]
-        y_ticker = y[ticker]
-        
-        # Diviser les données
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_ticker, y_ticker, test_size=test_size, random_state=random_state
-        )
+    # Budget de threads : un processus par ticker au plus, le reste aux forêts
+    tickers = list(y.columns)
+    budget = effective_n_jobs(n_jobs)
+    n_processes = max(1, min(budget, len(tickers)))
+    context = {
+        'slices': {ticker: feature_index[ticker] for ticker in tickers},
+        'test_size': test_size,
+        'random_state': random_state,
+        'threads': max(1, budget // n_processes),
+    }
+    
+    def record(position, result):
+        ticker = tickers[position]
+        models[ticker], scalers[ticker], test_rows, timings[ticker] = result
+        X_test_all[ticker] = feature_index.select(X, ticker).iloc[test_rows]
+        y_test_all[ticker] = y[ticker].iloc[test_rows]
         
+        lr, rf = models[ticker]['LinearRegression'], models[ticker]['RandomForest']
+        print(f"Entraînement des modèles pour {ticker}... "
+              f"({position + 1}/{len(tickers)}, {timings[ticker]:.2f} s)")
+        print(f"  Linear Regression - MSE: {lr['mse']:.6f}, R²: {lr['r2']:.4f}")
+        print(f"  Random Forest - MSE: {rf['mse']:.6f}, R²: {rf['r2']:.4f}")
+    
+    # Pour chaque actif, entraîner un modèle séparé
+    parallel_map(_train_ticker, [(ticker, column) for column, ticker in enumerate(tickers)],
+                 {'X': X.to_numpy(), 'y': y.to_numpy(dtype=float)}, n_processes, context,
+                 on_result=record)
+    
+    results = (models, X_test_all, y_test_all, scalers)
+    if return_info:
+        results += ({
+            'timings': pd.Series(timings),
+            'n_processes': n_processes,
+            'threads_per_process': context['threads'],
+        },)
+    return results
+
+def _train_ticker(shared, ticker, column):
+    """Entraînement des modèles d'un ticker (exécutable dans un worker)."""
+    start = time.perf_counter()
+    # Sélectionner les caractéristiques de cet actif (tranche de colonnes)
+    X_ticker = shared['X'][:, shared['slices'][ticker]]
+    y_ticker = shared['y'][:, column]
+    
+    # Diviser les données (les mêmes lignes qu'en divisant les DataFrames)
+    train_rows, test_rows = train_test_split(
+        np.arange(len(y_ticker)), test_size=shared['test_size'],
+        random_state=shared['random_state']
+    )
+    # Tableaux rangés par colonne, comme ceux que pandas transmettait à scikit-learn
+    X_train = np.asfortranarray(X_ticker[train_rows])
+    X_test = np.asfortranarray(X_ticker[test_rows])
+    y_train, y_test = y_ticker[train_rows], y_ticker[test_rows]
+    
+    with threadpool_limits(shared['threads']):
         # Normaliser les données
         scaler = StandardScaler()
         X_train_scaled = scaler.fit_transform(X_train)
         X_test_scaled = scaler.transform(X_test)
         
-        # Entraîner les modèles
-        models[ticker] = {}
+        models = {}
         
         # Régression linéaire
         lr = LinearRegression()
         lr.fit(X_train_scaled, y_train)
         lr_pred = lr.predict(X_test_scaled)
-        lr_mse = mean_squared_error(y_test, lr_pred)
-        lr_r2 = r2_score(y_test, lr_pred)
-        models[ticker]['LinearRegression'] = {
+        models['LinearRegression'] = {
             'model': lr,
-            'mse': lr_mse,
-            'r2': lr_r2
+            'mse': mean_squared_error(y_test, lr_pred),
+            'r2': r2_score(y_test, lr_pred)
         }
         
-        # Random Forest
-        rf = RandomForestRegressor(n_estimators=100, random_state=random_state)
+        # Random Forest ; n_jobs est remis à sa valeur par défaut une fois la forêt
+        # entraînée, pour que les modèles ne dépendent pas du budget de threads
+        rf = RandomForestRegressor(n_estimators=100, random_state=shared['random_state'],
+                                   n_jobs=shared['threads'])
         rf.fit(X_train_scaled, y_train)
+        rf.set_params(n_jobs=None)
         rf_pred = rf.predict(X_test_scaled)
-        rf_mse = mean_squared_error(y_test, rf_pred)
-        rf_r2 = r2_score(y_test, rf_pred)
-        models[ticker]['RandomForest'] = {
+        models['RandomForest'] = {
             'model': rf,
-            'mse': rf_mse,
-            'r2': rf_r2
+            'mse': mean_squared_error(y_test, rf_pred),
+            'r2': r2_score(y_test, rf_pred)
         }
-        
-        # Sauvegarder le scaler et les données de test
-        scalers[ticker] = scaler
-        X_test_all[ticker] = X_test
-        y_test_all[ticker] = y_test
-        
-        print(f"  Linear Regression - MSE: {lr_mse:.6f}, R²: {lr_r2:.4f}")
-        print(f"  Random Forest - MSE: {rf_mse:.6f}, R²: {rf_r2:.4f}")
     
-    return models, X_test_all, y_test_all, scalers
+    return models, scaler, test_rows, time.perf_counter() - start
 
-def predict_returns(models, X, scalers):
+def predict_returns(models, X, scalers, feature_index=None):
     """
     Prédit les rendements futurs en utilisant les modèles entraînés.
     
     Parameters:
     - models: Dictionnaire des modèles entraînés
-    - X: DataFrame des caractéristiques
+    - X: DataFrame des caractéristiques (colonnes (ticker, caractéristique)) ; seule la
+      dernière ligne est utilisée
     - scalers: Dictionnaire des scalers pour chaque actif
+    - feature_index: FeatureIndex des colonnes de X (par défaut, construit à partir de X)
     
     Returns:
     - predictions: Series des rendements prédits
     """
     predictions = {}
+    if feature_index is None:
+        feature_index = FeatureIndex(X.columns)
+    last_row = X.to_numpy()[-1:]
     
     for ticker in models.keys():
-        # Sélectionner les caractéristiques pertinentes pour cet actif
-        ticker_features = [col for col in X.columns if ticker in col]
-        X_ticker = X[ticker_features]
+        # Caractéristiques de cet actif au dernier jour (vue sur la ligne)
+        X_ticker = last_row[:, feature_index[ticker]]
         
         # Normaliser les données
         X_scaled = scalers[ticker].transform(X_ticker)
@@ -148,12 +188,123 @@ def predict_returns(models, X, scalers):
         best_model_name = min(models[ticker].items(), key=lambda x: x[1]['mse'])[0]
         best_model = models[ticker][best_model_name]['model']
         
-        # Prédire le rendement
-        pred = best_model.predict(X_scaled)
-        predictions[ticker] = pred[-1]  # Prendre la dernière prédiction
+        # Prédire le rendement du dernier jour
+        predictions[ticker] = best_model.predict(X_scaled)[0]
     
     return pd.Series(predictions)
 
+def train_panel_model(X, y, test_size=0.2, random_state=42, ticker_codes=False, n_jobs=1):
+    """
+    Entraîne un modèle de rendements commun à tous les tickers (modèle panel).
+    
+    Les caractéristiques de chaque ticker sont empilées en un seul jeu d'entraînement
+    (une ligne par jour et par ticker), sans référence au ticker ; ticker_codes ajoute
+    une indicatrice par ticker (encodage one-hot), pour que la régression linéaire
+    apprenne un effet propre à chaque ticker plutôt qu'une pente sur l'ordre des tickers.
+    La division train/test porte sur les jours, les mêmes que pour les modèles par ticker
+    de train_models.
+    
+    Parameters:
+    - X: DataFrame des caractéristiques (colonnes (ticker, caractéristique))
+    - y: DataFrame des cibles
+    - test_size: Proportion des jours pour le test
+    - random_state: Graine aléatoire pour la reproductibilité
+    - ticker_codes: Ajouter aux caractéristiques les indicatrices des tickers (colonnes
+      ticker_<ticker>), communes aux deux modèles
+    - n_jobs: Nombre de threads de la forêt aléatoire (-1 : un par CPU)
+    
+    Returns:
+    - panel_model: Dictionnaire : models (mêmes entrées que train_models pour un ticker),
+      scaler, tickers et ticker_codes
+    - X_test: DataFrame des caractéristiques de test, indexé par (date, ticker)
+    - y_test: Series des cibles de test, même index
+    """
+    panel, tickers, names = panel_view(X)
+    targets = y[tickers].to_numpy(dtype=float)
+    train_rows, test_rows = train_test_split(
+        np.arange(len(X)), test_size=test_size, random_state=random_state
+    )
+    indicators = np.eye(len(tickers)) if ticker_codes else None
+    X_train = _stack_panel(panel[train_rows], indicators)
+    X_test = _stack_panel(panel[test_rows], indicators)
+    y_train = targets[train_rows].ravel()
+    y_test = targets[test_rows].ravel()
+    print(f"Entraînement du modèle panel ({len(y_train)} lignes, {len(tickers)} tickers)...")
+    
+    # Normaliser les données
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    
+    models = {}
+    # Avec ticker_codes, les indicatrices somment à 1 : la constante est redondante, et
+    # la régression (moindres carrés) garde la solution de norme minimale
+    lr = LinearRegression()
+    lr.fit(X_train_scaled, y_train)
+    lr_pred = lr.predict(X_test_scaled)
+    models['LinearRegression'] = {
+        'model': lr,
+        'mse': mean_squared_error(y_test, lr_pred),
+        'r2': r2_score(y_test, lr_pred)
+    }
+    rf = RandomForestRegressor(n_estimators=100, random_state=random_state,
+                               n_jobs=effective_n_jobs(n_jobs))
+    rf.fit(X_train_scaled, y_train)
+    rf.set_params(n_jobs=None)
+    rf_pred = rf.predict(X_test_scaled)
+    models['RandomForest'] = {
+        'model': rf,
+        'mse': mean_squared_error(y_test, rf_pred),
+        'r2': r2_score(y_test, rf_pred)
+    }
+    print(f"  Linear Regression - MSE: {models['LinearRegression']['mse']:.6f}, "
+          f"R²: {models['LinearRegression']['r2']:.4f}")
+    print(f"  Random Forest - MSE: {models['RandomForest']['mse']:.6f}, "
+          f"R²: {models['RandomForest']['r2']:.4f}")
+    
+    index = pd.MultiIndex.from_product([X.index[test_rows], tickers], names=['date', 'ticker'])
+    columns = names + [f'ticker_{ticker}' for ticker in tickers] if ticker_codes else names
+    panel_model = {'models': models, 'scaler': scaler, 'tickers': tickers,
+                   'ticker_codes': ticker_codes}
+    return (panel_model, pd.DataFrame(X_test, index=index, columns=columns),
+            pd.Series(y_test, index=index))
+
+def predict_panel_returns(panel_model, X):
+    """
+    Prédit les rendements de tous les tickers en un seul appel au modèle panel.
+    
+    Parameters:
+    - panel_model: Modèle renvoyé par train_panel_model ou load_panel_model
+    - X: DataFrame des caractéristiques (colonnes (ticker, caractéristique)) ; seule la
+      dernière ligne est utilisée, et les tickers peuvent différer de l'entraînement
+      (indicatrices toutes nulles pour un ticker inconnu avec ticker_codes)
+    
+    Returns:
+    - predictions: Series des rendements prédits
+    """
+    panel, tickers, _ = panel_view(X)
+    indicators = None
+    if panel_model['ticker_codes']:
+        known = panel_model['tickers']
+        indicators = np.array([[ticker == other for other in known] for ticker in tickers],
+                              dtype=float).reshape(len(tickers), len(known))
+    X_last = panel_model['scaler'].transform(_stack_panel(panel[-1:], indicators))
+    
+    # Sélectionner le meilleur modèle (basé sur MSE)
+    best_model = min(panel_model['models'].values(), key=lambda info: info['mse'])['model']
+    return pd.Series(best_model.predict(X_last), index=tickers)
+
+def _stack_panel(panel, indicators=None):
+    """
+    Lignes (jour, ticker) des caractéristiques, suivies si demandé des indicatrices du
+    ticker (array tickers x tickers d'entraînement).
+    """
+    n_days, n_tickers, n_features = panel.shape
+    stacked = panel.reshape(n_days * n_tickers, n_features)
+    if indicators is None:
+        return stacked
+    return np.hstack([stacked, np.tile(indicators, (n_days, 1)).astype(stacked.dtype)])
+
 def save_models(models, scalers, output_dir='../../models'):
     """
     Sauvegarde les modèles et les scalers.
@@ -217,6 +368,29 @@ def load_models(tickers, input_dir='../../models'):
     
     return models, scalers
 
+def save_panel_model(panel_model, output_dir='../../models'):
+    """
+    Sauvegarde le modèle panel dans un seul fichier.
+    
+    Parameters:
+    - panel_model: Modèle renvoyé par train_panel_model
+    - output_dir: Répertoire de sortie
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    joblib.dump(panel_model, os.path.join(output_dir, 'panel.pkl'))
+
+def load_panel_model(input_dir='../../models'):
+    """
+    Charge le modèle panel sauvegardé par save_panel_model.
+    
+    Parameters:
+    - input_dir: Répertoire d'entrée
+    
+    Returns:
+    - panel_model: Modèle panel
+    """
+    return joblib.load(os.path.join(input_dir, 'panel.pkl'))
+
 if __name__ == "__main__":
     # Charger les rendements
     returns = pd.read_csv('../../data/processed/returns.csv', index_col=0, parse_dates=True)
@@ -0,0 +1,288 @@
+"""
+Module de moments glissants par sommes préfixées.
+
+Les sommes cumulées des rendements et de leurs produits croisés permettent d'obtenir
+la moyenne et la covariance de n'importe quelle fenêtre [start, end] par une simple
+soustraction, au lieu de reparcourir la fenêtre à chaque rééquilibrage. Pour borner la
+mémoire (une matrice N x N par point), les sommes ne sont conservées que tous les
+`checkpoint` jours ; une requête y ajoute au plus `checkpoint - 1` lignes à chaque bord.
+
+Les valeurs manquantes sont traitées par paires, comme `DataFrame.cov` : chaque
+covariance n'utilise que les jours où les deux actifs ont un rendement.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Nombre de premiers jours dont la moyenne sert de centre aux sommes préfixées
+_SHIFT_ROWS = 21
+
+
+class RollingMoments:
+    """
+    Magasin de moments permettant des requêtes de fenêtre en temps constant.
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers (une colonne par ticker)
+    - periods_per_year: Nombre de périodes par an pour l'annualisation
+    - checkpoint: Espacement (en jours) des sommes préfixées conservées
+    - halflife: Demi-vie (jours) de la variante à pondération exponentielle (EWMA),
+      None pour ne pas la préparer
+
+    Attributes:
+    - tickers: Liste des tickers
+    - index: Index des dates des rendements
+    """
+
+    def __init__(self, returns, periods_per_year=252, checkpoint=21, halflife=None):
+        if checkpoint < 1:
+            raise ValueError("checkpoint doit être au moins 1")
+        self.tickers = list(returns.columns)
+        self.index = returns.index
+        self._labels = pd.Index(returns.columns)
+        self.periods_per_year = periods_per_year
+        self.checkpoint = checkpoint
+        self.halflife = halflife
+        self._ewma = None
+        if halflife is not None:
+            self._decay = 0.5 ** (1 / halflife)
+        self._build(returns.to_numpy(dtype=float))
+
+    def _build(self, values):
+        # Ordre C : les sommes par colonne ne dépendent pas de la disposition d'origine
+        values = np.ascontiguousarray(values)
+        mask = ~np.isnan(values)
+        self._missing = not mask.all()
+        # Centrer sur la moyenne des premiers jours limite l'annulation lors des
+        # soustractions, sans dépendre des lignes ajoutées ensuite (voir append)
+        self._head = values[:_SHIFT_ROWS].copy()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            shift = np.nanmean(self._head, axis=0) if len(values) else np.zeros(values.shape[1])
+        self._shift = np.nan_to_num(shift)
+        self._x = np.where(mask, values - self._shift, 0.0)
+        self._m = mask.astype(float)
+
+        self._plain = self._checkpoints(1.0)
+        if self.halflife is not None:
+            self._ewma = self._checkpoints(self._decay)
+
+    def __len__(self):
+        return len(self._x)
+
+    def append(self, returns):
+        """
+        Ajoute de nouveaux jours à la fin de l'historique.
+
+        Seuls les points de contrôle postérieurs à la dernière ligne sont calculés ; le
+        magasin obtenu est identique (au bit près) à celui construit sur l'historique
+        complet, sauf si les premières valeurs manquantes apparaissent dans les nouvelles
+        lignes (reconstruction, égale aux arrondis près).
+
+        Les tableaux existants ne sont pas modifiés en place, si bien qu'une copie
+        superficielle (copy.copy) faite avant l'ajout reste valide.
+
+        Parameters:
+        - returns: DataFrame des nouveaux rendements, mêmes colonnes que l'historique
+        """
+        if list(returns.columns) != self.tickers:
+            raise ValueError("Les nouveaux rendements doivent avoir les colonnes du magasin")
+        values = returns.to_numpy(dtype=float)
+        self.index = self.index.append(returns.index)
+        mask = ~np.isnan(values)
+        if len(self._head) < _SHIFT_ROWS or (self._missing is False and not mask.all()):
+            # Décalage pas encore figé, ou structure des sommes changée par des valeurs
+            # manquantes : reconstruction complète (historique court ou cas rare)
+            if len(self._head) < _SHIFT_ROWS:
+                history = np.vstack([self._head, values])
+            else:
+                history = np.vstack([np.where(self._m > 0, self._x + self._shift, np.nan), values])
+            self._build(history)
+            return
+
+        old_rows = len(self._x)
+        self._x = np.vstack([self._x, np.where(mask, values - self._shift, 0.0)])
+        self._m = np.vstack([self._m, mask.astype(float)])
+        self._plain = self._extend(self._plain, 1.0, old_rows)
+        if self._ewma is not None:
+            self._ewma = self._extend(self._ewma, self._decay, old_rows)
+
+    def _extend(self, store, decay, old_rows):
+        """Ajoute à store les points de contrôle des lignes ajoutées après old_rows."""
+        columns = slice(None)
+        first = old_rows // self.checkpoint + 1
+        last = len(self._x) // self.checkpoint + 1
+        if last == first:
+            return store
+        point = {name: values[-1] for name, values in store.items()}
+        points = []
+        for c in range(first, last):
+            block = self._block((c - 1) * self.checkpoint, c * self.checkpoint, decay, columns)
+            point = self._combine(point, block, decay, self.checkpoint)
+            points.append(point)
+        return {name: np.concatenate([store[name], np.stack([p[name] for p in points])])
+                for name in store}
+
+    def _block(self, start, stop, decay, columns):
+        """Sommes pondérées des lignes [start, stop), poids decay^(stop-1-t)."""
+        x = self._x[start:stop, columns]
+        w = decay ** np.arange(stop - start - 1, -1, -1, dtype=float)
+        wx = x * w[:, None]
+        if not self._missing:
+            return {'s1': wx.sum(axis=0), 's2': wx.T @ x, 'n': w.sum(), 'n2': (w * w).sum()}
+        m = self._m[start:stop, columns]
+        wm = m * w[:, None]
+        return {'s1': wx.T @ m, 's2': wx.T @ x, 'n': wm.T @ m, 'n2': (wm * w[:, None]).T @ m}
+
+    def _checkpoints(self, decay):
+        """Sommes préfixées aux lignes 0, checkpoint, 2 * checkpoint, ..."""
+        columns = slice(None)
+        n_points = len(self._x) // self.checkpoint + 1
+        points = [self._block(0, 0, decay, columns)]
+        for c in range(1, n_points):
+            block = self._block((c - 1) * self.checkpoint, c * self.checkpoint, decay, columns)
+            points.append(self._combine(points[-1], block, decay, self.checkpoint))
+        return {name: np.stack([p[name] for p in points]) for name in points[0]}
+
+    @staticmethod
+    def _combine(prefix, block, decay, length, sign=1.0):
+        """prefix * decay^length (decay^(2 * length) pour n2) + sign * block."""
+        combined = {}
+        for name in prefix:
+            factor = decay ** (2 * length if name == 'n2' else length)
+            combined[name] = sign * (prefix[name] * factor) + block[name]
+        return combined
+
+    def _prefix(self, row, decay, store, columns):
+        """Sommes préfixées des lignes [0, row), pour le sous-ensemble de colonnes."""
+        c = row // self.checkpoint
+        base = {}
+        for name, values in store.items():
+            point = values[c]
+            if isinstance(columns, slice):
+                pass
+            elif point.ndim == 2:
+                point = point[np.ix_(columns, columns)]
+            elif point.ndim == 1:
+                point = point[columns]
+            base[name] = point
+        block = self._block(c * self.checkpoint, row, decay, columns)
+        return self._combine(base, block, decay, row - c * self.checkpoint)
+
+    def _window_sums(self, start, end, decay, store, columns):
+        if not 0 <= start <= end < len(self._x):
+            raise IndexError(f"Fenêtre [{start}, {end}] hors de l'historique "
+                             f"(0..{len(self._x) - 1})")
+        upper = self._prefix(end + 1, decay, store, columns)
+        lower = self._prefix(start, decay, store, columns)
+        length = end + 1 - start
+        return {name: upper[name] - lower[name] * decay ** (2 * length if name == 'n2' else length)
+                for name in upper}
+
+    def _statistics(self, sums, columns):
+        tickers = self._labels[columns]
+        shift = self._shift[columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if not self._missing:
+                mean = sums['s1'] / sums['n']
+                cov = ((sums['s2'] - sums['n'] * np.outer(mean, mean))
+                       / (sums['n'] - sums['n2'] / sums['n']))
+            else:
+                # Moyennes par paire (jours où i et j sont présents), comme DataFrame.cov
+                n = sums['n']
+                cov = (sums['s2'] - sums['s1'] * sums['s1'].T / n) / (n - sums['n2'] / n)
+                cov[n < 2] = np.nan
+                mean = np.diag(sums['s1']) / np.diag(n)
+        expected_returns = pd.Series((mean + shift) * self.periods_per_year, index=tickers)
+        cov_matrix = pd.DataFrame(cov * self.periods_per_year, index=tickers, columns=tickers,
+                                  copy=False)
+        return expected_returns, cov_matrix
+
+    def _columns(self, tickers):
+        if tickers is None:
+            return slice(None)
+        positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        missing = [ticker for ticker in tickers if ticker not in positions]
+        if missing:
+            raise KeyError(f"Tickers absents du magasin de moments : {missing}")
+        return np.array([positions[ticker] for ticker in tickers], dtype=int)
+
+    def window(self, start, end, tickers=None):
+        """
+        Rendements attendus et covariance annualisés de la fenêtre [start, end].
+
+        Équivalent à calculate_portfolio_metrics(returns.iloc[start:end + 1]), aux
+        arrondis près.
+
+        Parameters:
+        - start: Position du premier jour de la fenêtre
+        - end: Position du dernier jour de la fenêtre (inclus)
+        - tickers: Sélection de tickers (None : tous), servie sans calcul sur les autres
+
+        Returns:
+        - expected_returns: Série des rendements attendus annualisés
+        - cov_matrix: DataFrame de la matrice de covariance annualisée
+        """
+        columns = self._columns(tickers)
+        sums = self._window_sums(start, end, 1.0, self._plain, columns)
+        return self._statistics(sums, columns)
+
+    def ewma(self, start, end, tickers=None):
+        """
+        Variante à pondération exponentielle de window : le jour t pèse decay^(end - t),
+        comme `returns.iloc[start:end + 1].ewm(halflife=halflife)` (adjust=True, covariance
+        non biaisée) évalué au dernier jour.
+
+        Parameters:
+        - start: Position du premier jour de la fenêtre
+        - end: Position du dernier jour de la fenêtre (inclus)
+        - tickers: Sélection de tickers (None : tous)
+
+        Returns:
+        - expected_returns: Série des rendements attendus annualisés
+        - cov_matrix: DataFrame de la matrice de covariance annualisée
+        """
+        if self._ewma is None:
+            raise ValueError("La variante EWMA exige une demi-vie (halflife) à la construction")
+        columns = self._columns(tickers)
+        sums = self._window_sums(start, end, self._decay, self._ewma, columns)
+        return self._statistics(sums, columns)
+
+
+def rolling_mean_std(returns, window):
+    """
+    Moyennes et écarts-types glissants de chaque colonne par sommes cumulées.
+
+    Équivalent à returns.rolling(window).mean() et returns.rolling(window).std(), aux
+    arrondis près : une fenêtre incomplète (début d'historique, valeur manquante) donne NaN.
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers
+    - window: Taille de la fenêtre (jours)
+
+    Returns:
+    - mean: DataFrame des moyennes glissantes
+    - std: DataFrame des écarts-types glissants
+    """
+    values = returns.to_numpy(dtype=float)
+    mask = ~np.isnan(values)
+    shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else 0.0
+    x = np.where(mask, values - shift, 0.0)
+
+    def window_sum(a):
+        cumulative = np.vstack([np.zeros((1, a.shape[1])), np.cumsum(a, axis=0)])
+        sums = np.full(a.shape, np.nan)
+        sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+        return sums
+
+    count = window_sum(mask.astype(float))
+    s1 = window_sum(x)
+    s2 = window_sum(x * x)
+    complete = count == window
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(complete, s1 / window + shift, np.nan)
+        var = np.where(complete, (s2 - s1 * s1 / window) / (window - 1), np.nan)
+    std = np.sqrt(np.maximum(var, 0.0))
+    return (pd.DataFrame(mean, index=returns.index, columns=returns.columns),
+            pd.DataFrame(std, index=returns.index, columns=returns.columns))
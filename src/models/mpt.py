@@ -1,7 +1,20 @@
+import time
+
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 
+from src.models.anytime import BackgroundSolver
+from src.models.cache import memoize
+from src.models.cla import (
+    InfeasibleCornerError,
+    critical_line,
+    interpolate_frontier,
+    max_return_portfolio,
+    validate_bounds
+)
+from src.models.parallel import effective_n_jobs, parallel_map
+
 def calculate_portfolio_metrics(returns):
     """
     Calculate expected returns and covariance matrix.
@@ -21,7 +34,9 @@ def portfolio_performance(weights, returns, cov_matrix):
     portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix * 252, weights)))
     return portfolio_return, portfolio_volatility
 
-def optimize_portfolio(returns, cov_matrix, target_return=None):
+def optimize_portfolio(returns, cov_matrix, target_return=None, init_guess=None,
+                       analytic_gradients=True, return_info=False, time_budget=None,
+                       bounds=(0, 1), callback=None):
     """
     Optimize portfolio using Markowitz model.
 
@@ -29,41 +44,538 @@ def optimize_portfolio(returns, cov_matrix, target_return=None):
     - returns: Expected returns
     - cov_matrix: Covariance matrix
     - target_return: Target return for constrained optimization (optional)
+    - init_guess: Starting weights, e.g. a neighbouring solution (default: equal weights)
+    - analytic_gradients: Give SLSQP exact gradients instead of finite differences
+    - return_info: Also return solver diagnostics (iterations, evaluations, solve time,
+      largest violation of the budget, target and bound constraints)
+    - time_budget: Wall-clock budget in seconds. SLSQP stops after the iteration that
+      exhausts it and returns the current iterate, projected onto the weights within the
+      bounds that sum to 1; info['success'] and info['max_violation'] tell how good it is
+    - bounds: (min, max) weight bounds shared by all assets, or one tuple per asset
+    - callback: Function callback(x) called with each SLSQP iterate; raising
+      StopIteration stops the solver
     """
-    num_assets = len(returns)
-    args = (returns, cov_matrix)
+    mean = np.asarray(returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    num_assets = len(mean)
+    ones = np.ones(num_assets)
+    lower, upper = validate_bounds(num_assets, bounds)
+
+    def volatility(x):
+        return np.sqrt(x @ cov @ x)
+
+    def volatility_grad(x):
+        return cov @ x / volatility(x)
 
     # Constraints
     constraints = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1}]  # Sum of weights = 1
     if target_return is not None:
-        constraints.append({'type': 'eq', 'fun': lambda x: portfolio_performance(x, returns, cov_matrix)[0] - target_return})
+        constraints.append({'type': 'eq', 'fun': lambda x: x @ mean - target_return})
+    if analytic_gradients:
+        constraints[0]['jac'] = lambda x: ones
+        if target_return is not None:
+            constraints[1]['jac'] = lambda x: mean
 
-    # Bounds
-    bounds = tuple((0, 1) for _ in range(num_assets))
+    # Initial guess (equal weights when the bounds allow them)
+    if init_guess is None:
+        init_guess = _feasible_guess(lower, upper)
 
-    # Initial guess
-    init_guess = num_assets * [1. / num_assets]
+    # Stop SLSQP after the iteration that exhausts the time budget
+    start = time.perf_counter()
+    on_iterate = callback
+    if time_budget is not None:
+        def on_iterate(x):
+            if callback is not None:
+                callback(x)
+            if time.perf_counter() - start >= time_budget:
+                raise StopIteration
 
     # Optimization
-    result = minimize(lambda x: portfolio_performance(x, returns, cov_matrix)[1],
-                     init_guess, method='SLSQP', bounds=bounds, constraints=constraints)
+    result = minimize(volatility, init_guess, method='SLSQP', bounds=list(zip(lower, upper)),
+                      constraints=constraints,
+                      jac=volatility_grad if analytic_gradients else None,
+                      callback=on_iterate)
+    elapsed = time.perf_counter() - start
+
+    # An interrupted iterate may be slightly infeasible: project it onto the bounded budget set
+    weights = result.x
+    if time_budget is not None and not result.success:
+        weights = _project_capped_simplex(weights, lower, upper)
+
+    if return_info:
+        violation = max(abs(weights.sum() - 1), np.max(lower - weights), np.max(weights - upper))
+        if target_return is not None:
+            violation = max(violation, abs(weights @ mean - target_return))
+        info = {
+            'success': result.success,
+            'message': result.message,
+            'max_violation': violation,
+            'nit': result.nit,
+            'nfev': result.nfev,
+            'njev': result.njev,
+            'time': elapsed
+        }
+        return weights, info
+    return weights
+
+def optimize_portfolio_in_background(returns, cov_matrix, target_return=None, bounds=(0, 1),
+                                     tol=1e-6):
+    """
+    Run optimize_portfolio in a background thread, publishing its iterates as it goes.
+
+    The solve runs uninterrupted (SLSQP keeps its Hessian estimate), and the published
+    portfolio is the best feasible iterate so far: its volatility never increases.
+
+    Parameters:
+    - returns: Expected returns
+    - cov_matrix: Covariance matrix
+    - target_return: Target return for constrained optimization (optional)
+    - bounds: (min, max) weight bounds shared by all assets, or one tuple per asset
+    - tol: Largest constraint violation of a published iterate (default: the accuracy
+      SLSQP itself converges to)
+
+    Returns:
+    - solver: Started BackgroundSolver; solver.result() gives the current (weights, info),
+      or None before the first feasible iterate; info['success'] is only set by the final
+      solution
+    """
+    mean = np.asarray(returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    lower, upper = validate_bounds(len(mean), bounds)
+
+    def violation(x):
+        worst = max(abs(x.sum() - 1), np.max(lower - x), np.max(x - upper))
+        if target_return is not None:
+            worst = max(worst, abs(x @ mean - target_return))
+        return worst
+
+    def solve(publish):
+        start = time.perf_counter()
+        nit = 0
+
+        def on_iterate(x):
+            nonlocal nit
+            nit += 1
+            info = {'success': False, 'message': 'Iterate', 'max_violation': violation(x),
+                    'nit': nit, 'time': time.perf_counter() - start}
+            if publish((x.copy(), info), np.sqrt(x @ cov @ x), info['max_violation'] <= tol):
+                raise StopIteration
+
+        weights, info = optimize_portfolio(mean, cov, target_return, return_info=True,
+                                           bounds=bounds, callback=on_iterate)
+        publish((weights, info), np.sqrt(weights @ cov @ weights), violation(weights) <= tol)
+
+    return BackgroundSolver(solve).start()
+
+def max_sharpe_portfolio(returns, cov_matrix, risk_free_rate=0.01, bounds=(0, 1),
+                         return_info=False):
+    """
+    Compute the tangency (maximum Sharpe ratio) portfolio in a single optimization.
+
+    Uses the convex reformulation: minimize y' S y subject to (mu - rf)' y = 1,
+    sum(y) = k, lower * k <= y <= upper * k and k >= 0, then returns w = y / k.
+    If no portfolio beats the risk-free rate, the Sharpe ratio is maximized directly.
+
+    Parameters:
+    - returns: Expected returns
+    - cov_matrix: Covariance matrix
+    - risk_free_rate: Risk-free rate, in the same units as the expected returns
+    - bounds: (min, max) weight bounds shared by all assets, or one tuple per asset
+    - return_info: Also return solver diagnostics (iterations, evaluations, solve time)
+    """
+    mean = np.asarray(returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    num_assets = len(mean)
+    lower, upper = validate_bounds(num_assets, bounds)
+    excess = mean - risk_free_rate
+
+    start = time.perf_counter()
+    if max_return_portfolio(excess, lower, upper)[0] @ excess > 0:
+        result = _solve_tangency(excess, cov, lower, upper)
+        weights = result.x[:-1] / result.x[-1]
+    else:
+        result = _solve_sharpe(excess, cov, lower, upper)
+        weights = result.x
+    elapsed = time.perf_counter() - start
+
+    # Remove the solver's numerical noise around the bounds
+    weights = np.clip(weights, lower, upper)
+    weights /= weights.sum()
+
+    if return_info:
+        info = {
+            'success': result.success,
+            'message': result.message,
+            'nit': result.nit,
+            'nfev': result.nfev,
+            'njev': result.njev,
+            'time': elapsed
+        }
+        return weights, info
+    return weights
+
+def _project_capped_simplex(weights, lower, upper, max_iter=100):
+    """
+    Euclidean projection onto {lower <= w <= upper, sum(w) = 1}.
+
+    The projection is clip(weights - tau, lower, upper) for the shift tau that makes the
+    weights sum to 1; the sum decreases with tau, so tau is found by bisection.
+    """
+    tau_low, tau_high = np.min(weights - upper), np.max(weights - lower)
+    for _ in range(max_iter):
+        tau = (tau_low + tau_high) / 2
+        if np.clip(weights - tau, lower, upper).sum() > 1:
+            tau_low = tau
+        else:
+            tau_high = tau
+        if tau_high - tau_low <= 1e-15 * max(1.0, abs(tau)):
+            break
+    projected = np.clip(weights - (tau_low + tau_high) / 2, lower, upper)
+    # Remaining rounding error goes to the weights strictly inside their bounds
+    free = (projected > lower) & (projected < upper)
+    if free.any():
+        projected[free] += (1 - projected.sum()) / free.sum()
+    return np.clip(projected, lower, upper)
+
+def _feasible_guess(lower, upper):
+    """
+    Equal weights moved inside the bounds, keeping the sum of weights at 1.
+    """
+    weights = np.clip(np.full(len(lower), 1. / len(lower)), lower, upper)
+    gap = 1 - weights.sum()
+    room = (upper - weights) if gap > 0 else (weights - lower)
+    if room.sum() > 0:
+        weights += gap * room / room.sum()
+    return weights
+
+def _solve_tangency(excess, cov, lower, upper):
+    """
+    Solve the convex tangency problem in the scaled variables x = (y, k).
+    """
+    num_assets = len(excess)
+    ones = np.ones(num_assets)
+
+    def objective(x):
+        y = x[:-1]
+        return y @ cov @ y
+
+    def objective_grad(x):
+        return np.append(2 * cov @ x[:-1], 0.)
+
+    constraints = [
+        {'type': 'eq', 'fun': lambda x: x[:-1] @ excess - 1,
+         'jac': lambda x: np.append(excess, 0.)},
+        {'type': 'eq', 'fun': lambda x: x[:-1].sum() - x[-1],
+         'jac': lambda x: np.append(ones, -1.)}
+    ]
+    # Bounds on w become linear constraints on y once scaled by k
+    if np.any(lower != 0):
+        constraints.append({'type': 'ineq', 'fun': lambda x: x[:-1] - lower * x[-1],
+                            'jac': lambda x: np.hstack([np.eye(num_assets), -lower[:, None]])})
+    if np.any(upper < 1) or np.any(lower < 0):
+        constraints.append({'type': 'ineq', 'fun': lambda x: upper * x[-1] - x[:-1],
+                            'jac': lambda x: np.hstack([-np.eye(num_assets), upper[:, None]])})
+    y_bound = (0, None) if np.all(lower >= 0) else (None, None)
+    bounds = [y_bound] * num_assets + [(0, None)]
+
+    # Start from a feasible portfolio with positive excess return
+    weights = _feasible_guess(lower, upper)
+    if weights @ excess <= 0:
+        weights, _ = max_return_portfolio(excess, lower, upper)
+    scale = 1 / (weights @ excess)
+    init_guess = np.append(weights * scale, scale)
+
+    return minimize(objective, init_guess, method='SLSQP', jac=objective_grad,
+                    bounds=bounds, constraints=constraints,
+                    options={'ftol': 1e-12, 'maxiter': 500})
+
+def _solve_sharpe(excess, cov, lower, upper):
+    """
+    Maximize the (negative) Sharpe ratio directly in the weights.
+    """
+    num_assets = len(excess)
+
+    def objective(w):
+        return -(w @ excess) / np.sqrt(w @ cov @ w)
+
+    def objective_grad(w):
+        vol = np.sqrt(w @ cov @ w)
+        return -(excess / vol - (w @ excess) * (cov @ w) / vol ** 3)
+
+    constraints = [{'type': 'eq', 'fun': lambda w: w.sum() - 1,
+                    'jac': lambda w: np.ones(num_assets)}]
 
-    return result.x
+    return minimize(objective, _feasible_guess(lower, upper), method='SLSQP',
+                    jac=objective_grad, bounds=list(zip(lower, upper)),
+                    constraints=constraints, options={'ftol': 1e-12, 'maxiter': 500})
 
-def efficient_frontier(returns, cov_matrix, num_portfolios=100):
+def efficient_frontier(returns, cov_matrix, num_portfolios=100, method='cla', warm_start=None,
+                       n_jobs=1):
     """
     Generate the efficient frontier.
+
+    Parameters:
+    - returns: Expected returns
+    - cov_matrix: Covariance matrix
+    - num_portfolios: Number of portfolios on the frontier
+    - method: 'cla' computes the exact long-only frontier in one pass with the critical
+      line algorithm (falling back to 'slsqp' if its path is numerically degenerate),
+      'slsqp' solves one constrained optimization per target return
+    - warm_start: With 'slsqp', start each solve from the previous point's weights
+      (default: only when running serially, since it chains the points)
+    - n_jobs: With 'slsqp', worker processes sharing the inputs through shared memory
+      (-1: one per CPU); the result is identical to the serial cold-start run
     """
-    results = []
-    return_range = np.linspace(returns.min(), returns.max(), num_portfolios)
+    if method == 'cla':
+        try:
+            corners = corner_portfolios(returns, cov_matrix)
+        except InfeasibleCornerError:
+            return efficient_frontier(returns, cov_matrix, num_portfolios, 'slsqp',
+                                      warm_start, n_jobs)
+        mean = np.asarray(returns, dtype=float)
+        cov = np.asarray(cov_matrix, dtype=float)
+
+        # The efficient part of the frontier spans minimum variance to maximum return
+        return_range = np.linspace(corners[-1] @ mean, corners[0] @ mean, num_portfolios)
+        weights = interpolate_frontier(corners, mean, return_range)
+        rets = weights @ mean
+        vols = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+
+        return pd.DataFrame({'Return': rets, 'Volatility': vols, 'Weights': list(weights)})
+
+    if method != 'slsqp':
+        raise ValueError(f"Unknown frontier method: {method}")
 
-    for target_return in return_range:
-        weights = optimize_portfolio(returns, cov_matrix, target_return)
-        ret, vol = portfolio_performance(weights, returns, cov_matrix)
-        results.append([ret, vol, weights])
+    parallel = effective_n_jobs(n_jobs) > 1
+    if warm_start is None:
+        warm_start = not parallel
+    elif warm_start and parallel:
+        raise ValueError("warm_start chains the frontier points and cannot run with n_jobs > 1")
 
+    mean = np.asarray(returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    return_range = np.linspace(mean.min(), mean.max(), num_portfolios)
+
+    if warm_start:
+        # Warm start each point from its neighbour on the frontier
+        frontier_weights = []
+        weights = None
+        for target_return in return_range:
+            weights = optimize_portfolio(mean, cov, target_return, init_guess=weights)
+            frontier_weights.append(weights)
+    else:
+        frontier_weights = parallel_map(_frontier_point, [(t,) for t in return_range],
+                                        {'mean': mean, 'cov': cov}, n_jobs)
+
+    results = [[weights @ mean, np.sqrt(weights @ cov @ weights), weights]
+               for weights in frontier_weights]
     return pd.DataFrame(results, columns=['Return', 'Volatility', 'Weights'])
 
+def _frontier_point(arrays, target_return):
+    """
+    Cold-start solve of one frontier point (module-level so that worker processes can run it).
+    """
+    return optimize_portfolio(arrays['mean'], arrays['cov'], target_return)
+
+def corner_portfolios(returns, cov_matrix, bounds=(0, 1)):
+    """
+    Compute the corner portfolios of the efficient frontier (critical line algorithm).
+
+    Parameters:
+    - returns: Expected returns
+    - cov_matrix: Covariance matrix
+    - bounds: (min, max) weight bounds shared by all assets, or one tuple per asset
+
+    Returns:
+    - corners: Array of corner weights, from maximum return down to minimum variance
+
+    Raises:
+    - InfeasibleCornerError: if the critical line path is numerically degenerate
+    """
+    corners, _ = critical_line(np.asarray(returns, dtype=float),
+                               np.asarray(cov_matrix, dtype=float), bounds)
+    return corners
+
+def optimize_many(returns, cov_matrix, problems, n_jobs=1):
+    """
+    Solve a batch of portfolio problems that share one covariance source.
+
+    Each problem is a dict with optional keys:
+    - 'assets': Tickers (or positions) of the subset to invest in (default: all assets)
+    - 'target_return': Minimum-volatility portfolio with this expected return
+    - 'risk_free_rate': Tangency (maximum Sharpe ratio) portfolio for this rate
+    - 'bounds': (min, max) weight bounds, shared or one tuple per asset of the subset
+    A problem with neither a target return nor a risk-free rate asks for the minimum
+    volatility portfolio.
+
+    Problems are grouped by asset subset and bounds; each group runs the critical line
+    algorithm once and answers all of its problems with vectorized interpolation and
+    a closed-form Sharpe search along the frontier segments. Problems off the efficient
+    frontier (target below the minimum-variance return, no asset beating the risk-free
+    rate), and every problem of a group whose critical line path fails its feasibility
+    check (InfeasibleCornerError), are solved one by one with SLSQP, in a process pool
+    when n_jobs > 1; the workers read the expected returns and covariance matrix from
+    shared memory.
+
+    Parameters:
+    - returns: Expected returns
+    - cov_matrix: Covariance matrix
+    - problems: Sequence of problem dicts
+    - n_jobs: Worker processes for the SLSQP fallback (-1: one per CPU); the result
+      does not depend on it
+
+    Returns:
+    - weights: Array (n_problems, n_assets) over the full universe, 0 outside each subset
+    - info: DataFrame with, per problem, the solver used ('cla' or 'slsqp'), its success,
+      and the portfolio's expected return and volatility
+    """
+    mean = np.asarray(returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    labels = list(returns.index) if isinstance(returns, pd.Series) else None
+    num_assets = len(mean)
+
+    weights = np.zeros((len(problems), num_assets))
+    methods = np.full(len(problems), 'cla', dtype=object)
+    success = np.ones(len(problems), dtype=bool)
+
+    groups = {}
+    for i, problem in enumerate(problems):
+        unknown = set(problem) - {'assets', 'target_return', 'risk_free_rate', 'bounds'}
+        if unknown:
+            raise ValueError(f"Unknown problem keys: {sorted(unknown)}")
+        if problem.get('target_return') is not None and problem.get('risk_free_rate') is not None:
+            raise ValueError("A problem takes a target return or a risk-free rate, not both")
+        assets = _asset_positions(problem.get('assets'), labels, num_assets)
+        lower, upper = validate_bounds(len(assets), problem.get('bounds', (0, 1)))
+        key = (tuple(assets), lower.tobytes(), upper.tobytes())
+        groups.setdefault(key, (assets, lower, upper, []))[3].append(i)
+
+    fallback = []
+    for assets, lower, upper, indices in groups.values():
+        sub_mean = mean[assets]
+        sub_cov = cov[np.ix_(assets, assets)]
+        try:
+            corners, _ = critical_line(sub_mean, sub_cov, list(zip(lower, upper)))
+        except InfeasibleCornerError:
+            # Unusable corner path: the whole group goes through SLSQP
+            fallback.extend((i, assets, lower, upper) for i in indices)
+            continue
+        corner_returns = corners @ sub_mean
+
+        targets, target_rows = [], []
+        rates, rate_rows = [], []
+        for i in indices:
+            target = problems[i].get('target_return')
+            rate = problems[i].get('risk_free_rate')
+            if rate is not None:
+                if corner_returns[0] > rate:
+                    rates.append(rate)
+                    rate_rows.append(i)
+                else:
+                    fallback.append((i, assets, lower, upper))
+            elif target is None:
+                targets.append(corner_returns[-1])
+                target_rows.append(i)
+            elif corner_returns[-1] <= target <= corner_returns[0]:
+                targets.append(target)
+                target_rows.append(i)
+            else:
+                fallback.append((i, assets, lower, upper))
+
+        if target_rows:
+            weights[np.ix_(target_rows, assets)] = interpolate_frontier(corners, sub_mean, targets)
+        if rate_rows:
+            weights[np.ix_(rate_rows, assets)] = _frontier_tangency(corners, sub_mean, sub_cov,
+                                                                     np.asarray(rates))
+
+    if fallback:
+        tasks = [(assets, problems[i].get('target_return'), problems[i].get('risk_free_rate'),
+                  list(zip(lower, upper)))
+                 for i, assets, lower, upper in fallback]
+        results = parallel_map(_solve_single, tasks, {'mean': mean, 'cov': cov}, n_jobs)
+        for (i, assets, _, _), (sub_weights, solved) in zip(fallback, results):
+            weights[i, assets] = sub_weights
+            methods[i] = 'slsqp'
+            success[i] = solved
+
+    info = pd.DataFrame({
+        'Method': methods,
+        'Success': success,
+        'Return': weights @ mean,
+        'Volatility': np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    })
+    return weights, info
+
+def _asset_positions(assets, labels, num_assets):
+    """
+    Positions of a problem's asset subset in the full universe.
+    """
+    if assets is None:
+        return np.arange(num_assets)
+    if labels is not None and not all(isinstance(a, (int, np.integer)) for a in assets):
+        missing = [a for a in assets if a not in labels]
+        if missing:
+            raise ValueError(f"Unknown assets: {missing}")
+        return np.array([labels.index(a) for a in assets])
+    return np.asarray(assets, dtype=int)
+
+def _frontier_tangency(corners, mean, cov, rates):
+    """
+    Maximum Sharpe ratio portfolios on a frontier given by its corners, one per rate.
+
+    Along a segment w(t) = lo + t (hi - lo), the Sharpe ratio (a + b t) / sqrt(c + 2 d t + e t^2)
+    has a single stationary point t* = (a d - b c) / (b d - a e); the optimum is at t*
+    (clipped to [0, 1]) or at a corner, for every segment and rate at once.
+    """
+    if len(corners) == 1:
+        return np.repeat(corners, len(rates), axis=0)
+
+    hi, lo = corners[:-1], corners[1:]
+    step = hi - lo
+    a = (lo @ mean)[None, :] - rates[:, None]
+    b = step @ mean
+    c = np.einsum('ij,jk,ik->i', lo, cov, lo)
+    d = np.einsum('ij,jk,ik->i', lo, cov, step)
+    e = np.einsum('ij,jk,ik->i', step, cov, step)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_star = np.nan_to_num((a * d - b * c) / (b * d - a * e))
+    candidates = np.stack([np.zeros_like(a), np.ones_like(a), np.clip(t_star, 0, 1)])
+    sharpe = (a + b * candidates) / np.sqrt(np.maximum(c + 2 * d * candidates
+                                                       + e * candidates ** 2, 1e-300))
+
+    # Best candidate for each rate, over all segments and candidate positions
+    flat = sharpe.transpose(1, 0, 2).reshape(len(rates), -1)
+    best = flat.argmax(axis=1)
+    kind, segment = np.divmod(best, len(lo))
+    t = candidates[kind, np.arange(len(rates)), segment]
+    return lo[segment] + t[:, None] * step[segment]
+
+def _solve_single(arrays, assets, target_return, risk_free_rate, bounds):
+    """
+    SLSQP solve of one batch problem (module-level so that worker processes can run it).
+    """
+    mean = arrays['mean'][assets]
+    cov = arrays['cov'][np.ix_(assets, assets)]
+    if risk_free_rate is not None:
+        weights, info = max_sharpe_portfolio(mean, cov, risk_free_rate, bounds, return_info=True)
+    else:
+        weights, info = optimize_portfolio(mean, cov, target_return, return_info=True,
+                                           bounds=bounds)
+    return weights, info['success']
+
+def _solve_converged(arguments, result):
+    """True unless the solve was cut short by its time budget."""
+    if arguments['time_budget'] is None:
+        return True
+    return arguments['return_info'] and result[1]['success']
+
+# Memoized entry points for the interactive apps (see src/models/cache.py); a solve
+# interrupted by its time budget is not memoized
+cached_optimize_portfolio = memoize(optimize_portfolio, cacheable=_solve_converged)
+cached_max_sharpe_portfolio = memoize(max_sharpe_portfolio)
+cached_efficient_frontier = memoize(efficient_frontier)
+
 if __name__ == "__main__":
     returns_df = pd.read_csv('../../data/processed/returns.csv', index_col='Date', parse_dates=True)
     returns, cov_matrix = calculate_portfolio_metrics(returns_df)
@@ -1,8 +1,13 @@
 import pandas as pd
 import numpy as np
-from src.models.mpt import optimize_portfolio, portfolio_performance, calculate_portfolio_metrics
+from src.models.mpt import (
+    optimize_portfolio,
+    max_sharpe_portfolio,
+    portfolio_performance,
+    calculate_portfolio_metrics
+)
 
-def backtest_portfolio(returns, predicted_returns, cov_matrix):
+def backtest_portfolio(returns, predicted_returns, cov_matrix, risk_free_rate=None):
     """
     Backtest portfolio using predicted returns.
 
@@ -10,8 +15,13 @@ def backtest_portfolio(returns, predicted_returns, cov_matrix):
     - returns: Historical returns
     - predicted_returns: Predicted returns from ML model
     - cov_matrix: Covariance matrix
+    - risk_free_rate: If given, hold the tangency (max Sharpe) portfolio of the predicted
+      returns instead of the minimum variance portfolio
     """
-    weights = optimize_portfolio(predicted_returns, cov_matrix)
+    if risk_free_rate is not None:
+        weights = max_sharpe_portfolio(predicted_returns, cov_matrix, risk_free_rate)
+    else:
+        weights = optimize_portfolio(predicted_returns, cov_matrix)
     portfolio_return, portfolio_volatility = portfolio_performance(weights, returns, cov_matrix)
 
     # Simulate portfolio performance
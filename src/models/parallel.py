@@ -0,0 +1,148 @@
+"""
+Module d'exécution parallèle des balayages d'optimisation (frontière, lots de problèmes).
+
+Les grands tableaux communs à toutes les tâches (rendements attendus, matrice de
+covariance) sont copiés une seule fois dans des blocs `multiprocessing.shared_memory` ;
+chaque processus s'y attache à son démarrage et les tâches ne transportent plus que
+leurs petits paramètres. Les résultats sont renvoyés dans l'ordre des tâches, si bien
+qu'une exécution parallèle donne exactement le même résultat que l'exécution en série.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Tableaux partagés vus par le processus courant (renseignés dans chaque worker)
+_WORKER_ARRAYS = {}
+_WORKER_BLOCKS = []
+
+
+def effective_n_jobs(n_jobs):
+    """
+    Nombre de processus effectivement utilisés.
+
+    Parameters:
+    - n_jobs: 1 (ou None) pour une exécution en série, -1 pour un processus par CPU,
+      un entier négatif -k pour tous les CPU sauf k-1
+
+    Returns:
+    - n_jobs: Nombre de processus (au moins 1)
+    """
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+class SharedArrays:
+    """
+    Copie des tableaux numpy dans la mémoire partagée, le temps d'un bloc `with`.
+
+    Parameters:
+    - arrays: Dictionnaire nom -> array
+
+    Attributes:
+    - spec: Description picklable (nom -> (bloc, forme, dtype)) transmise aux workers
+    """
+
+    def __init__(self, arrays):
+        self.spec = {}
+        self._blocks = []
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.spec[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Libère les blocs de mémoire partagée."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def attach_shared_arrays(spec):
+    """
+    Attache le processus courant aux tableaux décrits par `spec` (en lecture seule).
+
+    Parameters:
+    - spec: Description produite par SharedArrays.spec
+
+    Returns:
+    - arrays: Dictionnaire nom -> array adossé à la mémoire partagée
+    """
+    arrays = {}
+    for name, (block_name, shape, dtype) in spec.items():
+        # Le bloc appartient au processus parent, seul chargé de le détruire
+        block = shared_memory.SharedMemory(name=block_name)
+        _WORKER_BLOCKS.append(block)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+    return arrays
+
+
+def _init_worker(spec, context):
+    _WORKER_ARRAYS.clear()
+    _WORKER_ARRAYS.update(attach_shared_arrays(spec))
+    _WORKER_ARRAYS.update(context)
+
+
+def _run_task(func, args):
+    return func(_WORKER_ARRAYS, *args)
+
+
+def parallel_map(func, tasks, arrays, n_jobs=1, context=None, on_result=None):
+    """
+    Applique func(arrays, *task) à chaque tâche, en série ou dans un pool de processus.
+
+    Parameters:
+    - func: Fonction définie au niveau d'un module (picklable) ; elle reçoit le
+      dictionnaire des tableaux partagés puis les arguments de la tâche
+    - tasks: Séquence de tuples d'arguments
+    - arrays: Dictionnaire nom -> array partagé par toutes les tâches
+    - n_jobs: Nombre de processus (voir effective_n_jobs)
+    - context: Dictionnaire d'objets picklables (paramètres, modèles) transmis une seule
+      fois à chaque processus et ajoutés au dictionnaire reçu par func
+    - on_result: Fonction on_result(position, result) appelée dès qu'un résultat est
+      disponible, dans l'ordre des tâches (par exemple pour l'enregistrer)
+
+    Returns:
+    - results: Liste des résultats, dans l'ordre des tâches
+    """
+    tasks = list(tasks)
+    context = context or {}
+    n_jobs = min(effective_n_jobs(n_jobs), len(tasks))
+    if n_jobs <= 1:
+        shared = dict(arrays, **context)
+        return _collect((func(shared, *task) for task in tasks), on_result)
+
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(shared.spec, context)) as executor:
+            chunksize = max(1, len(tasks) // (4 * n_jobs))
+            return _collect(executor.map(_run_task, [func] * len(tasks), tasks,
+                                         chunksize=chunksize), on_result)
+
+
+def _collect(results, on_result):
+    collected = []
+    for position, result in enumerate(results):
+        if on_result is not None:
+            on_result(position, result)
+        collected.append(result)
+    return collected
@@ -0,0 +1,170 @@
+"""
+Module de métriques de performance vectorisées pour plusieurs stratégies à la fois.
+
+calculate_performance_metrics traite une série à la fois et renvoie un tableau long ;
+les fonctions de ce module prennent un tableau (jours x stratégies) de valeurs de
+portefeuille et calculent toutes les métriques de toutes les colonnes en une passe
+numpy. Les variantes glissantes sont en O(n) : sommes préfixées pour le Sharpe, maximum
+glissant de van Herk / Gil-Werman pour le drawdown.
+"""
+import numpy as np
+import pandas as pd
+
+from src.models.moments import rolling_mean_std
+
+# Colonnes du tableau renvoyé par performance_table
+PERFORMANCE_METRICS = ['Rendement Total', 'Rendement Annualisé', 'Volatilité Annualisée',
+                       'Ratio de Sharpe', 'Ratio de Sortino', 'Ratio de Calmar',
+                       'Drawdown Maximal', 'Durée Drawdown Maximale']
+
+
+def performance_table(portfolio_values, dates=None, risk_free_rate=0.01, periods_per_year=252):
+    """
+    Métriques de performance de plusieurs séries de valeurs de portefeuille.
+
+    Chaque colonne peut commencer ou finir par des valeurs manquantes (stratégies de
+    fenêtres différentes) : ses métriques portent sur sa plage de valeurs renseignées.
+
+    Parameters:
+    - portfolio_values: DataFrame (dates x stratégies), Series ou array 2-D des valeurs
+    - dates: Index des dates (par défaut, l'index du DataFrame ; sans dates, les années
+      sont comptées en périodes de periods_per_year)
+    - risk_free_rate: Taux sans risque annualisé
+    - periods_per_year: Nombre de périodes par an pour l'annualisation
+
+    Returns:
+    - table: DataFrame, une ligne par stratégie et une colonne par métrique
+      (PERFORMANCE_METRICS) ; la durée de drawdown est en périodes
+    """
+    values, columns, dates = _as_array(portfolio_values, dates)
+    n_periods, n_series = values.shape
+    rows = np.arange(n_periods)
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=0)
+    last = n_periods - 1 - valid[::-1].argmax(axis=0)
+    series = np.arange(n_series)
+
+    # Rendements : NaN hors de la plage renseignée, ignorés par les agrégats nan*
+    daily_returns = values[1:] / values[:-1] - 1
+    total_return = values[last, series] / values[first, series] - 1
+    if isinstance(dates, pd.DatetimeIndex):
+        years = np.asarray((dates[last] - dates[first]).days) / 365.25
+    else:
+        years = (last - first) / periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual_return = (1 + total_return) ** (1 / years) - 1
+        annual_volatility = np.nanstd(daily_returns, axis=0, ddof=1) * np.sqrt(periods_per_year)
+        downside = np.sqrt(np.nanmean(np.minimum(daily_returns, 0.0) ** 2, axis=0))
+        downside *= np.sqrt(periods_per_year)
+
+        # Drawdown depuis le plus haut atteint ; comme calculate_performance_metrics, le
+        # plus haut part de la première valeur issue d'un rendement (pas de la valeur de départ)
+        tracked = values.copy()
+        tracked[first, series] = np.nan
+        peak = np.fmax.accumulate(tracked, axis=0)
+        drawdown = tracked / peak - 1
+        max_drawdown = np.fmin.reduce(drawdown, axis=0, initial=0.0)
+        sharpe_ratio = (annual_return - risk_free_rate) / annual_volatility
+        sortino_ratio = (annual_return - risk_free_rate) / downside
+        calmar_ratio = annual_return / -max_drawdown
+
+    # Durée sous l'eau : périodes écoulées depuis le dernier plus haut
+    at_peak = ~(drawdown < 0)
+    last_peak = np.maximum.accumulate(np.where(at_peak, rows[:, None], 0), axis=0)
+    duration = np.where(at_peak, 0, rows[:, None] - last_peak).max(axis=0)
+
+    return pd.DataFrame({
+        'Rendement Total': total_return,
+        'Rendement Annualisé': annual_return,
+        'Volatilité Annualisée': annual_volatility,
+        'Ratio de Sharpe': sharpe_ratio,
+        'Ratio de Sortino': sortino_ratio,
+        'Ratio de Calmar': calmar_ratio,
+        'Drawdown Maximal': max_drawdown,
+        'Durée Drawdown Maximale': duration,
+    }, index=columns)
+
+
+def rolling_sharpe(portfolio_values, window, risk_free_rate=0.01, periods_per_year=252):
+    """
+    Ratio de Sharpe annualisé sur une fenêtre glissante de rendements, en O(n).
+
+    Parameters:
+    - portfolio_values: DataFrame (dates x stratégies) ou Series des valeurs
+    - window: Taille de la fenêtre (périodes de rendement)
+    - risk_free_rate: Taux sans risque annualisé
+    - periods_per_year: Nombre de périodes par an
+
+    Returns:
+    - sharpe: DataFrame des ratios glissants (NaN tant que la fenêtre est incomplète)
+    """
+    frame = _as_frame(portfolio_values)
+    mean, std = rolling_mean_std(frame.pct_change(), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (mean * periods_per_year - risk_free_rate) / (std * np.sqrt(periods_per_year))
+
+
+def rolling_drawdown(portfolio_values, window):
+    """
+    Drawdown par rapport au plus haut des `window` dernières valeurs, en O(n).
+
+    Parameters:
+    - portfolio_values: DataFrame (dates x stratégies) ou Series des valeurs
+    - window: Taille de la fenêtre (périodes)
+
+    Returns:
+    - drawdown: DataFrame des drawdowns glissants (le début de série utilise les
+      valeurs disponibles)
+    """
+    frame = _as_frame(portfolio_values)
+    values = frame.to_numpy(dtype=float)
+    peak = sliding_max(values, window)
+    return pd.DataFrame(values / peak - 1, index=frame.index, columns=frame.columns)
+
+
+def sliding_max(values, window):
+    """
+    Maximum glissant de chaque colonne (algorithme de van Herk / Gil-Werman).
+
+    Les lignes sont découpées en blocs de `window` : le maximum d'une fenêtre est celui
+    du suffixe de son premier bloc et du préfixe du suivant, soit trois passes
+    vectorisées quelle que soit la taille de la fenêtre. Les NaN sont ignorés.
+
+    Parameters:
+    - values: Array (lignes, colonnes)
+    - window: Taille de la fenêtre
+
+    Returns:
+    - maxima: Array de même forme ; la ligne i est le maximum des lignes
+      [max(0, i - window + 1), i]
+    """
+    if window < 1:
+        raise ValueError("window doit être au moins 1")
+    n_rows, n_columns = values.shape
+    # Fenêtres du début complétées par -inf, puis nombre entier de blocs
+    n_blocks = -(-(n_rows + window - 1) // window)
+    padded = np.full((n_blocks * window, n_columns), -np.inf)
+    padded[window - 1:window - 1 + n_rows] = np.where(np.isnan(values), -np.inf, values)
+    blocks = padded.reshape(n_blocks, window, n_columns)
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape(-1, n_columns)
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, n_columns)
+    # Fenêtre [j, j + window - 1] du tableau complété, pour j = 0 .. n_rows - 1
+    maxima = np.maximum(suffix[:n_rows], prefix[window - 1:window - 1 + n_rows])
+    maxima[np.isneginf(maxima)] = np.nan
+    return maxima
+
+
+def _as_frame(portfolio_values):
+    if isinstance(portfolio_values, pd.Series):
+        return portfolio_values.to_frame()
+    if isinstance(portfolio_values, pd.DataFrame):
+        return portfolio_values
+    values = np.asarray(portfolio_values, dtype=float)
+    return pd.DataFrame(values.reshape(len(values), -1))
+
+
+def _as_array(portfolio_values, dates):
+    frame = _as_frame(portfolio_values)
+    if dates is None:
+        dates = frame.index
+    return frame.to_numpy(dtype=float), frame.columns, dates
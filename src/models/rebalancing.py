@@ -0,0 +1,175 @@
+"""
+Module des politiques de rééquilibrage des backtests.
+
+Une politique décide, à partir de la trajectoire des poids qui dérivent depuis le
+dernier rééquilibrage, des jours où il faut ré-optimiser. La détection est vectorisée
+sur toute la trajectoire d'un segment : le backtest n'appelle l'optimiseur qu'au premier
+jour déclencheur, puis recommence depuis ce jour.
+"""
+import numpy as np
+import pandas as pd
+
+from src.models.moments import rolling_mean_std
+
+# Longueur minimale (jours) de la fenêtre où simulate_policy cherche un déclencheur
+_MIN_SPAN = 63
+
+
+class CalendarPolicy:
+    """
+    Rééquilibrage à dates fixes, tous les `rebalance_freq` jours.
+
+    Les dates étant connues d'avance, backtest_strategy résout toutes les optimisations
+    d'un coup (éventuellement en parallèle).
+
+    Parameters:
+    - rebalance_freq: Fréquence de rééquilibrage (jours)
+    """
+
+    def __init__(self, rebalance_freq=21):
+        self.rebalance_freq = rebalance_freq
+
+    def reset(self, target, history):
+        """Appelée à chaque rééquilibrage (voir BandPolicy.reset)."""
+
+    def triggers(self, weights, portfolio_returns):
+        """Déclenche tous les rebalance_freq jours depuis le dernier rééquilibrage."""
+        return np.arange(1, len(weights) + 1) % self.rebalance_freq == 0
+
+
+class BandPolicy:
+    """
+    Rééquilibrage quand un poids sort d'une bande de tolérance autour de sa cible.
+
+    Parameters:
+    - tolerance: Écart absolu maximal toléré entre un poids et sa cible (0.05 : 5 points)
+    """
+
+    def __init__(self, tolerance=0.05):
+        self.tolerance = tolerance
+        self._target = None
+
+    def reset(self, target, history):
+        """
+        Appelée à chaque rééquilibrage, y compris l'allocation initiale.
+
+        Parameters:
+        - target: Nouveaux poids cibles
+        - history: Array (window_size, actifs) de la fenêtre d'estimation du rééquilibrage
+        """
+        self._target = np.asarray(target)
+
+    def triggers(self, weights, portfolio_returns):
+        """
+        Jours du segment où il faut rééquilibrer.
+
+        Parameters:
+        - weights: Array (jours, actifs) des poids dérivés en fin de journée, depuis le
+          lendemain du dernier rééquilibrage
+        - portfolio_returns: Array (jours,) des rendements du portefeuille sur ces jours
+
+        Returns:
+        - mask: Array booléen (jours,) ; le premier jour vrai déclenche le rééquilibrage
+        """
+        return np.abs(weights - self._target).max(axis=1) > self.tolerance
+
+
+class VolatilityPolicy:
+    """
+    Rééquilibrage quand la volatilité réalisée s'écarte de celle attendue.
+
+    La volatilité de référence est celle des poids cibles sur la fenêtre d'estimation ;
+    la volatilité réalisée est mesurée sur les `window` derniers jours du segment.
+
+    Parameters:
+    - threshold: Écart relatif déclencheur (0.25 : volatilité 25 % au-dessus ou en dessous)
+    - window: Nombre de jours de la volatilité réalisée
+    - periods_per_year: Nombre de périodes par an pour l'annualisation
+    """
+
+    def __init__(self, threshold=0.25, window=21, periods_per_year=252):
+        self.threshold = threshold
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self._reference = None
+
+    def reset(self, target, history):
+        """Volatilité annualisée des poids cibles sur la fenêtre d'estimation."""
+        returns = np.nan_to_num(history) @ np.asarray(target)
+        self._reference = returns.std(ddof=1) * np.sqrt(self.periods_per_year)
+
+    def triggers(self, weights, portfolio_returns):
+        """Jours où la volatilité réalisée sort de la bande autour de la référence."""
+        mask = np.zeros(len(portfolio_returns), dtype=bool)
+        if len(portfolio_returns) < self.window:
+            return mask
+        _, std = rolling_mean_std(pd.DataFrame(portfolio_returns), self.window)
+        realized = std.to_numpy()[self.window - 1:, 0] * np.sqrt(self.periods_per_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mask[self.window - 1:] = np.abs(realized / self._reference - 1) > self.threshold
+        return mask
+
+
+def simulate_policy(asset_returns, history, window_size, policy, solve):
+    """
+    Simule un portefeuille dont les rééquilibrages sont décidés par une politique.
+
+    Les poids dérivent avec les prix entre deux rééquilibrages. Pour chaque segment, la
+    trajectoire des avoirs est calculée d'un bloc sur une fenêtre qui double tant que la
+    politique n'y marque aucun jour déclencheur (les déclencheurs ne dépendent que des
+    jours passés) ; seul le premier d'entre eux donne lieu à une optimisation. Chaque
+    segment coûte ainsi quelques fois sa propre longueur, et non le reste de l'historique.
+
+    Parameters:
+    - asset_returns: Array (jours, actifs) des rendements à partir du jour 0
+    - history: Array (window_size + jours, actifs) des rendements, fenêtre initiale comprise
+    - window_size: Taille de la fenêtre d'estimation (jours)
+    - policy: Politique de rééquilibrage (reset, triggers)
+    - solve: Fonction solve(rank, day) qui renvoie les poids cibles optimisés au jour day,
+      rank étant le numéro du rééquilibrage
+
+    Returns:
+    - values: Array (jours,) de la valeur du portefeuille, partant de 1
+    - weights: Array (jours, actifs) des poids détenus en fin de journée
+    - rebalance_days: Array des jours de rééquilibrage
+    """
+    n_days, n_assets = asset_returns.shape
+    growth = 1 + np.nan_to_num(asset_returns)
+    values = np.empty(n_days)
+    weights = np.empty((n_days, n_assets))
+    values[0] = 1.0
+    target = np.ones(n_assets) / n_assets
+    rebalance_days = []
+    start = 0
+    span = _MIN_SPAN
+    while True:
+        weights[start] = target
+        policy.reset(target, history[start:start + window_size])
+        if start == n_days - 1:
+            break
+        # Fenêtre doublée jusqu'au premier déclencheur ou à la fin de l'historique
+        while True:
+            stop = min(start + 1 + span, n_days)
+            holdings = target * np.cumprod(growth[start + 1:stop], axis=0)
+            segment_values = values[start] * holdings.sum(axis=1)
+            segment_weights = holdings / holdings.sum(axis=1, keepdims=True)
+            portfolio_returns = (segment_values
+                                 / np.concatenate([[values[start]], segment_values[:-1]]) - 1)
+            hits = np.flatnonzero(policy.triggers(segment_weights, portfolio_returns))
+            if len(hits) or stop == n_days:
+                break
+            span *= 2
+
+        end = start + 1 + hits[0] if len(hits) else n_days
+        # Le jour déclencheur garde sa valeur dérivée ; ses poids de fin de journée
+        # sont les nouvelles cibles
+        values[start + 1:min(end + 1, n_days)] = segment_values[:end - start]
+        weights[start + 1:end] = segment_weights[:end - start - 1]
+        if end == n_days:
+            break
+        target = solve(len(rebalance_days), end)
+        rebalance_days.append(end)
+        # Le prochain segment part d'une fenêtre à la mesure du précédent
+        span = max(_MIN_SPAN, 2 * (end - start))
+        start = end
+    return values, weights, np.array(rebalance_days, dtype=int)
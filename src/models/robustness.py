@@ -0,0 +1,182 @@
+"""
+Module de tests de robustesse des stratégies par rééchantillonnage (bootstrap).
+
+Un seul historique ne dit pas grand-chose d'une stratégie : ce module tire des milliers
+d'historiques alternatifs par bootstrap par blocs (fixes ou stationnaire, pour conserver
+l'autocorrélation et la volatilité groupée des rendements) sous forme d'un tableau 3-D
+(chemins x jours x actifs), puis évalue les stratégies à poids cibles fixes sur tous
+les chemins à la fois. Les chemins sont traités par lots pour borner la mémoire.
+"""
+import numpy as np
+import pandas as pd
+
+# Libellés des métriques calculées sur chaque chemin
+PATH_METRICS = ['Rendement Annualisé', 'Volatilité Annualisée', 'Ratio de Sharpe',
+                'Drawdown Maximal', 'Valeur Finale']
+
+
+def bootstrap_paths(returns, n_paths, n_days=None, block_size=21, method='stationary',
+                    random_state=None):
+    """
+    Génère des historiques de rendements rééchantillonnés par blocs.
+
+    Parameters:
+    - returns: DataFrame (ou array jours x actifs) des rendements journaliers
+    - n_paths: Nombre de chemins
+    - n_days: Longueur des chemins (par défaut, celle de l'historique)
+    - block_size: Longueur des blocs ('block') ou longueur moyenne, géométrique
+      ('stationary', Politis et Romano)
+    - method: 'stationary' ou 'block' (blocs circulaires de longueur fixe)
+    - random_state: Graine ; chaque chemin reçoit sa propre sous-graine
+
+    Returns:
+    - paths: Array (n_paths, n_days, actifs) des rendements
+    """
+    values = np.asarray(returns, dtype=float)
+    n_days = len(values) if n_days is None else n_days
+    seeds = np.random.SeedSequence(random_state).spawn(n_paths)
+    return values[_bootstrap_indices(len(values), n_days, block_size, method, seeds)]
+
+
+def _bootstrap_indices(n_obs, n_days, block_size, method, seeds):
+    """Indices des jours tirés pour chaque chemin (un générateur par chemin)."""
+    if method not in ('stationary', 'block'):
+        raise ValueError(f"Méthode de bootstrap inconnue : {method}")
+    if block_size < 1:
+        raise ValueError("block_size doit être au moins 1")
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    starts = np.array([rng.integers(0, n_obs, n_days) for rng in rngs]).reshape(-1, n_days)
+    days = np.arange(n_days)
+    if method == 'stationary':
+        draws = np.array([rng.random(n_days) for rng in rngs]).reshape(-1, n_days)
+        new_block = draws < 1 / block_size
+    else:
+        new_block = np.broadcast_to(days % block_size == 0, starts.shape).copy()
+    new_block[:, 0] = True
+
+    # Début du bloc en cours pour chaque jour, puis position dans le bloc (circulaire)
+    block_start = np.maximum.accumulate(np.where(new_block, days, 0), axis=1)
+    first = np.take_along_axis(starts, block_start, axis=1)
+    return (first + days - block_start) % n_obs
+
+
+def simulate_paths(paths, weights, rebalance_freq=1):
+    """
+    Valeur d'un portefeuille à poids cibles fixes sur chaque chemin.
+
+    Parameters:
+    - paths: Array (chemins, jours, actifs) des rendements ; NaN compte pour zéro
+    - weights: Poids cibles (actifs,)
+    - rebalance_freq: Retour aux poids cibles tous les rebalance_freq jours (1 : poids
+      maintenus chaque jour ; None : achat-conservation, sans rééquilibrage)
+
+    Returns:
+    - values: Array (chemins, jours + 1) des valeurs, partant de 1
+    """
+    growth = 1 + np.nan_to_num(paths)
+    weights = np.asarray(weights, dtype=float)
+    n_paths, n_days, n_assets = growth.shape
+    if rebalance_freq == 1:
+        daily = growth @ weights
+        return np.concatenate([np.ones((n_paths, 1)), np.cumprod(daily, axis=1)], axis=1)
+
+    # Segments entre deux rééquilibrages : les avoirs suivent le produit cumulé des
+    # rendements, complété par des jours neutres jusqu'à un nombre entier de segments
+    length = n_days if rebalance_freq is None else rebalance_freq
+    n_segments = -(-n_days // length)
+    padded = np.ones((n_paths, n_segments * length, n_assets))
+    padded[:, :n_days] = growth
+    relative = np.cumprod(padded.reshape(n_paths, n_segments, length, n_assets), axis=2) @ weights
+    segment_start = np.cumprod(relative[:, :, -1], axis=1)
+    segment_start = np.concatenate([np.ones((n_paths, 1)), segment_start[:, :-1]], axis=1)
+    values = (relative * segment_start[:, :, None]).reshape(n_paths, -1)[:, :n_days]
+    return np.concatenate([np.ones((n_paths, 1)), values], axis=1)
+
+
+def path_metrics(values, risk_free_rate=0.01, periods_per_year=252):
+    """
+    Métriques de performance de chaque chemin, en une passe vectorisée.
+
+    Parameters:
+    - values: Array (chemins, jours + 1) des valeurs du portefeuille, partant de 1
+    - risk_free_rate: Taux sans risque annualisé
+    - periods_per_year: Nombre de périodes par an
+
+    Returns:
+    - metrics: Dictionnaire libellé (PATH_METRICS) -> array (chemins,)
+    """
+    daily_returns = values[:, 1:] / values[:, :-1] - 1
+    terminal = values[:, -1] / values[:, 0]
+    annual_return = terminal ** (periods_per_year / daily_returns.shape[1]) - 1
+    annual_volatility = daily_returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    drawdown = values / np.maximum.accumulate(values, axis=1) - 1
+    return {
+        'Rendement Annualisé': annual_return,
+        'Volatilité Annualisée': annual_volatility,
+        'Ratio de Sharpe': (annual_return - risk_free_rate) / annual_volatility,
+        'Drawdown Maximal': drawdown.min(axis=1),
+        'Valeur Finale': terminal,
+    }
+
+
+def robustness_report(returns, strategies, n_paths=1000, n_days=None, block_size=21,
+                      method='stationary', risk_free_rate=0.01, chunk_size=100,
+                      random_state=None, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Distribution des performances de stratégies sur des historiques rééchantillonnés.
+
+    Tous les chemins sont évalués pour toutes les stratégies lot par lot : la mémoire
+    est bornée par chunk_size x n_days x actifs, et le résultat ne dépend pas de
+    chunk_size (chaque chemin a sa propre sous-graine).
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers
+    - strategies: Dictionnaire nom -> {'weights': poids cibles (Series indexée par ticker
+      ou array), 'rebalance_freq': voir simulate_paths (1 par défaut)}
+    - n_paths: Nombre de chemins
+    - n_days: Longueur des chemins (par défaut, celle de l'historique)
+    - block_size: Longueur (moyenne) des blocs
+    - method: 'stationary' ou 'block' (voir bootstrap_paths)
+    - risk_free_rate: Taux sans risque annualisé
+    - chunk_size: Nombre de chemins générés et évalués à la fois
+    - random_state: Graine du rééchantillonnage
+    - quantiles: Quantiles rapportés dans le résumé
+
+    Returns:
+    - summary: DataFrame indexé par (Stratégie, Métrique) : moyenne, écart-type et quantiles
+    - samples: DataFrame des métriques de chaque chemin (colonnes Stratégie, Chemin, PATH_METRICS)
+    """
+    values = returns.to_numpy(dtype=float)
+    n_days = len(values) if n_days is None else n_days
+    weights = {}
+    for name, params in strategies.items():
+        w = params['weights']
+        weights[name] = (w.reindex(returns.columns).fillna(0).to_numpy()
+                         if isinstance(w, pd.Series) else np.asarray(w, dtype=float))
+
+    seeds = np.random.SeedSequence(random_state).spawn(n_paths)
+    results = {name: [] for name in strategies}
+    for start in range(0, n_paths, chunk_size):
+        chunk_seeds = seeds[start:start + chunk_size]
+        paths = values[_bootstrap_indices(len(values), n_days, block_size, method, chunk_seeds)]
+        for name, params in strategies.items():
+            path_values = simulate_paths(paths, weights[name], params.get('rebalance_freq', 1))
+            results[name].append(path_metrics(path_values, risk_free_rate))
+
+    samples = []
+    for name, chunks in results.items():
+        frame = pd.DataFrame({label: np.concatenate([chunk[label] for chunk in chunks])
+                              for label in PATH_METRICS})
+        frame.insert(0, 'Chemin', np.arange(n_paths))
+        frame.insert(0, 'Stratégie', name)
+        samples.append(frame)
+    samples = pd.concat(samples, ignore_index=True)
+
+    grouped = samples.groupby('Stratégie', sort=False)[PATH_METRICS]
+    summary = pd.concat({
+        'Moyenne': grouped.mean().stack(),
+        'Écart-type': grouped.std().stack(),
+        **{f'{q:.0%}': grouped.quantile(q).stack() for q in quantiles},
+    }, axis=1)
+    summary.index.names = ['Stratégie', 'Métrique']
+    return summary, samples
@@ -0,0 +1,363 @@
+"""
+Module de backtest en flux (paper trading).
+
+Les rendements arrivent un jour (ou une barre) à la fois, depuis un générateur, un
+itérateur asynchrone ou un fichier CSV en cours d'écriture. La stratégie ne garde que la
+fenêtre d'estimation dans un tampon circulaire et des accumulateurs de taille fixe :
+chaque tick coûte O(actifs), plus une optimisation tous les rebalance_freq ticks, quelle
+que soit la longueur de l'historique. Pour un même historique, les valeurs, les poids
+et les métriques sont ceux de backtest_strategy(moment_store=False).
+"""
+import asyncio
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.models.backtest import _load_ml_models, _solve_rebalance
+
+
+class PerformanceAccumulator:
+    """
+    Métriques de performance mises à jour en O(1) à chaque nouvelle valeur.
+
+    Les rendements journaliers sont agrégés par l'algorithme de Welford (moyenne et
+    variance en une passe, sans conserver l'historique) ; le drawdown maximal suit le
+    plus haut atteint. Les définitions sont celles de calculate_performance_metrics.
+
+    Parameters:
+    - risk_free_rate: Taux sans risque annualisé
+    - periods_per_year: Nombre de périodes par an pour l'annualisation de la volatilité
+    """
+
+    def __init__(self, risk_free_rate=0.01, periods_per_year=252):
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        self.count = 0
+        self._first = None
+        self._last = None
+        self._first_date = None
+        self._last_date = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._peak = None
+        self.max_drawdown = 0.0
+
+    def update(self, value, date):
+        """
+        Ajoute la valeur du portefeuille à une nouvelle date.
+
+        Parameters:
+        - value: Valeur du portefeuille
+        - date: Date (Timestamp) de la valeur
+        """
+        if self._first is None:
+            self._first, self._first_date = value, date
+        else:
+            daily_return = value / self._last - 1
+            self.count += 1
+            delta = daily_return - self._mean
+            self._mean += delta / self.count
+            self._m2 += delta * (daily_return - self._mean)
+            # Comme calculate_performance_metrics, le plus haut part de la première
+            # valeur issue d'un rendement
+            self._peak = value if self._peak is None else max(self._peak, value)
+            self.max_drawdown = min(self.max_drawdown, value / self._peak - 1)
+        self._last, self._last_date = value, date
+
+    @property
+    def total_return(self):
+        """Rendement total depuis la première valeur."""
+        return self._last / self._first - 1
+
+    @property
+    def annual_return(self):
+        """Rendement annualisé (sur la durée calendaire écoulée)."""
+        years = (self._last_date - self._first_date).days / 365.25
+        return (1 + self.total_return) ** (1 / years) - 1
+
+    @property
+    def annual_volatility(self):
+        """Volatilité annualisée des rendements journaliers."""
+        if self.count < 2:
+            return float('nan')
+        return math.sqrt(self._m2 / (self.count - 1)) * math.sqrt(self.periods_per_year)
+
+    @property
+    def sharpe_ratio(self):
+        """Ratio de Sharpe annualisé."""
+        return (self.annual_return - self.risk_free_rate) / self.annual_volatility
+
+    def metrics(self):
+        """
+        Métriques courantes, au format de calculate_performance_metrics.
+
+        Returns:
+        - metrics: DataFrame des métriques de performance
+        """
+        return pd.DataFrame({
+            'Métrique': ['Rendement Total', 'Rendement Annualisé', 'Volatilité Annualisée',
+                         'Ratio de Sharpe', 'Drawdown Maximal'],
+            'Valeur': [self.total_return, self.annual_return, self.annual_volatility,
+                       self.sharpe_ratio, self.max_drawdown]
+        })
+
+
+class StreamingBacktest:
+    """
+    Backtest d'une stratégie d'optimisation alimenté un tick à la fois.
+
+    Les window_size premiers ticks remplissent la fenêtre d'estimation ; le suivant est
+    le jour 0 du portefeuille (valeur 1, poids égaux), comme dans backtest_strategy.
+
+    Parameters:
+    - tickers: Liste des tickers, dans l'ordre des rendements reçus
+    - window_size: Taille de la fenêtre pour l'estimation des paramètres (ticks)
+    - rebalance_freq: Fréquence de rééquilibrage (ticks)
+    - use_ml: Utiliser les prédictions ML pour les rendements attendus
+    - risk_free_rate: Taux sans risque annualisé
+    - drift: Laisser dériver les poids avec les prix entre deux rééquilibrages
+    - random_state: Graine des simulations Monte Carlo ; le k-ième rééquilibrage reçoit la
+      même sous-graine que dans backtest_strategy
+    - ml_models: Tuple (models, scalers) déjà chargé, pour éviter de relire les modèles ML
+
+    Attributes:
+    - value: Valeur courante du portefeuille (None pendant le remplissage de la fenêtre)
+    - weights: Poids détenus en fin de tick
+    - day: Numéro du jour courant du portefeuille (-1 pendant le remplissage)
+    - n_rebalances: Nombre d'optimisations effectuées
+    - performance: PerformanceAccumulator des valeurs du portefeuille
+    """
+
+    def __init__(self, tickers, window_size=252, rebalance_freq=21, use_ml=False,
+                 risk_free_rate=0.01, drift=False, random_state=None, ml_models=None):
+        self.tickers = list(tickers)
+        self.window_size = window_size
+        self.rebalance_freq = rebalance_freq
+        self.drift = drift
+        self.random_state = random_state
+        self.performance = PerformanceAccumulator(risk_free_rate)
+
+        self._context = {'tickers': self.tickers, 'window_size': window_size, 'moments': None}
+        if use_ml and ml_models is None:
+            ml_models = _load_ml_models(self.tickers)
+        if use_ml and ml_models is not None:
+            self._context['models'], self._context['scalers'] = ml_models
+
+        # Tampon circulaire des window_size derniers rendements
+        self._buffer = np.empty((window_size, len(self.tickers)))
+        self._ticks = 0
+        self.day = -1
+        self.n_rebalances = 0
+        self.value = None
+        self.weights = None
+        self._target = None
+        self._growth = None
+        self._segment_value = None
+
+    def _window(self):
+        """Fenêtre d'estimation, dans l'ordre chronologique."""
+        position = self._ticks % self.window_size
+        return np.concatenate([self._buffer[position:], self._buffer[:position]])
+
+    def _rebalance(self):
+        if self.random_state is None:
+            seed = None
+        else:
+            seed = np.random.SeedSequence(self.random_state, spawn_key=(self.n_rebalances,))
+        shared = dict(self._context, returns=self._window())
+        self.n_rebalances += 1
+        return _solve_rebalance(shared, self.window_size - 1, seed)
+
+    def update(self, date, returns):
+        """
+        Traite les rendements d'un nouveau tick.
+
+        Parameters:
+        - date: Date (Timestamp) du tick
+        - returns: Rendements du tick (Series indexée par ticker ou array, dans l'ordre
+          de tickers) ; les valeurs manquantes comptent pour zéro
+
+        Returns:
+        - value: Valeur du portefeuille en fin de tick (None pendant le remplissage)
+        """
+        if isinstance(returns, pd.Series):
+            returns = returns.reindex(self.tickers)
+        row = np.asarray(returns, dtype=float)
+
+        if self.day >= 0 or self._ticks == self.window_size:
+            self.day += 1
+        if self.day == 0:
+            # Premier jour du portefeuille : poids égaux, rendement du jour non appliqué
+            self.value = 1.0
+            self._target = np.ones(len(self.tickers)) / len(self.tickers)
+            self._start_segment()
+        elif self.day > 0:
+            self._apply(row)
+            if self.day % self.rebalance_freq == 0:
+                # Fenêtre arrêtée à la veille : optimiser avant d'ajouter le tick au tampon
+                self._target = self._rebalance()
+                self._start_segment()
+        if self.day >= 0:
+            self.performance.update(self.value, date)
+
+        self._buffer[self._ticks % self.window_size] = row
+        self._ticks += 1
+        return self.value
+
+    def _start_segment(self):
+        self.weights = self._target
+        self._segment_value = self.value
+        self._growth = np.ones(len(self.tickers))
+
+    def _apply(self, row):
+        if not self.drift:
+            products = row * self.weights
+            products[np.isnan(products)] = 0.0
+            # Somme séquentielle, actif par actif, comme simulate_portfolio
+            self.value = self.value * (1 + np.cumsum(products)[-1])
+            return
+        # Avoirs du segment : poids cibles multipliés par la croissance cumulée
+        self._growth = self._growth * (1 + np.nan_to_num(row))
+        holdings = self._target * self._growth
+        self.value = self._segment_value * holdings.sum()
+        self.weights = holdings / holdings.sum()
+
+    def metrics(self):
+        """
+        Métriques de performance courantes.
+
+        Returns:
+        - metrics: DataFrame au format de calculate_performance_metrics
+        """
+        return self.performance.metrics()
+
+
+def stream_backtest(source, tickers=None, **kwargs):
+    """
+    Fait tourner un StreamingBacktest sur une source synchrone de rendements.
+
+    Parameters:
+    - source: Itérable de tuples (date, rendements) ; les rendements sont des Series
+      indexées par ticker ou des arrays dans l'ordre de tickers
+    - tickers: Liste des tickers (par défaut, l'index de la première Series reçue)
+    - kwargs: Paramètres de StreamingBacktest
+
+    Yields:
+    - date, value, weights: Date, valeur et poids du portefeuille après chaque tick
+      (les ticks de remplissage de la fenêtre ne produisent rien)
+    """
+    backtest = None
+    for date, returns in source:
+        if backtest is None:
+            backtest = StreamingBacktest(_tickers(tickers, returns), **kwargs)
+        value = backtest.update(date, returns)
+        if value is not None:
+            yield date, value, pd.Series(backtest.weights, index=backtest.tickers)
+
+
+async def astream_backtest(source, tickers=None, **kwargs):
+    """
+    Variante asynchrone de stream_backtest, pour un itérateur asynchrone de rendements.
+
+    Parameters:
+    - source: Itérable asynchrone de tuples (date, rendements)
+    - tickers: Liste des tickers (par défaut, l'index de la première Series reçue)
+    - kwargs: Paramètres de StreamingBacktest
+
+    Yields:
+    - date, value, weights: Date, valeur et poids du portefeuille après chaque tick
+    """
+    backtest = None
+    async for date, returns in source:
+        if backtest is None:
+            backtest = StreamingBacktest(_tickers(tickers, returns), **kwargs)
+        value = backtest.update(date, returns)
+        if value is not None:
+            yield date, value, pd.Series(backtest.weights, index=backtest.tickers)
+
+
+def _tickers(tickers, returns):
+    if tickers is not None:
+        return tickers
+    if isinstance(returns, pd.Series):
+        return list(returns.index)
+    raise ValueError("tickers est obligatoire quand les rendements ne sont pas des Series")
+
+
+def tail_returns_csv(path, poll_interval=0.5, timeout=None):
+    """
+    Lit un fichier CSV de rendements ligne à ligne, en suivant les lignes ajoutées.
+
+    Le fichier a le format de data/processed/returns.csv (dates en première colonne,
+    un ticker par colonne suivante). Une ligne incomplète (sans fin de ligne) est
+    attendue jusqu'à ce qu'elle soit terminée.
+
+    Parameters:
+    - path: Chemin du fichier CSV
+    - poll_interval: Attente entre deux lectures à la fin du fichier (secondes)
+    - timeout: Arrêter après ce délai sans nouvelle ligne (secondes) ; None pour suivre
+      le fichier indéfiniment, 0 pour s'arrêter à la fin du fichier
+
+    Yields:
+    - date, returns: Timestamp et Series des rendements de la ligne
+    """
+    with open(path, 'r') as f:
+        for date, row in _tail_lines(f):
+            if date is None:
+                # row est l'instant de la dernière ligne lue
+                if timeout is not None and time.monotonic() - row >= timeout:
+                    return
+                time.sleep(poll_interval)
+                continue
+            yield date, row
+
+
+async def atail_returns_csv(path, poll_interval=0.5, timeout=None):
+    """
+    Variante asynchrone de tail_returns_csv (l'attente ne bloque pas la boucle d'événements).
+
+    Parameters:
+    - path: Chemin du fichier CSV
+    - poll_interval: Attente entre deux lectures à la fin du fichier (secondes)
+    - timeout: Arrêter après ce délai sans nouvelle ligne (secondes)
+
+    Yields:
+    - date, returns: Timestamp et Series des rendements de la ligne
+    """
+    with open(path, 'r') as f:
+        for date, row in _tail_lines(f):
+            if date is None:
+                # row est l'instant de la dernière ligne lue
+                if timeout is not None and time.monotonic() - row >= timeout:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            yield date, row
+
+
+def _tail_lines(f):
+    """
+    Lignes complètes du fichier ouvert f ; à la fin du fichier, produit (None, instant de
+    la dernière ligne lue) pour laisser l'appelant attendre ou s'arrêter.
+    """
+    header = None
+    last_read = time.monotonic()
+    while True:
+        position = f.tell()
+        line = f.readline()
+        if not line.endswith('\n'):
+            # Fin du fichier, ou ligne en cours d'écriture : la relire plus tard en entier
+            f.seek(position)
+            yield None, last_read
+            continue
+        last_read = time.monotonic()
+        fields = line.strip().split(',')
+        if fields == ['']:
+            continue
+        if header is None:
+            header = fields[1:]
+            continue
+        values = [float(x) if x else np.nan for x in fields[1:]]
+        yield pd.Timestamp(fields[0]), pd.Series(values, index=header)
@@ -0,0 +1,137 @@
+"""
+Module de balayage d'une grille de paramètres de stratégies de backtest.
+
+Toutes les configurations d'une grille partagent le même historique : le magasin de
+moments glissants, les modèles ML et leurs caractéristiques sont préparés une seule fois,
+puis transmis à chaque processus du pool avec les rendements (en mémoire partagée).
+Chaque résultat est enregistré sous l'empreinte de sa configuration (et, avec use_ml, de
+la version des modèles) dès qu'il est disponible, si bien qu'un balayage interrompu ou
+élargi ne recalcule que les configurations manquantes.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src.models.backtest import _load_ml_models, _model_version, backtest_strategy
+from src.models.cache import hash_inputs
+from src.models.features import FeatureStore
+from src.models.moments import RollingMoments
+from src.models.parallel import effective_n_jobs, parallel_map
+
+# Paramètres de backtest_strategy qu'une grille peut faire varier, avec leur valeur par défaut
+SWEEP_PARAMETERS = {'window_size': 252, 'rebalance_freq': 21, 'use_ml': False, 'drift': False}
+
+
+def expand_grid(grid):
+    """
+    Développe une grille de paramètres en liste de configurations.
+
+    Parameters:
+    - grid: Dictionnaire paramètre -> liste de valeurs (paramètres de SWEEP_PARAMETERS) ;
+      une valeur isolée est traitée comme une liste à un élément
+
+    Returns:
+    - configs: Liste de dictionnaires complets (valeurs par défaut comprises), dans
+      l'ordre du produit cartésien des paramètres de SWEEP_PARAMETERS
+    """
+    unknown = sorted(set(grid) - set(SWEEP_PARAMETERS))
+    if unknown:
+        raise ValueError(f"Paramètres de grille inconnus : {unknown}")
+    values = []
+    for name, default in SWEEP_PARAMETERS.items():
+        value = grid.get(name, [default])
+        values.append(list(value) if isinstance(value, (list, tuple, np.ndarray)) else [value])
+    return [dict(zip(SWEEP_PARAMETERS, combination)) for combination in itertools.product(*values)]
+
+
+def sweep_strategies(returns, grid, risk_free_rate=0.01, n_jobs=1, random_state=None, store=None,
+                     ml_models=None):
+    """
+    Backteste toutes les configurations d'une grille de paramètres.
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers
+    - grid: Dictionnaire paramètre -> liste de valeurs (voir expand_grid)
+    - risk_free_rate: Taux sans risque annualisé
+    - n_jobs: Nombre de processus ; chaque configuration est un backtest en série
+    - random_state: Graine des simulations Monte Carlo, commune à toutes les
+      configurations (obligatoire en parallèle)
+    - store: ResultCache où lire et enregistrer les résultats (un répertoire permet de
+      reprendre un balayage d'une session à l'autre) ; None pour tout recalculer
+    - ml_models: Tuple (models, scalers) déjà chargé pour les configurations use_ml ; par
+      défaut, les modèles sont lus sur disque si la grille en a besoin
+
+    Returns:
+    - results: DataFrame, une ligne par configuration : paramètres, empreinte ('Config'),
+      'Cached' (résultat lu dans le store) puis une colonne par métrique de performance
+    - portfolio_values: DataFrame des valeurs du portefeuille, une colonne par ligne de results
+    """
+    configs = expand_grid(grid)
+    if effective_n_jobs(n_jobs) > 1 and random_state is None:
+        raise ValueError("Un balayage parallèle reproductible exige une graine (random_state)")
+
+    # Les modèles sont chargés avant les empreintes : un réentraînement change les résultats ML
+    if not any(config['use_ml'] for config in configs):
+        ml_models = None
+    elif ml_models is None:
+        ml_models = _load_ml_models(returns.columns)
+    model_version = _model_version(ml_models)
+
+    # L'empreinte couvre tout ce dont dépend le résultat d'une configuration
+    keys = [hash_inputs('sweep_strategies', returns, config, risk_free_rate, random_state,
+                        model_version if config['use_ml'] else None)
+            for config in configs]
+    outcomes = [store.get(key) if store is not None else None for key in keys]
+    cached = [outcome is not None for outcome in outcomes]
+    pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+
+    if pending:
+        context = {
+            'index': returns.index,
+            'tickers': list(returns.columns),
+            'risk_free_rate': risk_free_rate,
+            # Points de contrôle mensuels : toute fenêtre n'y ajoute qu'un mois à chaque bord
+            'moments': RollingMoments(returns, checkpoint=21),
+            'ml_models': None,
+            'features': None,
+        }
+        if ml_models is not None and any(configs[i]['use_ml'] for i in pending):
+            context['ml_models'] = ml_models
+            context['features'] = FeatureStore(returns)
+
+        def record(position, outcome):
+            i = pending[position]
+            outcomes[i] = outcome
+            if store is not None:
+                store.put(keys[i], outcome)
+
+        parallel_map(_run_config, [(configs[i], random_state) for i in pending],
+                     {'returns': returns.to_numpy(dtype=float)}, n_jobs, context,
+                     on_result=record)
+
+    rows = []
+    portfolio_values = {}
+    for i, (config, key, outcome) in enumerate(zip(configs, keys, outcomes)):
+        values, metrics = outcome
+        rows.append(dict(config, Config=key, Cached=cached[i], **metrics))
+        portfolio_values[i] = values
+    results = pd.DataFrame(rows)
+    portfolio_values = pd.DataFrame(portfolio_values, index=returns.index)
+    return results, portfolio_values
+
+
+def _run_config(shared, config, seed):
+    """Backtest d'une configuration (exécutable dans un worker)."""
+    returns = pd.DataFrame(shared['returns'], index=shared['index'], columns=shared['tickers'])
+    ml_models = shared['ml_models'] if config['use_ml'] else None
+    values, _, metrics = backtest_strategy(
+        returns,
+        risk_free_rate=shared['risk_free_rate'],
+        random_state=seed,
+        moment_store=shared['moments'],
+        ml_models=ml_models,
+        feature_store=shared['features'],
+        **config
+    )
+    return values, dict(zip(metrics['Métrique'], metrics['Valeur']))
@@ -0,0 +1,107 @@
+"""
+Module des statistiques d'un univers d'actifs.
+
+Les moyennes et la covariance annualisées sont calculées une seule fois sur tout
+l'univers ; n'importe quelle sélection de tickers en est ensuite extraite par simple
+indexation, en O(k²) pour k actifs sélectionnés, sans relire l'historique. La
+covariance par paires de pandas ne dépend que des deux colonnes concernées : la
+sous-matrice est celle que donnerait un recalcul sur la sélection. Les historiques plus
+courts (lookback) sont servis par un magasin de moments glissants.
+"""
+import numpy as np
+import pandas as pd
+
+from src.models.moments import RollingMoments
+
+
+class UniverseStatistics:
+    """
+    Statistiques annualisées précalculées d'un univers d'actifs.
+
+    Parameters:
+    - returns: DataFrame des rendements journaliers (une colonne par ticker)
+    - periods_per_year: Nombre de périodes par an pour l'annualisation
+
+    Attributes:
+    - tickers: Liste des tickers de l'univers
+    - expected_returns: Série des rendements attendus annualisés
+    - cov_matrix: DataFrame de la matrice de covariance annualisée
+    """
+
+    def __init__(self, returns, periods_per_year=252):
+        self._returns = returns
+        self.periods_per_year = periods_per_year
+        self._moments = None
+        self.tickers = list(returns.columns)
+        self.expected_returns = returns.mean() * periods_per_year
+        self.cov_matrix = returns.cov() * periods_per_year
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._mean = self.expected_returns.to_numpy()
+        self._cov = self.cov_matrix.to_numpy()
+        self._cholesky = None
+
+    def positions(self, tickers):
+        """
+        Positions des tickers dans l'univers.
+
+        Parameters:
+        - tickers: Séquence de tickers
+
+        Returns:
+        - positions: Array des indices correspondants
+        """
+        missing = [ticker for ticker in tickers if ticker not in self._positions]
+        if missing:
+            raise KeyError(f"Tickers absents de l'univers : {missing}")
+        return np.array([self._positions[ticker] for ticker in tickers], dtype=int)
+
+    def subset(self, tickers, lookback=None):
+        """
+        Rendements attendus et covariance d'une sélection de tickers.
+
+        Parameters:
+        - tickers: Séquence de tickers, dans l'ordre souhaité
+        - lookback: Nombre de derniers jours d'historique à utiliser (None : tout)
+
+        Returns:
+        - expected_returns: Série des rendements attendus annualisés
+        - cov_matrix: DataFrame de la matrice de covariance annualisée
+        """
+        tickers = list(tickers)
+        n_days = len(self._returns)
+        if lookback is not None and lookback < n_days:
+            if self._moments is None:
+                # Peu de points de contrôle : la mémoire reste bornée sur un grand univers,
+                # et les lignes restantes ne sont sommées que pour la sélection
+                self._moments = RollingMoments(self._returns, self.periods_per_year,
+                                               checkpoint=max(21, n_days // 8))
+            return self._moments.window(n_days - lookback, n_days - 1, tickers)
+
+        idx = self.positions(tickers)
+        expected_returns = pd.Series(self._mean[idx], index=tickers)
+        cov_matrix = pd.DataFrame(self._cov[np.ix_(idx, idx)], index=tickers, columns=tickers)
+        return expected_returns, cov_matrix
+
+    def cholesky(self, tickers=None):
+        """
+        Facteur de Cholesky (triangulaire inférieur) de la covariance.
+
+        Le facteur de l'univers est calculé à la première demande. Pour une sélection qui
+        forme un préfixe de l'univers, c'est un bloc de ce facteur ; sinon la sous-matrice
+        k x k est factorisée directement.
+
+        Parameters:
+        - tickers: Sélection de tickers (None : tout l'univers)
+
+        Returns:
+        - factor: Array L tel que L @ L.T est la covariance de la sélection
+        """
+        if tickers is None:
+            if self._cholesky is None:
+                self._cholesky = np.linalg.cholesky(self._cov)
+            return self._cholesky
+
+        idx = self.positions(list(tickers))
+        if self._cholesky is not None and np.array_equal(idx, np.arange(len(idx))):
+            return self._cholesky[:len(idx), :len(idx)]
+        return np.linalg.cholesky(self._cov[np.ix_(idx, idx)])
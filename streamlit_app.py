@@ -26,6 +26,11 @@ os.makedirs('data/raw', exist_ok=True)
 os.makedirs('data/processed', exist_ok=True)
 os.makedirs('data/logs', exist_ok=True)
 
+# Budget de temps de l'optimisation (secondes) pour garder l'interface réactive
+OPTIMIZATION_TIME_BUDGET = 0.2
+# Graine des simulations : un même réglage donne le même portefeuille (et se met en cache)
+OPTIMIZATION_SEED = 42
+
 # Fonction pour collecter des données réelles
 def collect_real_data():
     st.sidebar.title("Collecte de données")
@@ -161,9 +166,9 @@ if data_ready:
     # Importer les modules nécessaires pour l'optimisation
     from simple_portfolio import (
         calculate_returns,
-        calculate_portfolio_metrics,
-        optimize_portfolio
+        cached_optimize_portfolio
     )
+    from src.models.universe import UniverseStatistics
 
     # Afficher un message de transition
     st.success("Données collectées avec succès! Chargement du dashboard d'optimisation...")
@@ -237,6 +242,12 @@ if data_ready:
 
     prices, returns = load_data()
 
+    # Statistiques de tout l'univers, calculées une fois et partagées entre les sessions :
+    # changer la sélection d'actifs ne fait qu'extraire une sous-matrice
+    @st.cache_resource(show_spinner=False)
+    def load_universe_statistics(returns):
+        return UniverseStatistics(returns)
+
     # Sidebar pour les paramètres
     st.sidebar.header("Paramètres d'optimisation")
 
@@ -254,17 +265,30 @@ if data_ready:
         # Paramètres d'optimisation
         risk_free_rate = st.sidebar.slider("Taux sans risque (%)", 0.0, 5.0, 1.0) / 100
         n_portfolios = st.sidebar.slider("Nombre de portefeuilles à simuler", 1000, 10000, 5000)
+        lookback = st.sidebar.slider("Historique d'estimation (jours)", min(60, len(returns)),
+                                     len(returns), len(returns))
 
         if prices is not None and returns is not None and selected_tickers:
             # Filtrer les données pour les actifs sélectionnés
             returns_filtered = returns[selected_tickers]
 
             # Calculer les métriques du portefeuille
-            expected_returns, cov_matrix = calculate_portfolio_metrics(returns_filtered)
+            expected_returns, cov_matrix = load_universe_statistics(returns).subset(
+                returns_filtered.columns, lookback
+            )
 
             # Optimisation du portefeuille
             with st.spinner("Optimisation du portefeuille en cours..."):
-                frontier, optimal_weights = optimize_portfolio(expected_returns, cov_matrix, n_portfolios)
+                frontier, optimal_weights, optimization_info = cached_optimize_portfolio(
+                    expected_returns, cov_matrix, n_portfolios, risk_free_rate=risk_free_rate,
+                    random_state=OPTIMIZATION_SEED, time_budget=OPTIMIZATION_TIME_BUDGET,
+                    return_info=True
+                )
+            if not optimization_info['completed']:
+                st.caption(
+                    f"Optimisation limitée à {optimization_info['n_samples']} portefeuilles "
+                    f"(budget de {OPTIMIZATION_TIME_BUDGET * 1000:.0f} ms)"
+                )
 
             # Afficher les résultats dans deux colonnes
             col1, col2 = st.columns(2)
@@ -4,7 +4,8 @@ Tests pour le module de backtesting.
 import numpy as np
 import pandas as pd
 import pytest
-from src.models.backtest import backtest_strategy, compare_strategies
+from src.models.backtest import (backtest_strategy, compare_strategies, simulate_portfolio,
+                                 resume_backtest, save_backtest_state, load_backtest_state)
 
 @pytest.fixture
 def sample_returns():
@@ -98,3 +99,104 @@ def test_compare_strategies(sample_returns):
     assert isinstance(portfolio_values, pd.DataFrame)
     assert all(strategy in portfolio_values.columns for strategy in strategies.keys())
     assert len(portfolio_values) == len(sample_returns)  # Même nombre de jours
+
+def _legacy_simulation(returns, rebalance_days, target_weights):
+    """Boucle jour par jour de l'ancien moteur (pandas, poids en dtype objet)."""
+    portfolio_values = pd.Series(index=returns.index, dtype=float)
+    portfolio_values.iloc[0] = 1.0
+    all_weights = pd.DataFrame(index=returns.index, columns=returns.columns)
+    all_weights.iloc[0] = target_weights[0]
+    k = 1
+    for i in range(1, len(returns)):
+        current_date, prev_date = returns.index[i], returns.index[i - 1]
+        daily_return = (returns.loc[current_date] * all_weights.loc[prev_date]).sum()
+        portfolio_values.loc[current_date] = portfolio_values.loc[prev_date] * (1 + daily_return)
+        if k <= len(rebalance_days) and i == rebalance_days[k - 1]:
+            all_weights.loc[current_date] = target_weights[k]
+            k += 1
+        else:
+            all_weights.loc[current_date] = all_weights.loc[prev_date]
+    return portfolio_values, all_weights
+
+def test_simulate_portfolio_matches_legacy_loop():
+    """Test de la compatibilité bit à bit du moteur vectorisé avec l'ancienne boucle."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start='2020-01-01', periods=120, freq='B')
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(120, 12)), index=dates)
+    returns.iloc[30:40, 2] = np.nan
+    rebalance_days = np.arange(21, 120, 21)
+    target_weights = rng.dirichlet(np.ones(12), size=len(rebalance_days) + 1)
+
+    values, weights = simulate_portfolio(returns.to_numpy(), rebalance_days, target_weights)
+    legacy_values, legacy_weights = _legacy_simulation(returns, rebalance_days, target_weights)
+
+    assert np.array_equal(values, legacy_values.to_numpy())
+    assert np.array_equal(weights, legacy_weights.to_numpy(dtype=float))
+
+def test_simulate_portfolio_drift():
+    """Test des poids dérivants entre deux rééquilibrages."""
+    rng = np.random.default_rng(1)
+    asset_returns = rng.normal(0.0005, 0.02, size=(60, 5))
+    target_weights = rng.dirichlet(np.ones(5), size=2)
+
+    # Sans rééquilibrage, le portefeuille est un achat-conservation
+    values, weights = simulate_portfolio(asset_returns, np.array([], dtype=int),
+                                         target_weights[:1], drift=True)
+    growth = np.vstack([np.ones(5), np.cumprod(1 + asset_returns[1:], axis=0)])
+    holdings = target_weights[0] * growth
+    np.testing.assert_allclose(values, holdings.sum(axis=1), rtol=1e-12)
+    np.testing.assert_allclose(weights, holdings / holdings.sum(axis=1, keepdims=True), rtol=1e-12)
+
+    # Un rééquilibrage remet les poids à la cible du jour
+    _, weights = simulate_portfolio(asset_returns, np.array([30]), target_weights, drift=True)
+    np.testing.assert_array_equal(weights[30], target_weights[1])
+    assert not np.allclose(weights[29], target_weights[0])
+
+def test_backtest_strategy_parallel_rebalances():
+    """Test des optimisations de rééquilibrage en parallèle."""
+    rng = np.random.default_rng(2)
+    dates = pd.date_range(start='2020-01-01', periods=200, freq='B')
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(200, 4)), index=dates,
+                           columns=['AAPL', 'MSFT', 'GOOGL', 'AMZN'])
+
+    serial = backtest_strategy(returns, window_size=60, rebalance_freq=20, random_state=0)
+    parallel = backtest_strategy(returns, window_size=60, rebalance_freq=20, random_state=0,
+                                 n_jobs=2)
+
+    # Même résultat exact : chaque rééquilibrage a sa propre sous-graine
+    pd.testing.assert_series_equal(serial[0], parallel[0], check_exact=True)
+    pd.testing.assert_frame_equal(serial[1], parallel[1], check_exact=True)
+    # Les poids changent aux dates de rééquilibrage
+    assert not np.allclose(serial[1].iloc[20], serial[1].iloc[0])
+
+    with pytest.raises(ValueError):
+        backtest_strategy(returns, window_size=60, rebalance_freq=20, n_jobs=2)
+
+@pytest.mark.parametrize('drift', [False, True])
+def test_resume_backtest_matches_full_run(tmp_path, drift):
+    """Test de la reprise d'un backtest sur les jours ajoutés."""
+    rng = np.random.default_rng(4)
+    dates = pd.date_range(start='2020-01-01', periods=200, freq='B')
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(200, 3)), index=dates,
+                           columns=['AAPL', 'MSFT', 'GOOGL'])
+    full = backtest_strategy(returns, window_size=60, rebalance_freq=20, drift=drift,
+                             random_state=0)
+
+    # Point de contrôle au milieu d'un segment, puis deux reprises successives
+    *_, state = backtest_strategy(returns.iloc[:130], window_size=60, rebalance_freq=20,
+                                  drift=drift, random_state=0, return_state=True)
+    save_backtest_state(state, str(tmp_path / 'state.pkl'))
+    state = load_backtest_state(str(tmp_path / 'state.pkl'))
+    *_, state = resume_backtest(returns.iloc[:161], state)
+    values, weights, metrics, state = resume_backtest(returns, state)
+
+    assert state['n_rows'] == 200
+    pd.testing.assert_series_equal(values, full[0], check_exact=True)
+    pd.testing.assert_frame_equal(weights, full[1], check_exact=True)
+    pd.testing.assert_frame_equal(metrics, full[2], check_exact=True)
+
+    # L'historique du point de contrôle ne doit pas avoir changé
+    altered = returns.copy()
+    altered.iloc[10, 0] += 0.01
+    with pytest.raises(ValueError):
+        resume_backtest(altered, state)
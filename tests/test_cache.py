@@ -0,0 +1,110 @@
+"""
+Tests pour le cache des résultats d'optimisation.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.cache import ResultCache, hash_inputs, memoize
+from src.models.mpt import calculate_portfolio_metrics, efficient_frontier, optimize_portfolio
+
+
+@pytest.fixture
+def sample_metrics():
+    """Fixture pour générer des rendements attendus et une covariance d'exemple."""
+    np.random.seed(42)
+    dates = pd.date_range(start='2020-01-01', periods=100, freq='D')
+    returns = pd.DataFrame(np.random.normal(0.001, 0.02, size=(100, 4)), index=dates,
+                           columns=['AAPL', 'MSFT', 'GOOGL', 'AMZN'])
+    return calculate_portfolio_metrics(returns)
+
+
+def test_hash_inputs(sample_metrics):
+    """Test de l'empreinte des arguments."""
+    expected_returns, cov_matrix = sample_metrics
+
+    key = hash_inputs(expected_returns, cov_matrix, bounds=(0, 1))
+    assert key == hash_inputs(expected_returns.copy(), cov_matrix.copy(), bounds=(0, 1))
+
+    # Une valeur, une étiquette, un type ou un paramètre différent change l'empreinte
+    shifted = expected_returns.copy()
+    shifted.iloc[0] += 1e-12
+    assert key != hash_inputs(shifted, cov_matrix, bounds=(0, 1))
+    assert key != hash_inputs(expected_returns.rename({'AAPL': 'TSLA'}), cov_matrix, bounds=(0, 1))
+    assert key != hash_inputs(expected_returns.values, cov_matrix, bounds=(0, 1))
+    assert key != hash_inputs(expected_returns, cov_matrix, bounds=(0, 0.5))
+
+    with pytest.raises(TypeError):
+        hash_inputs(object())
+
+
+def test_result_cache_lru_eviction():
+    """Test de l'éviction LRU et des statistiques."""
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a' devient le plus récent
+    cache.put('c', 3)  # 'b' est évincé
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+    assert np.isclose(stats['hit_rate'], 2 / 3)
+
+
+def test_result_cache_disk_tier(tmp_path):
+    """Test du niveau disque, partagé entre instances."""
+    cache = ResultCache(maxsize=1, directory=str(tmp_path))
+    cache.put('a', np.arange(3))
+    cache.put('b', np.arange(4))
+
+    # 'a' a quitté la mémoire mais reste sur le disque, y compris pour un nouveau cache
+    assert np.array_equal(cache.get('a'), np.arange(3))
+    assert cache.stats()['disk_hits'] == 1
+    assert np.array_equal(ResultCache(directory=str(tmp_path)).get('b'), np.arange(4))
+
+    cache.clear(disk=True)
+    assert cache.get('a') is None
+
+
+def test_memoize(sample_metrics):
+    """Test de la mémorisation des optimiseurs."""
+    expected_returns, cov_matrix = sample_metrics
+    cache = ResultCache()
+    cached_optimize = memoize(optimize_portfolio, cache)
+    cached_frontier = memoize(efficient_frontier, cache)
+
+    weights = cached_optimize(expected_returns, cov_matrix, 0.3)
+    # Appels équivalents (positionnels, nommés, valeurs par défaut explicites)
+    again = cached_optimize(expected_returns, cov_matrix, target_return=0.3, bounds=(0, 1))
+    assert np.array_equal(weights, optimize_portfolio(expected_returns, cov_matrix, 0.3))
+    assert np.array_equal(weights, again)
+    assert cache.stats()['hits'] == 1
+
+    # Modifier un résultat renvoyé ne corrompt pas le cache
+    again[:] = 0
+    assert np.array_equal(cached_optimize(expected_returns, cov_matrix, 0.3), weights)
+
+    frontier = cached_frontier(expected_returns, cov_matrix, num_portfolios=10)
+    pd.testing.assert_frame_equal(frontier.drop(columns='Weights'),
+                                  cached_frontier(expected_returns, cov_matrix, 10)
+                                  .drop(columns='Weights'))
+    assert cache.stats()['misses'] == 2
+    assert cached_optimize.cache is cache
+
+def test_memoize_cacheable(sample_metrics):
+    """Test de la mémorisation conditionnelle : un solveur interrompu n'est pas mémorisé."""
+    expected_returns, cov_matrix = sample_metrics
+    cache = ResultCache()
+    cached_optimize = memoize(optimize_portfolio, cache,
+                              cacheable=lambda arguments, result: result[1]['success'])
+
+    for _ in range(2):
+        _, info = cached_optimize(expected_returns, cov_matrix, time_budget=0.0,
+                                  return_info=True)
+        assert not info['success']
+    assert cache.stats()['hits'] == 0 and cache.stats()['size'] == 0
+
+    cached_optimize(expected_returns, cov_matrix, return_info=True)
+    cached_optimize(expected_returns, cov_matrix, return_info=True)
+    assert cache.stats()['hits'] == 1
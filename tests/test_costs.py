@@ -0,0 +1,92 @@
+"""
+Tests pour le modèle de coûts de transaction.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import backtest_strategy, simulate_portfolio
+from src.models.costs import TURNOVER_METRICS, TransactionCostModel, dollar_volume
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple."""
+    rng = np.random.default_rng(10)
+    dates = pd.date_range(start='2020-01-01', periods=300, freq='B')
+    return pd.DataFrame(rng.normal(0.0005, 0.02, size=(300, 3)), index=dates,
+                        columns=['AAPL', 'MSFT', 'GOOGL'])
+
+@pytest.fixture
+def sample_raw_data(sample_returns):
+    """Fixture au format long de real_data_collector (Date, Ticker, Close, Volume)."""
+    frames = []
+    for i, ticker in enumerate(sample_returns.columns):
+        frames.append(pd.DataFrame({
+            'Date': sample_returns.index,
+            'Ticker': ticker,
+            'Close': 100 * np.cumprod(1 + sample_returns[ticker].to_numpy()),
+            'Volume': np.full(len(sample_returns), 10_000 * (i + 1)),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def test_dollar_volume(sample_raw_data):
+    """Test du volume moyen en valeur, connu la veille."""
+    adv = dollar_volume(sample_raw_data, window=5)
+    assert list(adv.columns) == ['AAPL', 'GOOGL', 'MSFT']
+    assert adv.iloc[0].isna().all()
+    aapl = sample_raw_data[sample_raw_data['Ticker'] == 'AAPL']
+    expected = (aapl['Close'] * aapl['Volume']).iloc[5:10].mean()
+    assert adv['AAPL'].iloc[10] == pytest.approx(expected)
+
+def test_trades_and_costs(sample_returns, sample_raw_data):
+    """Test des transactions déduites des poids et du calcul des coûts."""
+    asset_returns = sample_returns.to_numpy()
+    targets = np.array([[0.2, 0.3, 0.5], [0.6, 0.2, 0.2]])
+    values, weights = simulate_portfolio(asset_returns, np.array([100]), targets, drift=True)
+
+    # Avec des poids dérivants, seule la date de rééquilibrage donne lieu à des échanges
+    model = TransactionCostModel(bps=20, fixed=10, capital=100_000)
+    costs, trades = model.costs(sample_returns, weights, values)
+    assert set(np.flatnonzero(np.abs(trades).sum(axis=1))) == {100}
+    np.testing.assert_allclose(trades[100], targets[1] - weights[99] * (1 + asset_returns[100])
+                               / (weights[99] * (1 + asset_returns[100])).sum())
+    expected = 20 / 1e4 * np.abs(trades[100]).sum() + 3 * 10 / (100_000 * values[100])
+    assert costs[100] == pytest.approx(expected)
+    assert (np.delete(costs, 100) == 0).all()
+
+    # Impact en racine carrée : σ de la veille et volume moyen en valeur
+    adv = dollar_volume(sample_raw_data)
+    impact = TransactionCostModel(impact=0.5, capital=100_000, adv=adv, volatility_window=21)
+    impact_costs, _ = impact.costs(sample_returns, weights, values)
+    sigma = sample_returns.iloc[79:100].std().to_numpy()
+    day_adv = adv.loc[sample_returns.index[100], sample_returns.columns].to_numpy()
+    size = np.abs(trades[100])
+    expected = 0.5 * np.sum(sigma * size * np.sqrt(size * 100_000 * values[100] / day_adv))
+    assert impact_costs[100] == pytest.approx(expected, rel=1e-8)
+
+    with pytest.raises(ValueError):
+        TransactionCostModel(impact=0.5)
+
+def test_backtest_strategy_with_costs(sample_returns):
+    """Test des coûts déduits des valeurs du backtest et des statistiques de rotation."""
+    gross = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20, drift=True,
+                              random_state=0)
+    free = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20, drift=True,
+                             random_state=0, cost_model=TransactionCostModel())
+    net = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20, drift=True,
+                            random_state=0, cost_model=TransactionCostModel(bps=25),
+                            return_info=True)
+
+    pd.testing.assert_series_equal(free[0], gross[0])
+    info = net[3]
+    np.testing.assert_allclose(net[0], gross[0] * np.cumprod(1 - info['costs']), rtol=1e-12)
+    assert (net[0] <= gross[0] + 1e-12).all()
+    assert info['costs'].gt(0).sum() == info['n_solves']
+
+    metrics = net[2].set_index('Métrique')['Valeur']
+    assert list(metrics.index[-3:]) == TURNOVER_METRICS
+    assert metrics['Coûts de Transaction'] == pytest.approx(1 - np.prod(1 - info['costs']))
+    assert metrics['Nombre de Transactions'] == 3 * info['n_solves']
+
+    with pytest.raises(ValueError):
+        backtest_strategy(sample_returns, window_size=60, cost_model=TransactionCostModel(),
+                          return_state=True)
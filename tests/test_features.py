@@ -0,0 +1,129 @@
+"""
+Tests pour la construction vectorisée des caractéristiques ML.
+"""
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import backtest_strategy
+from src.models.features import (FeatureIndex, FeatureStore, build_feature_matrix, feature_names,
+                                 panel_view)
+from src.models.ml_prediction import prepare_features, train_models
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple, avec une valeur manquante."""
+    rng = np.random.default_rng(11)
+    dates = pd.date_range(start='2020-01-01', periods=120, freq='B')
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(120, 3)), index=dates,
+                           columns=['AAPL', 'V', 'NVDA'])
+    returns.iloc[40, 1] = np.nan
+    return returns
+
+def test_build_feature_matrix_matches_pandas(sample_returns):
+    """Test des caractéristiques contre leur calcul direct avec pandas."""
+    features = build_feature_matrix(sample_returns, window_size=4)
+
+    names = ['lag_1', 'lag_2', 'lag_3', 'lag_4', 'ma_5', 'ma_10', 'std_5', 'std_10']
+    assert feature_names(4) == names
+    assert list(features.columns) == [(t, n) for t in sample_returns.columns for n in names]
+    assert (features.dtypes == np.float32).all()
+    assert features.to_numpy().flags.c_contiguous
+
+    expected = {}
+    for ticker in sample_returns.columns:
+        series = sample_returns[ticker]
+        for i in range(1, 5):
+            expected[(ticker, f'lag_{i}')] = series.shift(i)
+        for w in (5, 10):
+            expected[(ticker, f'ma_{w}')] = series.rolling(w).mean()
+        for w in (5, 10):
+            expected[(ticker, f'std_{w}')] = series.rolling(w).std()
+    expected = pd.DataFrame(expected).dropna()
+
+    # Les lignes dont une fenêtre contient la valeur manquante sont écartées
+    pd.testing.assert_index_equal(features.index, expected.index)
+    assert len(features) == 120 - 9 - 10
+    np.testing.assert_allclose(features.to_numpy(), expected.to_numpy(), rtol=1e-6, atol=1e-9)
+
+def test_prepare_features(sample_returns):
+    """Test des caractéristiques et des cibles alignées."""
+    X, y = prepare_features(sample_returns)
+    full = build_feature_matrix(sample_returns, dropna=False)
+    pd.testing.assert_frame_equal(X, full.dropna())
+    pd.testing.assert_frame_equal(y, sample_returns.loc[X.index])
+    assert X.shape[1] == 3 * 14
+
+def test_feature_index(sample_returns):
+    """Test du registre des tranches de colonnes par ticker."""
+    features = build_feature_matrix(sample_returns)
+    index = FeatureIndex(features.columns)
+
+    assert index.tickers == ['AAPL', 'V', 'NVDA']
+    assert index['NVDA'] == slice(28, 42)
+    assert 'NV' not in index
+    pd.testing.assert_frame_equal(index.select(features, 'V'), features['V'].set_axis(
+        features.columns[14:28], axis=1))
+
+    with pytest.raises(ValueError):
+        FeatureIndex(features.columns[[0, 14, 1]])
+    with pytest.raises(ValueError):
+        FeatureIndex(pd.Index(['AAPL_lag_1', 'V_lag_1']))
+
+def test_panel_view(sample_returns):
+    """Test de la vue (jours, tickers, caractéristiques) des caractéristiques."""
+    features = build_feature_matrix(sample_returns)
+    panel, tickers, names = panel_view(features)
+
+    assert panel.shape == (len(features), 3, 14)
+    assert np.shares_memory(panel, features.to_numpy())
+    assert tickers == ['AAPL', 'V', 'NVDA'] and names == feature_names()
+    np.testing.assert_array_equal(panel[:, 2], features['NVDA'].to_numpy())
+
+    with pytest.raises(ValueError):
+        panel_view(features.drop(columns=[('V', 'lag_3')]))
+
+def test_feature_store_append_matches_full_build(sample_returns, tmp_path):
+    """Test du magasin incrémental contre la construction sur l'historique complet."""
+    store = FeatureStore(sample_returns.iloc[:3])
+    for start in range(3, 120, 25):
+        store.append(sample_returns.iloc[start:start + 25])
+
+    assert len(store) == 120
+    pd.testing.assert_index_equal(store.index, sample_returns.index)
+    full = build_feature_matrix(sample_returns, dropna=False)
+    np.testing.assert_allclose(store.to_frame(dropna=False).to_numpy(), full.to_numpy(),
+                               rtol=1e-6, atol=1e-9)
+    pd.testing.assert_index_equal(store.to_frame().index, full.dropna().index)
+
+    # Dernière ligne complète : les lignes touchées par la valeur manquante sont sautées
+    assert store.latest(45).index[0] == sample_returns.index[39]
+    assert store.latest(5).empty
+    pd.testing.assert_frame_equal(store.latest(), full.iloc[[-1]], check_exact=False)
+
+    store.save(tmp_path / 'features')
+    loaded = FeatureStore.load(tmp_path / 'features')
+    pd.testing.assert_frame_equal(loaded.to_frame(dropna=False), store.to_frame(dropna=False),
+                                  check_freq=False)
+    new_day = pd.DataFrame([[0.01, 0.02, -0.01]], columns=sample_returns.columns,
+                           index=[sample_returns.index[-1] + pd.offsets.BDay()])
+    loaded.append(new_day)
+    expected = build_feature_matrix(pd.concat([sample_returns, new_day]))
+    np.testing.assert_allclose(loaded.latest().to_numpy(), expected.iloc[[-1]].to_numpy(),
+                               rtol=1e-6)
+
+def test_backtest_strategy_with_feature_store(sample_returns):
+    """Test du backtest ML avec les caractéristiques lues dans le magasin."""
+    returns = sample_returns.fillna(0.0)
+    X, y = prepare_features(returns)
+    with contextlib.redirect_stdout(io.StringIO()):
+        models, _, _, scalers = train_models(X, y)
+
+    stored = backtest_strategy(returns, window_size=40, rebalance_freq=20, use_ml=True,
+                               ml_models=(models, scalers), random_state=0)
+    recomputed = backtest_strategy(returns, window_size=40, rebalance_freq=20, use_ml=True,
+                                   ml_models=(models, scalers), random_state=0,
+                                   feature_store=False)
+    pd.testing.assert_series_equal(stored[0], recomputed[0])
+    pd.testing.assert_frame_equal(stored[1], recomputed[1])
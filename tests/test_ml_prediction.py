@@ -0,0 +1,115 @@
+"""
+Tests pour l'entraînement et la prédiction des modèles ML.
+"""
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.ml_prediction import (prepare_features, train_models, predict_returns,
+                                      train_panel_model, predict_panel_returns)
+
+@pytest.fixture
+def sample_returns():
+    """Fixture : le ticker V est contenu dans NVDA."""
+    rng = np.random.default_rng(12)
+    dates = pd.date_range(start='2020-01-01', periods=150, freq='B')
+    return pd.DataFrame(rng.normal(0.0005, 0.02, size=(150, 3)), index=dates,
+                        columns=['V', 'NVDA', 'AAPL'])
+
+def test_train_and_predict_use_ticker_columns(sample_returns):
+    """Test de la sélection des caractéristiques de chaque ticker, sans collision de noms."""
+    X, y = prepare_features(sample_returns)
+    with contextlib.redirect_stdout(io.StringIO()):
+        models, X_test, _, scalers = train_models(X, y)
+
+    for ticker in sample_returns.columns:
+        assert scalers[ticker].n_features_in_ == 14
+        assert list(X_test[ticker].columns.get_level_values('ticker').unique()) == [ticker]
+
+    predictions = predict_returns(models, X, scalers)
+    assert list(predictions.index) == ['V', 'NVDA', 'AAPL']
+    for ticker in sample_returns.columns:
+        best = min(models[ticker].values(), key=lambda info: info['mse'])['model']
+        expected = best.predict(scalers[ticker].transform(X[ticker].iloc[[-1]].to_numpy()))
+        assert predictions[ticker] == pytest.approx(expected[0])
+
+def test_train_models_parallel_matches_serial(sample_returns):
+    """Test de l'entraînement en parallèle : mêmes modèles et même budget de threads."""
+    X, y = prepare_features(sample_returns)
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial = train_models(X, y)
+        parallel = train_models(X, y, n_jobs=6, return_info=True)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        train_models(X, y)
+
+    info = parallel[4]
+    assert info['n_processes'] == 3
+    assert info['threads_per_process'] == 2
+    assert list(info['timings'].index) == ['V', 'NVDA', 'AAPL']
+    assert (info['timings'] > 0).all()
+    assert 'Entraînement des modèles pour NVDA... (2/3' in output.getvalue()
+
+    models, X_test, y_test, scalers = parallel[:4]
+    for ticker in sample_returns.columns:
+        for name in ('LinearRegression', 'RandomForest'):
+            assert models[ticker][name]['mse'] == serial[0][ticker][name]['mse']
+            assert models[ticker][name]['r2'] == serial[0][ticker][name]['r2']
+        assert models[ticker]['RandomForest']['model'].n_jobs is None
+        pd.testing.assert_frame_equal(X_test[ticker], serial[1][ticker])
+        pd.testing.assert_series_equal(y_test[ticker], serial[2][ticker])
+    pd.testing.assert_series_equal(predict_returns(models, X, scalers),
+                                   predict_returns(serial[0], X, serial[3]))
+
+def test_panel_model(sample_returns):
+    """Test du modèle panel : un jeu empilé, une prédiction pour toute la coupe transversale."""
+    X, y = prepare_features(sample_returns)
+    with contextlib.redirect_stdout(io.StringIO()):
+        panel_model, X_test, y_test = train_panel_model(X, y, ticker_codes=True)
+        _, per_ticker_test, _, _ = train_models(X, y)
+
+    assert panel_model['tickers'] == ['V', 'NVDA', 'AAPL']
+    assert set(panel_model['models']) == {'LinearRegression', 'RandomForest'}
+    assert list(X_test.columns[-4:]) == ['std_10', 'ticker_V', 'ticker_NVDA', 'ticker_AAPL']
+    # Mêmes jours de test que les modèles par ticker
+    test_dates = X_test.index.get_level_values('date').unique()
+    assert set(test_dates) == set(per_ticker_test['V'].index)
+    np.testing.assert_array_equal(X_test.xs('NVDA', level='ticker').iloc[:, :-3],
+                                  X['NVDA'].loc[test_dates])
+    assert (X_test.xs('NVDA', level='ticker').iloc[:, -3:] == [0, 1, 0]).all().all()
+    pd.testing.assert_series_equal(y_test.xs('AAPL', level='ticker'),
+                                   sample_returns['AAPL'].loc[test_dates], check_names=False)
+
+    predictions = predict_panel_returns(panel_model, X)
+    assert list(predictions.index) == ['V', 'NVDA', 'AAPL']
+    best = min(panel_model['models'].values(), key=lambda info: info['mse'])['model']
+    rows = np.column_stack([X.iloc[-1].to_numpy().reshape(3, 14), np.eye(3)])
+    np.testing.assert_allclose(predictions,
+                               best.predict(panel_model['scaler'].transform(rows)), rtol=1e-6)
+
+    # Un sous-ensemble de tickers garde les indicatrices de l'entraînement
+    subset = predict_panel_returns(panel_model, X[['AAPL', 'V']])
+    assert subset['AAPL'] == pytest.approx(predictions['AAPL'])
+
+def test_panel_model_ticker_order(sample_returns):
+    """Test de l'encodage one-hot : un effet par ticker, quel que soit l'ordre des tickers."""
+    X, _ = prepare_features(sample_returns)
+    # Cible : un effet propre à chaque ticker, non monotone dans l'ordre des colonnes
+    effects = pd.Series({'V': 0.01, 'NVDA': -0.01, 'AAPL': 0.005})
+    rng = np.random.default_rng(0)
+    y = pd.DataFrame(rng.normal(0, 0.001, size=(len(X), 3)), index=X.index,
+                     columns=sample_returns.columns) + effects
+
+    predictions = []
+    for tickers in [['V', 'NVDA', 'AAPL'], ['AAPL', 'V', 'NVDA']]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            panel_model, _, _ = train_panel_model(X[tickers], y[tickers], ticker_codes=True)
+        linear = dict(panel_model, models={
+            'LinearRegression': panel_model['models']['LinearRegression']
+        })
+        predictions.append(predict_panel_returns(linear, X[tickers]))
+
+    np.testing.assert_allclose(predictions[0][effects.index], effects, atol=5e-4)
+    pd.testing.assert_series_equal(predictions[0], predictions[1][predictions[0].index],
+                                   rtol=1e-5)
@@ -0,0 +1,93 @@
+"""
+Tests pour le magasin de moments glissants par sommes préfixées.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.moments import RollingMoments, rolling_mean_std
+from src.models.mpt import calculate_portfolio_metrics
+
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple sur 8 actifs."""
+    rng = np.random.default_rng(42)
+    dates = pd.date_range(start='2020-01-01', periods=400, freq='B')
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(400, 8)), index=dates,
+                           columns=[f'T{i}' for i in range(8)])
+    return returns
+
+
+@pytest.mark.parametrize('with_missing', [False, True])
+def test_window_matches_recomputation(sample_returns, with_missing):
+    """Test des fenêtres [start, end] contre un recalcul pandas."""
+    if with_missing:
+        sample_returns.iloc[50:120, 2] = np.nan
+        sample_returns.iloc[300, 5] = np.nan
+    moments = RollingMoments(sample_returns, checkpoint=21)
+
+    for start, end in [(0, 399), (7, 258), (21, 41), (100, 101), (130, 399)]:
+        expected_returns, cov_matrix = moments.window(start, end)
+        reference_returns, reference_cov = calculate_portfolio_metrics(
+            sample_returns.iloc[start:end + 1]
+        )
+        np.testing.assert_allclose(expected_returns, reference_returns, rtol=1e-10, atol=1e-14)
+        np.testing.assert_allclose(cov_matrix, reference_cov, rtol=1e-10, atol=1e-14)
+
+    # Une sélection de tickers, dans l'ordre demandé
+    selection = ['T5', 'T2', 'T0']
+    _, cov_matrix = moments.window(7, 258, selection)
+    _, reference_cov = calculate_portfolio_metrics(sample_returns.iloc[7:259][selection])
+    assert list(cov_matrix.columns) == selection
+    np.testing.assert_allclose(cov_matrix, reference_cov, rtol=1e-10)
+
+    with pytest.raises(IndexError):
+        moments.window(10, 400)
+
+
+def test_ewma_matches_pandas(sample_returns):
+    """Test de la variante à pondération exponentielle."""
+    moments = RollingMoments(sample_returns, checkpoint=21, halflife=30)
+    window = sample_returns.iloc[37:300]
+
+    expected_returns, cov_matrix = moments.ewma(37, 299)
+    reference_cov = window.ewm(halflife=30).cov().loc[window.index[-1]] * 252
+    reference_returns = window.ewm(halflife=30).mean().iloc[-1] * 252
+
+    np.testing.assert_allclose(expected_returns, reference_returns, rtol=1e-10)
+    np.testing.assert_allclose(cov_matrix, reference_cov, rtol=1e-10)
+
+    with pytest.raises(ValueError):
+        RollingMoments(sample_returns).ewma(0, 10)
+
+
+@pytest.mark.parametrize('first_rows', [10, 150])
+def test_append_matches_full_store(sample_returns, first_rows):
+    """Test de l'ajout de jours : identique au magasin construit sur tout l'historique."""
+    sample_returns.iloc[200, 3] = np.nan
+    full = RollingMoments(sample_returns, checkpoint=21, halflife=30)
+    moments = RollingMoments(sample_returns.iloc[:first_rows], checkpoint=21, halflife=30)
+    moments.append(sample_returns.iloc[first_rows:first_rows + 5])
+    moments.append(sample_returns.iloc[first_rows + 5:])
+
+    assert moments.index.equals(sample_returns.index)
+    for start, end in [(0, 399), (7, 258), (180, 230)]:
+        for query in ('window', 'ewma'):
+            expected = getattr(full, query)(start, end)
+            appended = getattr(moments, query)(start, end)
+            pd.testing.assert_series_equal(appended[0], expected[0], check_exact=True)
+            pd.testing.assert_frame_equal(appended[1], expected[1], check_exact=True)
+
+    with pytest.raises(ValueError):
+        moments.append(sample_returns[['T1', 'T0']])
+
+
+def test_rolling_mean_std(sample_returns):
+    """Test des moyennes et écarts-types glissants par sommes cumulées."""
+    sample_returns.iloc[30, 1] = np.nan
+    mean, std = rolling_mean_std(sample_returns, 5)
+
+    reference_mean = sample_returns.rolling(window=5).mean()
+    reference_std = sample_returns.rolling(window=5).std()
+    pd.testing.assert_frame_equal(mean, reference_mean, rtol=1e-10, atol=1e-14)
+    pd.testing.assert_frame_equal(std, reference_std, rtol=1e-8, atol=1e-14)
@@ -4,7 +4,16 @@ Tests pour le module d'optimisation de portefeuille selon Markowitz.
 import numpy as np
 import pandas as pd
 import pytest
-from src.models.mpt import calculate_portfolio_metrics, optimize_portfolio
+from scipy.optimize import minimize
+from src.models.mpt import (
+    calculate_portfolio_metrics,
+    corner_portfolios,
+    efficient_frontier,
+    max_sharpe_portfolio,
+    optimize_many,
+    optimize_portfolio,
+    optimize_portfolio_in_background
+)
 
 @pytest.fixture
 def sample_returns():
@@ -95,3 +104,318 @@ def test_portfolio_optimization_with_risk_free_rate():
     
     # Vérifier que les poids optimaux sont différents
     assert not np.array_equal(weights1, weights2)
+
+def test_efficient_frontier_cla(sample_returns):
+    """Test de la frontière efficiente calculée par l'algorithme de la ligne critique."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+
+    frontier = efficient_frontier(expected_returns, cov_matrix, num_portfolios=20)
+
+    # Vérifier que le contrat du DataFrame est conservé
+    assert list(frontier.columns) == ['Return', 'Volatility', 'Weights']
+    assert len(frontier) == 20
+
+    # Vérifier que chaque point est un portefeuille long-only valide
+    weights = np.vstack(frontier['Weights'])
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert np.all(weights >= 0)
+
+    # Vérifier que la frontière est croissante en rendement et en risque
+    assert np.all(np.diff(frontier['Return']) > 0)
+    assert np.all(np.diff(frontier['Volatility']) >= -1e-12)
+
+    # Comparer à une résolution directe pour quelques rendements cibles
+    mu, cov = expected_returns.values, cov_matrix.values
+    for _, point in frontier.iloc[::5].iterrows():
+        reference = minimize(
+            lambda w: w @ cov @ w, np.ones(4) / 4, method='SLSQP',
+            bounds=[(0, 1)] * 4,
+            constraints=[{'type': 'eq', 'fun': lambda w: w.sum() - 1},
+                         {'type': 'eq', 'fun': lambda w, t=point['Return']: w @ mu - t}],
+            options={'ftol': 1e-14}
+        )
+        assert point['Volatility'] <= np.sqrt(reference.fun) + 1e-8
+
+def _factor_returns(seed, n_assets, n_days=500):
+    """Rendements journaliers d'un modèle à trois facteurs."""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 1, size=(n_assets, 3))
+    factors = rng.normal(0, 0.01, size=(n_days, 3))
+    returns = (factors @ loadings.T + rng.normal(0, 0.01, size=(n_days, n_assets))
+               + rng.normal(0.0004, 0.0003, size=n_assets))
+    return pd.DataFrame(returns, columns=[f'A{i}' for i in range(n_assets)])
+
+# Les graines 6, 13, 34, 37 et 59 ont des événements simultanés (même lambda)
+@pytest.mark.parametrize('seed', [0, 1, 2, 6, 13, 34, 37, 59])
+def test_corner_portfolios_reach_minimum_variance(seed):
+    """Test du dernier coin contre le portefeuille de variance minimale, sur 15 à 40 actifs."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(
+        _factor_returns(seed, 15 + 5 * (seed % 6)))
+    mu, cov = expected_returns.values, cov_matrix.values
+
+    corners = corner_portfolios(expected_returns, cov_matrix)
+    assert np.allclose(corners.sum(axis=1), 1.0)
+    assert np.all(corners >= 0)
+    reference = optimize_portfolio(mu, cov)
+    assert corners[-1] @ cov @ corners[-1] <= (reference @ cov @ reference) * (1 + 1e-6)
+
+    frontier = efficient_frontier(expected_returns, cov_matrix, num_portfolios=10)
+    assert frontier['Volatility'].iloc[0] == pytest.approx(np.sqrt(corners[-1] @ cov @ corners[-1]))
+
+def test_efficient_frontier_cla_fallback(sample_returns, monkeypatch):
+    """Test du repli sur SLSQP quand le chemin de la ligne critique est dégénéré."""
+    import src.models.mpt as mpt
+    from src.models.cla import InfeasibleCornerError
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+
+    def degenerate(*args, **kwargs):
+        raise InfeasibleCornerError("chemin dégénéré")
+    monkeypatch.setattr(mpt, 'critical_line', degenerate)
+
+    frontier = efficient_frontier(expected_returns, cov_matrix, num_portfolios=5)
+    reference = efficient_frontier(expected_returns, cov_matrix, num_portfolios=5, method='slsqp')
+    pd.testing.assert_frame_equal(frontier[['Return', 'Volatility']],
+                                  reference[['Return', 'Volatility']])
+
+def test_corner_portfolios(sample_returns):
+    """Test des portefeuilles coins de la frontière efficiente."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+
+    corners = corner_portfolios(expected_returns, cov_matrix)
+
+    # Le premier coin est investi dans l'actif de rendement maximal
+    assert np.argmax(corners[0]) == np.argmax(expected_returns.values)
+    assert np.isclose(corners[0].max(), 1.0)
+
+    # Les rendements des coins sont strictement décroissants
+    assert np.all(np.diff(corners @ expected_returns.values) < 0)
+
+
+def test_optimize_portfolio_analytic_gradients(sample_returns):
+    """Test des gradients analytiques et du démarrage à chaud de l'optimiseur SLSQP."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+    target = expected_returns.quantile(0.75)
+
+    weights_fd, info_fd = optimize_portfolio(expected_returns, cov_matrix, target,
+                                             analytic_gradients=False, return_info=True)
+    weights, info = optimize_portfolio(expected_returns, cov_matrix, target, return_info=True)
+
+    # Même solution, avec beaucoup moins d'évaluations de la fonction objectif
+    assert info['success']
+    assert np.allclose(weights, weights_fd, atol=1e-4)
+    assert np.isclose(weights @ expected_returns.values, target)
+    assert info['nfev'] < info_fd['nfev']
+    assert info['time'] >= 0
+
+    # Un démarrage à chaud depuis la solution converge immédiatement
+    _, warm_info = optimize_portfolio(expected_returns, cov_matrix, target,
+                                      init_guess=weights, return_info=True)
+    assert warm_info['nit'] <= info['nit']
+
+def test_max_sharpe_portfolio(sample_returns):
+    """Test du portefeuille tangent (ratio de Sharpe maximal)."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+    mu, cov = expected_returns.values, cov_matrix.values
+    risk_free_rate = 0.01
+
+    weights = max_sharpe_portfolio(expected_returns, cov_matrix, risk_free_rate)
+
+    assert np.isclose(weights.sum(), 1.0)
+    assert np.all(weights >= 0)
+
+    # Aucun point de la frontière efficiente ne doit avoir un meilleur ratio de Sharpe
+    frontier = efficient_frontier(expected_returns, cov_matrix, num_portfolios=500)
+    frontier_sharpe = (frontier['Return'] - risk_free_rate) / frontier['Volatility']
+    sharpe = (weights @ mu - risk_free_rate) / np.sqrt(weights @ cov @ weights)
+    assert sharpe >= frontier_sharpe.max() - 1e-9
+
+    # Les bornes par actif sont respectées
+    capped = max_sharpe_portfolio(expected_returns, cov_matrix, risk_free_rate, bounds=(0, 0.3))
+    assert np.isclose(capped.sum(), 1.0)
+    assert np.all(capped <= 0.3 + 1e-9)
+
+def test_optimize_portfolio_time_budget(sample_returns):
+    """Test du mode anytime de l'optimiseur SLSQP."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+
+    # Un budget nul arrête l'optimiseur après la première itération
+    weights, info = optimize_portfolio(expected_returns, cov_matrix, time_budget=0.0,
+                                       return_info=True)
+    assert info['nit'] <= 1
+    assert np.isclose(weights.sum(), 1.0)
+    assert np.all(weights >= 0)
+
+    # L'affinage en arrière-plan converge vers la solution complète
+    refiner = optimize_portfolio_in_background(expected_returns, cov_matrix)
+    refined_weights, refined_info = refiner.wait(timeout=30)
+    assert refiner.done
+    assert refined_info['success']
+    assert np.allclose(refined_weights, optimize_portfolio(expected_returns, cov_matrix), atol=1e-4)
+
+def test_optimize_portfolio_time_budget_bounds(sample_returns, monkeypatch):
+    """Test de la projection d'un itéré interrompu avec des plafonds serrés."""
+    import src.models.mpt as mpt
+    from scipy.optimize import OptimizeResult
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+    caps = np.array([0.2, 0.25, 0.3, 0.3])
+
+    # Itéré interrompu hors des bornes, dont la somme écrêtée est inférieure à 1
+    iterate = np.array([0.1, 0.4, 0.2, 0.25])
+    def interrupted(fun, x0, **kwargs):
+        return OptimizeResult(x=iterate.copy(), success=False, message='Interrupted',
+                              nit=1, nfev=1, njev=1)
+    monkeypatch.setattr(mpt, 'minimize', interrupted)
+
+    weights, info = optimize_portfolio(expected_returns, cov_matrix, time_budget=1e-6,
+                                       return_info=True, bounds=[(0, cap) for cap in caps])
+    assert np.isclose(weights.sum(), 1.0, atol=1e-12)
+    assert np.all(weights >= 0) and np.all(weights <= caps)
+    assert info['max_violation'] <= 1e-12
+    # Projection euclidienne : clip(itéré - tau) avec la même translation tau pour tous
+    np.testing.assert_allclose(weights, [0.175, 0.25, 0.275, 0.3])
+
+    # Sans budget de temps, l'itéré n'est pas corrigé et la violation des bornes est signalée
+    weights, info = optimize_portfolio(expected_returns, cov_matrix, return_info=True,
+                                       bounds=[(0, cap) for cap in caps])
+    assert info['max_violation'] == pytest.approx(0.15)
+
+def test_optimize_portfolio_in_background_never_worsens(monkeypatch):
+    """Test de l'affinage quand chaque itération est plus longue qu'une tranche de 10 ms."""
+    import time
+    import src.models.mpt as mpt
+    expected_returns, cov_matrix = calculate_portfolio_metrics(_factor_returns(3, 30))
+    target = expected_returns.quantile(0.7)
+    reference = optimize_portfolio(expected_returns, cov_matrix, target)
+
+    def slow_minimize(*args, callback=None, **kwargs):
+        def slow_callback(x):
+            time.sleep(0.02)
+            callback(x)
+        return minimize(*args, callback=slow_callback, **kwargs)
+    monkeypatch.setattr(mpt, 'minimize', slow_minimize)
+
+    solver = optimize_portfolio_in_background(expected_returns, cov_matrix, target)
+    published = []
+    while solver.running:
+        result = solver.result()
+        if result is not None:
+            weights, info = result
+            assert info['max_violation'] <= 1e-6
+            published.append(np.sqrt(weights @ cov_matrix.values @ weights))
+        time.sleep(0.005)
+    weights, info = solver.wait()
+
+    assert solver.done and info['success']
+    assert len(set(published)) > 2
+    assert all(later <= earlier for earlier, later in zip(published, published[1:]))
+    assert np.allclose(weights, reference, atol=1e-6)
+
+def test_optimize_many(sample_returns):
+    """Test de l'optimisation par lots de plusieurs problèmes."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+    subset = ['AAPL', 'GOOGL', 'AMZN']
+    sub_returns, sub_cov = expected_returns[subset], cov_matrix.loc[subset, subset]
+    target = sub_returns.quantile(0.75)
+    problems = [
+        {},
+        {'assets': subset, 'target_return': target},
+        {'assets': subset, 'risk_free_rate': 0.01},
+        {'risk_free_rate': 0.01, 'bounds': (0, 0.3)},
+        {'assets': subset, 'risk_free_rate': expected_returns.max() + 0.1},
+        {'target_return': expected_returns.min()}
+    ]
+
+    weights, info = optimize_many(expected_returns, cov_matrix, problems)
+    references = [
+        optimize_portfolio(expected_returns, cov_matrix),
+        optimize_portfolio(sub_returns, sub_cov, target),
+        max_sharpe_portfolio(sub_returns, sub_cov, 0.01),
+        max_sharpe_portfolio(expected_returns, cov_matrix, 0.01, bounds=(0, 0.3)),
+        max_sharpe_portfolio(sub_returns, sub_cov, expected_returns.max() + 0.1),
+        optimize_portfolio(expected_returns, cov_matrix, expected_returns.min())
+    ]
+
+    assert weights.shape == (len(problems), len(expected_returns))
+    assert info['Success'].all()
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    # Les problèmes hors de la frontière efficiente passent par SLSQP
+    assert list(info['Method']) == ['cla'] * 4 + ['slsqp'] * 2
+    # Aucun poids en dehors du sous-ensemble d'actifs
+    assert np.all(weights[1:3, expected_returns.index.get_loc('MSFT')] == 0)
+
+    # Chaque solution est au moins aussi bonne que celle du solveur individuel
+    for row, (reference, problem) in enumerate(zip(references, problems)):
+        assets = problem.get('assets', list(expected_returns.index))
+        w = weights[row, [expected_returns.index.get_loc(a) for a in assets]]
+        mu, cov = expected_returns[assets].values, cov_matrix.loc[assets, assets].values
+        if 'risk_free_rate' in problem:
+            rf = problem['risk_free_rate']
+            sharpe = (w @ mu - rf) / np.sqrt(w @ cov @ w)
+            assert sharpe >= (reference @ mu - rf) / np.sqrt(reference @ cov @ reference) - 1e-9
+        else:
+            assert w @ cov @ w <= reference @ cov @ reference + 1e-9
+            if 'target_return' in problem:
+                assert np.isclose(w @ mu, problem['target_return'])
+
+    # Le pool de processus donne les mêmes poids
+    parallel_weights, _ = optimize_many(expected_returns, cov_matrix, problems, n_jobs=2)
+    assert np.array_equal(parallel_weights, weights)
+
+    with pytest.raises(ValueError):
+        optimize_many(expected_returns, cov_matrix, [{'assets': ['TSLA']}])
+
+@pytest.mark.parametrize('seed', [0, 6, 13, 37])
+def test_optimize_many_large_universe(seed):
+    """Test de l'optimisation par lots sur des univers de 15 à 40 actifs."""
+    returns = _factor_returns(seed, 15 + 5 * (seed % 6))
+    expected_returns, cov_matrix = calculate_portfolio_metrics(returns)
+    cov = cov_matrix.values
+    target = expected_returns.quantile(0.6)
+    problems = [{}, {'target_return': target}, {'bounds': (0, 0.2)}]
+
+    weights, info = optimize_many(expected_returns, cov_matrix, problems)
+    references = [
+        optimize_portfolio(expected_returns, cov_matrix),
+        optimize_portfolio(expected_returns, cov_matrix, target),
+        optimize_portfolio(expected_returns, cov_matrix, bounds=(0, 0.2))
+    ]
+
+    assert info['Success'].all()
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert weights.min() >= -1e-9 and weights[2].max() <= 0.2 + 1e-9
+    # La variance minimale des coins n'est pas au-dessus de celle de SLSQP
+    for w, reference in zip(weights, references):
+        assert w @ cov @ w <= reference @ cov @ reference * (1 + 1e-9)
+    assert np.isclose(weights[1] @ expected_returns.values, target)
+
+def test_optimize_many_cla_fallback(sample_returns, monkeypatch):
+    """Test du repli sur SLSQP quand le chemin de la ligne critique est dégénéré."""
+    import src.models.mpt as mpt
+    from src.models.cla import InfeasibleCornerError
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+
+    def degenerate(*args, **kwargs):
+        raise InfeasibleCornerError("chemin dégénéré")
+    monkeypatch.setattr(mpt, 'critical_line', degenerate)
+    weights, info = optimize_many(expected_returns, cov_matrix,
+                                  [{}, {'risk_free_rate': 0.01}])
+    assert list(info['Method']) == ['slsqp', 'slsqp']
+    assert info['Success'].all()
+    reference = optimize_portfolio(expected_returns, cov_matrix)
+    assert np.allclose(weights[0], reference, atol=1e-6)
+
+def test_efficient_frontier_parallel(sample_returns):
+    """Test de la frontière SLSQP calculée dans un pool de processus."""
+    expected_returns, cov_matrix = calculate_portfolio_metrics(sample_returns)
+
+    serial = efficient_frontier(expected_returns, cov_matrix, num_portfolios=12,
+                                method='slsqp', warm_start=False)
+    parallel = efficient_frontier(expected_returns, cov_matrix, num_portfolios=12,
+                                  method='slsqp', n_jobs=2)
+
+    # Même résultat, bit à bit et dans le même ordre
+    assert serial[['Return', 'Volatility']].equals(parallel[['Return', 'Volatility']])
+    assert all(np.array_equal(a, b) for a, b in zip(serial['Weights'], parallel['Weights']))
+
+    with pytest.raises(ValueError):
+        efficient_frontier(expected_returns, cov_matrix, method='slsqp', warm_start=True, n_jobs=2)
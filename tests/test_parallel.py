@@ -0,0 +1,47 @@
+"""
+Tests pour le module d'exécution parallèle à mémoire partagée.
+"""
+import numpy as np
+import pytest
+from src.models.parallel import SharedArrays, attach_shared_arrays, effective_n_jobs, parallel_map
+
+
+def _weighted_sum(arrays, row, scale):
+    """Tâche de test : combinaison d'une ligne de la matrice partagée."""
+    return scale * (arrays['matrix'][row] @ arrays['vector']) + arrays.get('offset', 0.0)
+
+
+def test_effective_n_jobs():
+    """Test de la résolution du nombre de processus."""
+    assert effective_n_jobs(None) == 1
+    assert effective_n_jobs(1) == 1
+    assert effective_n_jobs(3) == 3
+    assert effective_n_jobs(-1) >= 1
+
+
+def test_shared_arrays_roundtrip():
+    """Test de la copie en mémoire partagée et du rattachement en lecture seule."""
+    matrix = np.arange(12, dtype=float).reshape(3, 4)
+
+    with SharedArrays({'matrix': matrix}) as shared:
+        attached = attach_shared_arrays(shared.spec)['matrix']
+        assert np.array_equal(attached, matrix)
+        with pytest.raises(ValueError):
+            attached[0, 0] = 1.0
+
+
+def test_parallel_map_matches_serial():
+    """Test de l'égalité exacte, ordre compris, entre exécutions série et parallèle."""
+    rng = np.random.default_rng(0)
+    arrays = {'matrix': rng.normal(size=(50, 20)), 'vector': rng.normal(size=20)}
+    tasks = [(row, scale) for row in range(50) for scale in (0.5, 2.0)]
+
+    serial = parallel_map(_weighted_sum, tasks, arrays, n_jobs=1)
+    parallel = parallel_map(_weighted_sum, tasks, arrays, n_jobs=3)
+
+    assert serial == parallel
+
+    # Le contexte est transmis à chaque processus
+    shifted = parallel_map(_weighted_sum, tasks, arrays, n_jobs=2, context={'offset': 1.0})
+    assert shifted == [value + 1.0 for value in serial]
+    assert parallel_map(_weighted_sum, [], arrays, n_jobs=3) == []
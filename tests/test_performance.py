@@ -0,0 +1,90 @@
+"""
+Tests pour le module de métriques de performance vectorisées.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import calculate_performance_metrics
+from src.models.performance import (PERFORMANCE_METRICS, performance_table, rolling_drawdown,
+                                    rolling_sharpe, sliding_max)
+
+@pytest.fixture
+def sample_values():
+    """Fixture pour générer les valeurs de trois stratégies, dont une plus courte."""
+    rng = np.random.default_rng(8)
+    dates = pd.date_range(start='2020-01-01', periods=400, freq='B')
+    values = pd.DataFrame(np.cumprod(1 + rng.normal(0.0004, 0.01, size=(400, 3)), axis=0),
+                          index=dates, columns=['A', 'B', 'C'])
+    values.iloc[:60, 2] = np.nan
+    return values
+
+def test_performance_table_matches_single_series(sample_values):
+    """Test du tableau vectorisé contre calculate_performance_metrics, colonne par colonne."""
+    table = performance_table(sample_values, risk_free_rate=0.02)
+    assert list(table.columns) == PERFORMANCE_METRICS
+    assert list(table.index) == ['A', 'B', 'C']
+
+    for name in table.index:
+        values = sample_values[name].dropna()
+        metrics = calculate_performance_metrics(values, values.index, risk_free_rate=0.02)
+        metrics = dict(zip(metrics['Métrique'], metrics['Valeur']))
+        for label in ['Rendement Total', 'Rendement Annualisé', 'Volatilité Annualisée',
+                      'Ratio de Sharpe']:
+            assert table.loc[name, label] == pytest.approx(metrics[label], rel=1e-10)
+
+        # Drawdown et durée sous l'eau, calculés par une boucle explicite ; le plus haut
+        # part de la première valeur issue d'un rendement
+        peak, longest, current, worst = -np.inf, 0, 0, 0.0
+        for value in values.iloc[1:]:
+            peak = max(peak, value)
+            current = current + 1 if value < peak else 0
+            longest = max(longest, current)
+            worst = min(worst, value / peak - 1)
+        assert table.loc[name, 'Drawdown Maximal'] == pytest.approx(worst)
+        assert table.loc[name, 'Drawdown Maximal'] == pytest.approx(metrics['Drawdown Maximal'],
+                                                                    rel=1e-10)
+        assert table.loc[name, 'Durée Drawdown Maximale'] == longest
+
+        returns = values.pct_change().dropna()
+        downside = np.sqrt((np.minimum(returns, 0) ** 2).mean() * 252)
+        assert table.loc[name, 'Ratio de Sortino'] == pytest.approx(
+            (metrics['Rendement Annualisé'] - 0.02) / downside)
+        assert table.loc[name, 'Ratio de Calmar'] == pytest.approx(
+            metrics['Rendement Annualisé'] / -worst)
+
+    # Un array sans dates compte les années en périodes
+    array_table = performance_table(sample_values[['A', 'B']].to_numpy(), periods_per_year=252)
+    assert array_table.loc[0, 'Rendement Total'] == pytest.approx(table.loc['A', 'Rendement Total'])
+
+def test_performance_table_drawdown_peak():
+    """Test du drawdown : même plus haut de référence que calculate_performance_metrics."""
+    dates = pd.date_range(start='2020-01-01', periods=6, freq='B')
+    # La valeur de départ est le plus haut de la série
+    values = pd.DataFrame({'A': [1.0, 0.9, 0.95, 0.8, 0.85, 0.99],
+                           'B': [np.nan, 1.0, 1.1, 0.99, 1.2, 1.3]}, index=dates)
+    table = performance_table(values)
+
+    for name in values.columns:
+        series = values[name].dropna()
+        metrics = calculate_performance_metrics(series, series.index)
+        metrics = dict(zip(metrics['Métrique'], metrics['Valeur']))
+        assert table.loc[name, 'Drawdown Maximal'] == pytest.approx(metrics['Drawdown Maximal'])
+    assert table.loc['A', 'Drawdown Maximal'] == pytest.approx(0.8 / 0.95 - 1)
+    assert table.loc['A', 'Durée Drawdown Maximale'] == 2
+
+@pytest.mark.parametrize('window', [1, 7, 63])
+def test_sliding_max(sample_values, window):
+    """Test du maximum glissant contre pandas."""
+    expected = sample_values.rolling(window, min_periods=1).max().to_numpy()
+    np.testing.assert_array_equal(sliding_max(sample_values.to_numpy(), window), expected)
+
+def test_rolling_metrics(sample_values):
+    """Test du Sharpe et du drawdown glissants contre pandas."""
+    returns = sample_values.pct_change()
+    expected = ((returns.rolling(63).mean() * 252 - 0.01)
+                / (returns.rolling(63).std() * np.sqrt(252)))
+    pd.testing.assert_frame_equal(rolling_sharpe(sample_values, 63), expected, rtol=1e-8)
+
+    expected = sample_values / sample_values.rolling(21, min_periods=1).max() - 1
+    pd.testing.assert_frame_equal(rolling_drawdown(sample_values, 21), expected)
+    assert rolling_drawdown(sample_values['A'], 21).shape == (400, 1)
@@ -0,0 +1,121 @@
+"""
+Tests pour les politiques de rééquilibrage.
+"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import backtest_strategy, compare_strategies, simulate_portfolio
+from src.models.rebalancing import BandPolicy, CalendarPolicy, VolatilityPolicy, simulate_policy
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple."""
+    rng = np.random.default_rng(9)
+    dates = pd.date_range(start='2020-01-01', periods=400, freq='B')
+    return pd.DataFrame(rng.normal(0.0005, 0.02, size=(400, 4)), index=dates,
+                        columns=['AAPL', 'MSFT', 'GOOGL', 'AMZN'])
+
+def _fixed_solver(n_assets):
+    """Optimiseur factice : des poids déterministes différents à chaque appel."""
+    calls = []
+    def solve(rank, day):
+        calls.append((rank, day))
+        weights = np.roll(np.arange(1, n_assets + 1, dtype=float), rank)
+        return weights / weights.sum()
+    return solve, calls
+
+def test_simulate_policy_calendar_matches_simulate_portfolio(sample_returns):
+    """Test du moteur à politique contre la simulation à dates fixes."""
+    history = sample_returns.to_numpy()
+    solve, calls = _fixed_solver(4)
+    values, weights, days = simulate_policy(history[60:], history, 60, CalendarPolicy(25), solve)
+
+    np.testing.assert_array_equal(days, np.arange(25, 340, 25))
+    assert calls == list(enumerate(days))
+    targets = np.vstack([np.ones(4) / 4] + [solve(rank, day) for rank, day in enumerate(days)])
+    expected_values, expected_weights = simulate_portfolio(history[60:], days, targets, drift=True)
+    np.testing.assert_array_equal(values, expected_values)
+    np.testing.assert_array_equal(weights, expected_weights)
+
+def test_simulate_policy_scans_only_until_trigger():
+    """Test du coût : chaque segment n'examine que quelques fois sa propre longueur."""
+    rng = np.random.default_rng(1)
+    history = rng.normal(0.0005, 0.02, size=(60 + 2000, 3))
+    scanned = []
+
+    class RecordingPolicy(CalendarPolicy):
+        def triggers(self, weights, portfolio_returns):
+            scanned.append(len(weights))
+            return super().triggers(weights, portfolio_returns)
+
+    solve, _ = _fixed_solver(3)
+    _, _, days = simulate_policy(history[60:], history, 60, RecordingPolicy(25), solve)
+    assert len(days) == 79
+    # Sans fenêtre bornée, chaque segment parcourrait le reste de l'historique (~80 000 jours)
+    assert sum(scanned) <= 4 * 2000
+
+def test_band_policy_keeps_weights_in_band(sample_returns):
+    """Test de la bande de tolérance : aucun poids ne sort de la bande sans rééquilibrage."""
+    history = sample_returns.to_numpy()
+    solve, _ = _fixed_solver(4)
+    values, weights, days = simulate_policy(history[60:], history, 60, BandPolicy(0.03), solve)
+
+    assert 0 < len(days) < 100
+    targets = np.vstack([np.ones(4) / 4] + [solve(rank, day) for rank, day in enumerate(days)])
+    segment = np.searchsorted(days, np.arange(len(weights)), side='right')
+    deviation = np.abs(weights - targets[segment]).max(axis=1)
+    # Seuls les jours de rééquilibrage ont dépassé la bande (avant de revenir à la cible)
+    drifted = np.abs(np.delete(weights, 0, axis=0) - targets[segment[:-1]]).max(axis=1)
+    assert set(np.flatnonzero(drifted > 0.03) + 1) == set(days)
+    assert (deviation[days] == 0).all()
+
+def test_volatility_policy():
+    """Test du déclenchement sur la volatilité réalisée."""
+    policy = VolatilityPolicy(threshold=0.5, window=10)
+    rng = np.random.default_rng(0)
+    policy.reset(np.array([1.0]), rng.normal(0, 0.01, size=(100, 1)))
+    calm = rng.normal(0, 0.01, size=30)
+    stressed = rng.normal(0, 0.05, size=30)
+    mask = policy.triggers(np.ones((60, 1)), np.concatenate([calm, stressed]))
+    assert not mask[:30].any()
+    assert mask[40:].all()
+
+def test_backtest_strategy_with_policy(sample_returns):
+    """Test de backtest_strategy avec une politique à seuil."""
+    calendar = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20, drift=True,
+                                 random_state=0, return_info=True)
+    policy = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20,
+                               random_state=0, return_info=True,
+                               rebalance_policy=CalendarPolicy(20))
+    band = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20, drift=True,
+                             random_state=0, rebalance_policy=BandPolicy(0.1), return_info=True)
+
+    assert calendar[3]['n_solves'] == calendar[3]['calendar_solves'] == 16
+    assert calendar[3]['solves_avoided'] == 0
+    assert policy[3]['n_solves'] == 16
+    info = band[3]
+    assert info['n_solves'] + info['solves_avoided'] == 16
+    assert info['n_solves'] == len(info['rebalance_dates'])
+    # Les poids changent exactement aux dates de rééquilibrage décidées par la politique
+    for date in info['rebalance_dates']:
+        assert not np.allclose(band[1].loc[date], band[1].shift(1).loc[date])
+
+    # Une politique à seuil fait toujours dériver les poids et ne se reprend pas
+    with pytest.raises(ValueError):
+        backtest_strategy(sample_returns, window_size=60, rebalance_policy=BandPolicy(),
+                          drift=True, return_state=True)
+    with pytest.raises(ValueError):
+        backtest_strategy(sample_returns, window_size=60, rebalance_policy=BandPolicy())
+    with pytest.raises(ValueError):
+        compare_strategies(sample_returns, {'Bande': {'rebalance_policy': BandPolicy(),
+                                                      'drift': False}}, window_size=60)
+
+    # compare_strategies fait dériver les poids des politiques à seuil par défaut
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, values = compare_strategies(sample_returns, {
+            'Bande': {'rebalance_freq': 20, 'rebalance_policy': BandPolicy(0.1)}
+        }, window_size=60, random_state=0)
+    pd.testing.assert_series_equal(values['Bande'], band[0], check_names=False)
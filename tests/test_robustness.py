@@ -0,0 +1,84 @@
+"""
+Tests pour le module de robustesse par bootstrap.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import simulate_portfolio
+from src.models.robustness import (PATH_METRICS, bootstrap_paths, path_metrics,
+                                   robustness_report, simulate_paths)
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple."""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range(start='2020-01-01', periods=300, freq='B')
+    return pd.DataFrame(rng.normal(0.0005, 0.02, size=(300, 3)), index=dates,
+                        columns=['AAPL', 'MSFT', 'GOOGL'])
+
+@pytest.mark.parametrize('method', ['stationary', 'block'])
+def test_bootstrap_paths(sample_returns, method):
+    """Test de la forme des chemins et de la structure en blocs."""
+    paths = bootstrap_paths(sample_returns, n_paths=4, n_days=200, block_size=10,
+                            method=method, random_state=0)
+    assert paths.shape == (4, 200, 3)
+    np.testing.assert_array_equal(paths, bootstrap_paths(sample_returns, 4, 200, 10, method, 0))
+
+    # Chaque jour tiré est une ligne de l'historique, les blocs se suivent dans l'historique
+    rows = {tuple(row): i for i, row in enumerate(sample_returns.to_numpy())}
+    positions = np.array([[rows[tuple(day)] for day in path] for path in paths])
+    continued = np.diff(positions, axis=1) % len(sample_returns) == 1
+    if method == 'block':
+        assert continued[:, np.arange(199) % 10 != 9].all()
+    else:
+        assert 0.8 < continued.mean() < 0.98
+
+    with pytest.raises(ValueError):
+        bootstrap_paths(sample_returns, 2, method='iid')
+
+@pytest.mark.parametrize('rebalance_freq', [1, 20, None])
+def test_simulate_paths_matches_simulate_portfolio(sample_returns, rebalance_freq):
+    """Test de la simulation vectorisée contre simulate_portfolio, chemin par chemin."""
+    paths = bootstrap_paths(sample_returns, n_paths=3, n_days=90, random_state=1)
+    weights = np.array([0.5, 0.3, 0.2])
+    values = simulate_paths(paths, weights, rebalance_freq)
+    assert values.shape == (3, 91)
+
+    for path, path_values in zip(paths, values):
+        # Jour 0 sans rendement, comme dans simulate_portfolio
+        asset_returns = np.vstack([np.zeros((1, 3)), path])
+        if rebalance_freq == 1:
+            expected, _ = simulate_portfolio(asset_returns, np.array([], dtype=int), weights[None])
+        else:
+            days = np.arange(rebalance_freq or 91, 91, rebalance_freq or 91)
+            expected, _ = simulate_portfolio(asset_returns, days,
+                                             np.tile(weights, (len(days) + 1, 1)), drift=True)
+        np.testing.assert_allclose(path_values, expected, rtol=1e-12)
+
+def test_path_metrics():
+    """Test des métriques vectorisées sur des chemins connus."""
+    values = np.array([[1.0, 1.1, 0.99, 1.2], [1.0, 0.9, 0.95, 0.8]])
+    metrics = path_metrics(values, risk_free_rate=0.0, periods_per_year=3)
+    np.testing.assert_allclose(metrics['Valeur Finale'], [1.2, 0.8])
+    np.testing.assert_allclose(metrics['Rendement Annualisé'], [0.2, -0.2])
+    np.testing.assert_allclose(metrics['Drawdown Maximal'], [0.99 / 1.1 - 1, -0.2])
+    daily = pd.Series(values[1]).pct_change().dropna()
+    assert metrics['Volatilité Annualisée'][1] == pytest.approx(daily.std() * np.sqrt(3))
+
+def test_robustness_report(sample_returns):
+    """Test du rapport : une ligne par chemin, indépendance vis-à-vis des lots."""
+    strategies = {
+        'Équipondéré': {'weights': np.ones(3) / 3},
+        'Mensuel': {'weights': pd.Series({'MSFT': 0.6, 'AAPL': 0.4}), 'rebalance_freq': 21},
+    }
+    summary, samples = robustness_report(sample_returns, strategies, n_paths=50, chunk_size=50,
+                                         random_state=0)
+    _, chunked = robustness_report(sample_returns, strategies, n_paths=50, chunk_size=7,
+                                   random_state=0)
+
+    assert len(samples) == 100
+    pd.testing.assert_frame_equal(samples, chunked)
+    assert list(summary.index.get_level_values('Métrique')[:5]) == PATH_METRICS
+    assert list(summary.columns) == ['Moyenne', 'Écart-type', '5%', '25%', '50%', '75%', '95%']
+    median = samples[samples['Stratégie'] == 'Mensuel']['Ratio de Sharpe'].median()
+    assert summary.loc[('Mensuel', 'Ratio de Sharpe'), '50%'] == pytest.approx(median)
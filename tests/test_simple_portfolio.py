@@ -0,0 +1,151 @@
+"""
+Tests pour l'optimisation de portefeuille par simulation (simple_portfolio).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from simple_portfolio import (
+    MonteCarloSearch,
+    cached_optimize_portfolio,
+    calculate_portfolio_metrics,
+    optimize_portfolio,
+    sampling_convergence_report,
+    weight_sampler
+)
+
+@pytest.fixture
+def sample_metrics():
+    """Fixture pour générer des rendements attendus et une matrice de covariance."""
+    np.random.seed(42)
+    dates = pd.date_range(start='2020-01-01', periods=252, freq='B')
+    tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META']
+
+    returns_data = np.random.normal(loc=0.001, scale=0.02, size=(252, 5))
+    returns = pd.DataFrame(returns_data, index=dates, columns=tickers)
+
+    return calculate_portfolio_metrics(returns)
+
+def test_optimize_portfolio_matches_sequential_sampling(sample_metrics):
+    """Test de l'échantillonnage par blocs contre la boucle portefeuille par portefeuille."""
+    expected_returns, cov_matrix = sample_metrics
+
+    np.random.seed(0)
+    frontier, weights = optimize_portfolio(expected_returns, cov_matrix, n_portfolios=1000,
+                                           chunk_size=300)
+
+    # Reproduire les mêmes tirages un portefeuille à la fois
+    np.random.seed(0)
+    reference = []
+    for _ in range(1000):
+        w = np.random.random(5)
+        w /= w.sum()
+        ret = np.sum(expected_returns * w)
+        vol = np.sqrt(w @ cov_matrix.values @ w)
+        reference.append([ret, vol, (ret - 0.01) / vol, w])
+
+    assert list(frontier.columns) == ['Return', 'Volatility', 'Sharpe']
+    assert len(frontier) == 1000
+    assert np.allclose(frontier.values, np.array([r[:3] for r in reference], dtype=float))
+
+    best = int(np.argmax([r[2] for r in reference]))
+    assert frontier['Sharpe'].idxmax() == best
+    assert np.allclose(weights, reference[best][3])
+
+def test_optimize_portfolio_bounded_frontier(sample_metrics):
+    """Test du sous-échantillonnage de la frontière pour les grands nombres de tirages."""
+    expected_returns, cov_matrix = sample_metrics
+
+    full, full_weights = optimize_portfolio(expected_returns, cov_matrix, n_portfolios=20000,
+                                            random_state=1)
+    frontier, weights = optimize_portfolio(expected_returns, cov_matrix, n_portfolios=20000,
+                                           max_frontier_points=500, random_state=1)
+
+    # La frontière est bornée mais contient toujours le portefeuille optimal
+    assert len(frontier) <= 501
+    assert frontier['Sharpe'].idxmax() == full['Sharpe'].idxmax()
+    assert np.isclose(frontier['Sharpe'].max(), full['Sharpe'].max())
+    assert np.array_equal(weights, full_weights)
+    assert np.isclose(weights.sum(), 1.0)
+
+@pytest.mark.parametrize('method', ['uniform', 'dirichlet', 'sobol', 'vertex'])
+def test_weight_sampler_methods(method):
+    """Test des stratégies d'échantillonnage : les poids restent sur le simplexe."""
+    draw = weight_sampler(6, method=method, alpha=0.5, random_state=0)
+    weights = np.vstack([draw(100), draw(28)])
+
+    assert weights.shape == (128, 6)
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert np.all(weights >= 0)
+
+def test_sampling_convergence_report(sample_metrics):
+    """Test du rapport de convergence vers le portefeuille tangent exact."""
+    expected_returns, cov_matrix = sample_metrics
+
+    report = sampling_convergence_report(expected_returns, cov_matrix, sample_sizes=(100, 1000),
+                                         methods=('uniform', 'dirichlet'), alpha=0.3)
+
+    assert len(report) == 4
+    assert all(col in report.columns for col in ['Method', 'Samples', 'Best Sharpe',
+                                                 'Exact Sharpe', 'Sharpe Gap'])
+    # Aucun portefeuille simulé ne dépasse l'optimum exact
+    assert np.all(report['Sharpe Gap'] >= -1e-9)
+    assert np.all(report['Best Sharpe'] <= report['Exact Sharpe'] + 1e-9)
+
+    # L'exécution parallèle donne exactement le même rapport
+    parallel = sampling_convergence_report(expected_returns, cov_matrix, sample_sizes=(100, 1000),
+                                           methods=('uniform', 'dirichlet'), alpha=0.3, n_jobs=2)
+    pd.testing.assert_frame_equal(report, parallel, check_exact=True)
+
+def test_optimize_portfolio_time_budget(sample_metrics):
+    """Test du mode anytime : le budget de temps interrompt la simulation."""
+    expected_returns, cov_matrix = sample_metrics
+
+    frontier, weights, info = optimize_portfolio(expected_returns, cov_matrix,
+                                                 n_portfolios=10**8, chunk_size=1000,
+                                                 max_frontier_points=1000,
+                                                 time_budget=0.05, return_info=True)
+
+    assert not info['completed']
+    assert 0 < info['n_samples'] < 10**8
+    assert np.isclose(weights.sum(), 1.0)
+    assert np.isclose(frontier['Sharpe'].max(), info['best_sharpe'])
+
+def test_cached_optimize_portfolio_time_budget(sample_metrics):
+    """Test du cache : une recherche interrompue par son budget n'est pas mémorisée."""
+    expected_returns, cov_matrix = sample_metrics
+    cache = cached_optimize_portfolio.cache
+    cache.clear()
+
+    kwargs = dict(n_portfolios=10**6, chunk_size=100, random_state=0, return_info=True)
+    for _ in range(2):
+        _, _, info = cached_optimize_portfolio(expected_returns, cov_matrix, time_budget=0.0,
+                                               **kwargs)
+        assert not info['completed']
+    assert cache.stats()['hits'] == 0
+
+    # Une recherche complète et reproductible est mémorisée
+    kwargs['n_portfolios'] = 1000
+    _, weights, info = cached_optimize_portfolio(expected_returns, cov_matrix, time_budget=10.0,
+                                                 **kwargs)
+    assert info['completed']
+    _, again, _ = cached_optimize_portfolio(expected_returns, cov_matrix, time_budget=10.0,
+                                            **kwargs)
+    assert np.array_equal(weights, again)
+    assert cache.stats()['hits'] == 1
+    cache.clear()
+
+def test_monte_carlo_search_background_refinement(sample_metrics):
+    """Test de l'affinage en arrière-plan de la recherche aléatoire."""
+    expected_returns, cov_matrix = sample_metrics
+
+    search = MonteCarloSearch(expected_returns, cov_matrix, chunk_size=500, random_state=0)
+    search.run(1000)
+    first_sharpe = search.best_sharpe
+
+    refiner = search.refine_in_background(max_portfolios=20000, time_slice=0.01)
+    frontier, weights, info = refiner.wait(timeout=30)
+
+    assert refiner.done
+    assert info['n_samples'] == 20000
+    assert info['best_sharpe'] >= first_sharpe
+    assert len(frontier) == 20000
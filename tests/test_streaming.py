@@ -0,0 +1,90 @@
+"""
+Tests pour le module de backtest en flux.
+"""
+import asyncio
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import backtest_strategy, calculate_performance_metrics
+from src.models.streaming import (PerformanceAccumulator, StreamingBacktest, astream_backtest,
+                                  stream_backtest, tail_returns_csv)
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple."""
+    rng = np.random.default_rng(6)
+    dates = pd.date_range(start='2020-01-01', periods=180, freq='B')
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(180, 3)), index=dates,
+                           columns=['AAPL', 'MSFT', 'GOOGL'])
+    returns.iloc[100, 1] = np.nan
+    return returns
+
+def test_performance_accumulator():
+    """Test des métriques en ligne contre calculate_performance_metrics."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start='2020-01-01', periods=300, freq='B')
+    values = pd.Series(np.cumprod(1 + rng.normal(0.0005, 0.01, 300)), index=dates)
+
+    accumulator = PerformanceAccumulator(risk_free_rate=0.02)
+    for date, value in values.items():
+        accumulator.update(value, date)
+
+    expected = calculate_performance_metrics(values, dates, risk_free_rate=0.02)
+    pd.testing.assert_series_equal(accumulator.metrics()['Valeur'], expected['Valeur'],
+                                   rtol=1e-10)
+    assert list(accumulator.metrics()['Métrique']) == list(expected['Métrique'])
+
+@pytest.mark.parametrize('drift', [False, True])
+def test_stream_backtest_matches_batch(sample_returns, drift):
+    """Test du backtest en flux contre backtest_strategy sur le même historique."""
+    values, weights, metrics = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20,
+                                                 drift=drift, random_state=0, moment_store=False)
+
+    ticks = list(stream_backtest(sample_returns.iterrows(), window_size=60, rebalance_freq=20,
+                                 drift=drift, random_state=0))
+    assert len(ticks) == len(values)
+    np.testing.assert_array_equal([value for _, value, _ in ticks], values)
+    np.testing.assert_array_equal(np.array([w for _, _, w in ticks]), weights)
+
+    backtest = StreamingBacktest(sample_returns.columns, window_size=60, rebalance_freq=20,
+                                 drift=drift, random_state=0)
+    for date, row in sample_returns.iterrows():
+        backtest.update(date, row.to_numpy())
+    assert backtest.n_rebalances == 5
+    pd.testing.assert_series_equal(backtest.metrics()['Valeur'], metrics['Valeur'], rtol=1e-10)
+
+def test_tail_returns_csv(sample_returns, tmp_path):
+    """Test de la lecture d'un CSV en cours d'écriture, en synchrone et en asynchrone."""
+    path = tmp_path / 'returns.csv'
+    lines = sample_returns.to_csv().splitlines(keepends=True)
+    path.write_text(''.join(lines[:51]))
+
+    source = tail_returns_csv(str(path), poll_interval=0.01, timeout=0.2)
+    rows = [next(source) for _ in range(50)]
+    # Nouvelles lignes, dont une dernière incomplète, lue seulement une fois terminée
+    appended = ''.join(lines[51:])
+    with open(path, 'a') as f:
+        f.write(appended[:-5])
+    rows.extend(itertools.islice(source, len(lines) - 52))
+    with open(path, 'a') as f:
+        f.write(appended[-5:])
+    rows.extend(source)
+
+    received = pd.DataFrame([row for _, row in rows], index=[date for date, _ in rows])
+    pd.testing.assert_frame_equal(received, sample_returns, check_freq=False)
+
+    async def consume():
+        source = astream_backtest(_aiter(sample_returns), window_size=60, rebalance_freq=20,
+                                  random_state=0)
+        return [value async for _, value, _ in source]
+
+    values, _, _ = backtest_strategy(sample_returns, window_size=60, rebalance_freq=20,
+                                     random_state=0, moment_store=False)
+    np.testing.assert_array_equal(asyncio.run(consume()), values)
+
+async def _aiter(returns):
+    for date, row in returns.iterrows():
+        await asyncio.sleep(0)
+        yield date, row
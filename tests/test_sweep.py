@@ -0,0 +1,103 @@
+"""
+Tests pour le module de balayage de grilles de stratégies.
+"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.backtest import backtest_strategy
+from src.models.cache import ResultCache
+from src.models.ml_prediction import prepare_features, train_models
+from src.models.sweep import expand_grid, sweep_strategies
+
+@pytest.fixture
+def sample_returns():
+    """Fixture pour générer des rendements d'exemple."""
+    rng = np.random.default_rng(3)
+    dates = pd.date_range(start='2020-01-01', periods=160, freq='B')
+    return pd.DataFrame(rng.normal(0.0005, 0.02, size=(160, 3)), index=dates,
+                        columns=['AAPL', 'MSFT', 'GOOGL'])
+
+def test_expand_grid():
+    """Test du développement d'une grille de paramètres."""
+    configs = expand_grid({'window_size': [40, 60], 'rebalance_freq': 20})
+    assert configs == [
+        {'window_size': 40, 'rebalance_freq': 20, 'use_ml': False, 'drift': False},
+        {'window_size': 60, 'rebalance_freq': 20, 'use_ml': False, 'drift': False},
+    ]
+    with pytest.raises(ValueError):
+        expand_grid({'windows': [40]})
+
+def test_sweep_strategies(sample_returns, tmp_path):
+    """Test du balayage : résultats du backtest direct et reprise depuis le store."""
+    grid = {'window_size': [40, 60], 'rebalance_freq': [20, 30]}
+    store = ResultCache(directory=str(tmp_path))
+    results, portfolio_values = sweep_strategies(sample_returns, grid, random_state=0,
+                                                 store=store)
+
+    assert len(results) == 4
+    assert list(results.columns[:6]) == ['window_size', 'rebalance_freq', 'use_ml', 'drift',
+                                         'Config', 'Cached']
+    assert not results['Cached'].any()
+    assert results['Config'].is_unique
+
+    # Chaque ligne est le backtest de sa configuration
+    row = results.iloc[3]
+    values, _, metrics = backtest_strategy(sample_returns, window_size=60, rebalance_freq=30,
+                                           random_state=0)
+    pd.testing.assert_series_equal(portfolio_values[3].dropna(), values, check_names=False)
+    for name, value in zip(metrics['Métrique'], metrics['Valeur']):
+        assert row[name] == pytest.approx(value, rel=1e-9)
+
+    # Un nouveau balayage élargi ne recalcule que les configurations manquantes
+    grid['rebalance_freq'].append(40)
+    resumed, resumed_values = sweep_strategies(sample_returns, grid, random_state=0,
+                                               store=ResultCache(directory=str(tmp_path)))
+    assert resumed['Cached'].sum() == 4
+    cached = resumed[resumed['Cached']].drop(columns='Cached').reset_index(drop=True)
+    pd.testing.assert_frame_equal(cached, results.drop(columns='Cached'))
+
+def test_sweep_strategies_parallel(sample_returns):
+    """Test du balayage en parallèle."""
+    grid = {'window_size': [40, 60], 'drift': [False, True]}
+    serial = sweep_strategies(sample_returns, grid, random_state=0)
+    parallel = sweep_strategies(sample_returns, grid, random_state=0, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial[0], parallel[0], check_exact=True)
+    pd.testing.assert_frame_equal(serial[1], parallel[1], check_exact=True)
+
+    with pytest.raises(ValueError):
+        sweep_strategies(sample_returns, grid, n_jobs=2)
+
+def test_sweep_strategies_model_version(sample_returns, tmp_path):
+    """Test du store : des modèles réentraînés invalident les seules configurations ML."""
+    X, y = prepare_features(sample_returns)
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = train_models(X, y, random_state=0)
+        # Cibles opposées : des prédictions, donc des portefeuilles, différents
+        retrained = train_models(X, -y, random_state=0)
+    grid = {'window_size': 40, 'rebalance_freq': 30, 'use_ml': [False, True]}
+
+    results, results_values = sweep_strategies(sample_returns, grid, random_state=0,
+                                               store=ResultCache(directory=str(tmp_path)),
+                                               ml_models=(first[0], first[3]))
+    same, _ = sweep_strategies(sample_returns, grid, random_state=0,
+                               store=ResultCache(directory=str(tmp_path)),
+                               ml_models=(first[0], first[3]))
+    assert same['Cached'].all()
+
+    updated, updated_values = sweep_strategies(sample_returns, grid, random_state=0,
+                                               store=ResultCache(directory=str(tmp_path)),
+                                               ml_models=(retrained[0], retrained[3]))
+    assert list(updated['Cached']) == [True, False]
+    assert updated['Config'][0] == results['Config'][0]
+    assert updated['Config'][1] != results['Config'][1]
+
+    # Le résultat recalculé est celui des modèles réentraînés
+    values, _, _ = backtest_strategy(sample_returns, window_size=40, rebalance_freq=30,
+                                     use_ml=True, ml_models=(retrained[0], retrained[3]),
+                                     random_state=0)
+    pd.testing.assert_series_equal(updated_values[1].dropna(), values, check_names=False)
+    assert not np.allclose(updated_values[1].dropna(), results_values[1].dropna())
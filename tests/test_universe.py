@@ -0,0 +1,58 @@
+"""
+Tests pour les statistiques précalculées d'un univers d'actifs.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.mpt import calculate_portfolio_metrics
+from src.models.universe import UniverseStatistics
+
+
+@pytest.fixture
+def universe_returns():
+    """Fixture pour générer les rendements d'un univers de 30 actifs, avec des trous."""
+    rng = np.random.default_rng(42)
+    dates = pd.date_range(start='2020-01-01', periods=300, freq='B')
+    tickers = [f'T{i:02d}' for i in range(30)]
+    returns = pd.DataFrame(rng.normal(0.0005, 0.02, size=(300, 30)), index=dates, columns=tickers)
+    # Historiques de longueurs différentes
+    returns.iloc[:50, 3] = np.nan
+    returns.iloc[200:, 17] = np.nan
+    return returns
+
+
+def test_subset_matches_recomputation(universe_returns):
+    """Test de l'égalité entre extraction et recalcul sur la sélection."""
+    universe = UniverseStatistics(universe_returns)
+    selection = ['T17', 'T03', 'T25', 'T00']
+
+    expected_returns, cov_matrix = universe.subset(selection)
+    reference_returns, reference_cov = calculate_portfolio_metrics(universe_returns[selection])
+
+    assert list(expected_returns.index) == selection
+    assert list(cov_matrix.columns) == selection
+    np.testing.assert_allclose(expected_returns, reference_returns, rtol=1e-12)
+    np.testing.assert_allclose(cov_matrix, reference_cov, rtol=1e-10)
+
+    with pytest.raises(KeyError):
+        universe.subset(['T00', 'TSLA'])
+
+    # Un historique plus court est servi par le magasin de moments
+    recent_returns, recent_cov = universe.subset(selection, lookback=120)
+    reference_returns, reference_cov = calculate_portfolio_metrics(
+        universe_returns[selection].iloc[-120:]
+    )
+    np.testing.assert_allclose(recent_returns, reference_returns, rtol=1e-10)
+    np.testing.assert_allclose(recent_cov, reference_cov, rtol=1e-10)
+
+
+def test_cholesky(universe_returns):
+    """Test du facteur de Cholesky de l'univers et des sélections."""
+    universe = UniverseStatistics(universe_returns.dropna())
+    factor = universe.cholesky()
+    np.testing.assert_allclose(factor @ factor.T, universe.cov_matrix.values, atol=1e-14)
+
+    for selection in (['T00', 'T01', 'T02'], ['T10', 'T04']):
+        _, cov_matrix = universe.subset(selection)
+        sub_factor = universe.cholesky(selection)
+        np.testing.assert_allclose(sub_factor @ sub_factor.T, cov_matrix.values, atol=1e-14)